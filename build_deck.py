@@ -1,4 +1,6 @@
+from collections import Counter
 from dataclasses import dataclass, field
+from typing import Iterable, Self
 
 from card import Card, CardUniverse
 from constants import BASIC_LANDS
@@ -51,50 +53,85 @@ class DeckBuilder:
     min_deck_size: int = 40
     max_deck_size: int = 99
     max_non_basic_land_instances: int = 4
+    # kept in step with self.cards, so adds, counts & lookups are O(1) rather than scans of the whole deck
+    _slug_cnts: Counter = field(default_factory=Counter, init=False, repr=False)
+    _slug_instances: dict[str, list[GameCard]] = field(default_factory=dict, init=False, repr=False)
+    _last_card_id: int = field(default=0, init=False, repr=False)
+    _unique_cards_sorted: list[GameCard] | None = field(default=None, init=False, repr=False)  # until cards change
+
+    def __post_init__(self):
+        for c in self.cards:
+            self._index(c)
+        self._last_card_id = max([c.id for c in self.cards], default=0)
+
+    @classmethod
+    def from_decklist(cls, card_universe: CardUniverse, player_idx: int,
+                      decklist: Iterable[tuple[str, int]], **kwargs) -> Self:
+        """ex: DeckBuilder.from_decklist(universe, 0, [('plains', 16), ('serra-angel', 4)])"""
+        deck_builder = cls(card_universe, player_idx, **kwargs)
+        for slug, qty in decklist:
+            deck_builder.add_many(slug, qty)
+        return deck_builder
 
-    @property
     def _next_card_id(self) -> int:
-        if not self.cards:
-            return 1
-        return max([c.id for c in self.cards]) + 1
+        """Monotonic, so ids of removed cards aren't handed out again"""
+        self._last_card_id += 1
+        return self._last_card_id
 
     @property
     def unique_cards_sorted(self) -> list:
-        return sorted({c.props.slug: c for c in self.cards}.values(), key=lambda x: x.props.slug)
+        if self._unique_cards_sorted is None:
+            self._unique_cards_sorted = [self._slug_instances[slug][0] for slug in sorted(self._slug_instances)]
+        return self._unique_cards_sorted
 
     def get_slug_cnt(self, slug: str) -> int:
-        if not self.cards:
-            return 0
-        return sum([1 for c in self.cards if c.props.slug == slug])
+        return self._slug_cnts[slug]
+
+    def _index(self, c: GameCard) -> None:
+        self._unique_cards_sorted = None
+        self._slug_cnts[c.props.slug] += 1
+        self._slug_instances.setdefault(c.props.slug, []).append(c)
+
+    def _check_copy_limit(self, slug: str, qty: int, name: str) -> None:
+        if slug not in BASIC_LANDS and self._slug_cnts[slug] + qty > self.max_non_basic_land_instances:
+            raise ValueError(f"You can only have {self.max_non_basic_land_instances} instances of {name}")
 
     def add_card(self, c: Card) -> None:
-        if c.slug not in BASIC_LANDS and self.get_slug_cnt(c.slug) >= self.max_non_basic_land_instances:
-            raise ValueError(f"You can only have {self.max_non_basic_land_instances} instances of {c.name}")
-        game_card = GameCard(self.card_universe[c.slug], self._next_card_id, self.player_idx)
+        self._check_copy_limit(c.slug, 1, c.name)
+        game_card = GameCard(self.card_universe[c.slug], self._next_card_id(), self.player_idx)
         self.cards.append(game_card)
+        self._index(game_card)
 
     def add_card_by_slug(self, slug: str):
-        if slug not in BASIC_LANDS and self.get_slug_cnt(slug) >= self.max_non_basic_land_instances:
-            raise ValueError(f"You can only have {self.max_non_basic_land_instances} instances of {slug}")
-        game_card = GameCard(self.card_universe[slug], self._next_card_id, self.player_idx)
-        self.cards.append(game_card)
+        self.add_many(slug, 1)
+
+    def add_many(self, slug: str, qty: int) -> None:
+        """Adds qty instances of a card, looking it up in the universe once"""
+        self._check_copy_limit(slug, qty, slug)
+        props = self.card_universe[slug]
+        for _ in range(qty):
+            game_card = GameCard(props, self._next_card_id(), self.player_idx)
+            self.cards.append(game_card)
+            self._index(game_card)
 
     def remove_card(self, c: GameCard) -> None:
-        if c not in self.cards:
+        if c not in self._slug_instances.get(c.props.slug, []):
             raise ValueError("That card doesn't exist in your deck")
         self.cards.remove(c)
+        self._unique_cards_sorted = None
+        self._slug_cnts[c.props.slug] -= 1
+        self._slug_instances[c.props.slug].remove(c)
+        if not self._slug_instances[c.props.slug]:
+            del self._slug_instances[c.props.slug]
+            del self._slug_cnts[c.props.slug]
 
     def change_image(self, c: GameCard, set_code: str) -> None:
         """For a card already added to a deck, set images on all such card instances"""
-        for card in self.cards:
-            if card.props.slug == c.props.slug:
-                card.set_image(set_code)
+        for card in self._slug_instances.get(c.props.slug, []):
+            card.set_image(set_code)
 
     def complete_deck(self) -> Deck:
         if not self.min_deck_size <= len(self.cards) <= self.max_deck_size:
             raise ValueError(f"Your deck has {len(self.cards)} but must have between "
                              f"{self.min_deck_size} & {self.max_deck_size} cards")
         return Deck(self.cards)
-
-
-
@@ -113,11 +113,21 @@ class CardUniverse:
         self.cards = self.create_card_universe_from_json()
 
     def __getitem__(self, slug: str) -> Card:
-        return next(c for c in self.cards if slug == c.slug)
+        return self._cards_by_slug[slug]
+
+    @cached_property
+    def _cards_by_slug(self) -> dict[str, Card]:
+        return {c.slug: c for c in self.cards}
 
     def __iter__(self) -> Iterator:
         return iter(self.cards)
 
+    @cached_property
+    def slug_ids(self) -> dict[str, int]:
+        """Stable ids for every slug in the card data file, not only the selected sets; used by compact file formats"""
+        all_slugs = {slug for card_set_data in self.all_cards_dict.values() for slug in card_set_data}
+        return {slug: i for i, slug in enumerate(sorted(all_slugs))}
+
     @property
     def all_card_types(self) -> list[str]:
         return sorted({ct for c in self.cards for ct in c.card_types})
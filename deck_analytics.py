@@ -0,0 +1,115 @@
+"""Monte Carlo analytics for a built deck: shuffles are sampled in NumPy batches, so hundreds of thousands of
+games' worth of draws take well under a second"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from build_deck import GameCard
+from card import COLOR_LETTERS
+from game_state import LAND_MANA_DICT
+
+OPENING_HAND_SIZE = 7
+
+
+@dataclass
+class DeckAnalytics:
+    sample_cnt: int
+    on_the_play: bool
+    land_cnt_dist: np.ndarray  # [turn, n] = P(exactly n lands seen by that turn); row 0 is the opening hand
+    p_keep: float  # opening hands with an acceptable land count
+    p_mana_screw: float
+    p_mana_flood: float
+    on_curve_rates: dict[str, float]  # slug: P(drawn by the turn matching its casting weight & castable then)
+
+    @property
+    def max_turn(self) -> int:
+        return self.land_cnt_dist.shape[0] - 1
+
+    def p_lands_by_turn(self, land_cnt: int, turn: int) -> float:
+        """P(at least land_cnt lands seen by turn)"""
+        return float(self.land_cnt_dist[turn, land_cnt:].sum())
+
+    @property
+    def p_land_drops(self) -> list[float]:
+        """P(hitting every land drop through turn t), for t = 1 .. max_turn"""
+        return [self.p_lands_by_turn(t, t) for t in range(1, self.max_turn + 1)]
+
+
+def cards_seen_by_turn(turn: int, on_the_play: bool) -> int:
+    """The player on the play skips their first draw; turn 0 is the opening hand"""
+    if turn == 0:
+        return OPENING_HAND_SIZE
+    return OPENING_HAND_SIZE + (turn - 1 if on_the_play else turn)
+
+
+def sample_top_cards(deck_size: int, depth: int, sample_cnt: int, rng: np.random.Generator) -> np.ndarray:
+    """(sample_cnt, depth) card indices off the top of independently shuffled decks. Only the top `depth` cards are
+    ever looked at, so a partial Fisher-Yates shuffle (one vectorized swap per position) beats a full permutation"""
+    decks = np.tile(np.arange(deck_size, dtype=np.int16), (sample_cnt, 1))
+    rows = np.arange(sample_cnt)
+    for pos in range(depth):
+        picks = rng.integers(pos, deck_size, sample_cnt)
+        picked = decks[rows, picks]
+        decks[rows, picks] = decks[:, pos]
+        decks[:, pos] = picked
+    return decks[:, :depth]
+
+
+def analyze_deck(cards: list[GameCard], sample_cnt: int = 200_000, max_turn: int = 10, on_the_play: bool = True,
+                 keep_land_range: tuple[int, int] = (2, 5), screw: tuple[int, int] = (4, 3),
+                 flood: tuple[int, int] = (6, 7), seed: int | None = None) -> DeckAnalytics | None:
+    """screw = (turn, fewer than this many lands by then); flood = (turn, at least this many lands by then).
+    Returns None if the deck can't fill an opening hand"""
+    deck_size = len(cards)
+    if deck_size < OPENING_HAND_SIZE:
+        return None
+    seen_cnts = [min(cards_seen_by_turn(t, on_the_play), deck_size) for t in range(max_turn + 1)]
+    depth = seen_cnts[-1]
+
+    # per-card features, looked up through the sampled shuffles
+    is_land = np.array([c.props.is_land for c in cards])
+    land_colors = np.array([[LAND_MANA_DICT.get(c.props.slug) == color for c in cards] for color in COLOR_LETTERS])
+    slugs = sorted({c.props.slug for c in cards})
+    slug_codes = np.array([slugs.index(c.props.slug) for c in cards], dtype=np.int16)
+
+    shuffles = sample_top_cards(deck_size, depth, sample_cnt, np.random.default_rng(seed))
+    seen_cols = np.array(seen_cnts) - 1
+
+    lands_seen = np.cumsum(is_land[shuffles], axis=1, dtype=np.int16)[:, seen_cols]  # (samples, turns)
+    colored_lands_seen = {color: np.cumsum(land_colors[i][shuffles], axis=1, dtype=np.int16)[:, seen_cols]
+                          for i, color in enumerate(COLOR_LETTERS) if land_colors[i].any()}
+
+    land_cnt_dist = np.stack([np.bincount(lands_seen[:, t], minlength=depth + 1)[:depth + 1]
+                              for t in range(max_turn + 1)]) / sample_cnt
+
+    opening_lands = lands_seen[:, 0]
+    p_keep = float(np.mean((opening_lands >= keep_land_range[0]) & (opening_lands <= keep_land_range[1])))
+    screw_turn, screw_below = screw
+    flood_turn, flood_at_least = flood
+    p_mana_screw = float(np.mean(lands_seen[:, min(screw_turn, max_turn)] < screw_below))
+    p_mana_flood = float(np.mean(lands_seen[:, min(flood_turn, max_turn)] >= flood_at_least))
+
+    on_curve_rates = {}
+    for slug_code, slug in enumerate(slugs):
+        props = next(c.props for c in cards if c.props.slug == slug)
+        if props.is_land:
+            continue
+        try:
+            casting_dict = props.casting_dict
+        except NotImplementedError:  # ex: X costs
+            continue
+        turn = max(props.casting_weight, 1)
+        if turn > max_turn:
+            continue
+        drawn = np.any(slug_codes[shuffles[:, :seen_cnts[turn]]] == slug_code, axis=1)
+        castable = lands_seen[:, turn] >= props.casting_weight
+        for color in COLOR_LETTERS:
+            if not casting_dict[color]:
+                continue
+            if color not in colored_lands_seen:
+                castable[:] = False
+                break
+            castable &= colored_lands_seen[color][:, turn] >= casting_dict[color]
+        on_curve_rates[slug] = float(np.mean(drawn & castable))
+
+    return DeckAnalytics(sample_cnt, on_the_play, land_cnt_dist, p_keep, p_mana_screw, p_mana_flood, on_curve_rates)
@@ -0,0 +1,231 @@
+"""Evolves decklists with a genetic algorithm, scoring each one by headless self-play against a gauntlet.
+Fitness evaluation is spread over a process pool, cached per decklist hash, and checkpointed every generation so that
+long runs can resume. ex: python deck_optimizer.py --generations 50 --checkpoint runs/white.json"""
+import argparse
+import hashlib
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from build_deck import DeckBuilder
+from card import Card, CardUniverse
+from constants import BASIC_LANDS
+from decklist import Decklist, normalize
+from engine import Engine, build_decks, his_cards, my_cards
+from file_utils import read_json_file, write_json_to_file
+from game_state import GameState
+from players import GreedyBot
+from renderers import NullRenderer
+
+def decklist_hash(decklist: Decklist) -> str:
+    return hashlib.sha1('\n'.join(f'{qty} {slug}' for slug, qty in decklist).encode()).hexdigest()
+
+
+def is_playable(card: Card) -> bool:
+    """Cards the engine can actually play: basic lands, and spells whose casting cost it can parse"""
+    if card.is_land:
+        return card.slug in BASIC_LANDS
+    try:
+        card.casting_dict
+    except NotImplementedError:
+        return False
+    return True
+
+
+# ----- Fitness; runs in worker processes -----
+_worker_universe: CardUniverse | None = None
+
+
+def _init_worker(set_codes: list[str], file_path: str) -> None:
+    global _worker_universe
+    _worker_universe = CardUniverse(set_codes, file_path)
+
+
+def board_strength(gs: GameState, player_idx: int) -> int:
+    """There's no life total or combat damage yet, so a game is scored by the creatures each player got down"""
+    return sum((c.props.power or 0) + (c.props.toughness or 0) for c in gs.boards[player_idx].cards
+               if c.props.is_creature)
+
+
+def play_headless_game(universe: CardUniverse, decklists: tuple[Decklist, Decklist], first_player_idx: int,
+                       max_turns: int, seed: int) -> int:
+    """Returns the winning player's index, or -1 for a draw"""
+    random.seed(seed)
+    decks = build_decks(universe, decklists)
+    players = [GreedyBot(0, 'candidate'), GreedyBot(1, 'gauntlet')]
+    engine = Engine(players=players, renderer=NullRenderer(), gs=GameState(len(players), first_player_idx, decks=decks))
+    engine.play(max_turns=max_turns)
+    margin = board_strength(engine.gs, 0) - board_strength(engine.gs, 1)
+    return 0 if margin > 0 else 1 if margin < 0 else -1
+
+
+def evaluate(decklist: Decklist, gauntlet: list[Decklist], games_per_opponent: int, max_turns: int) -> float:
+    """Share of games won against the gauntlet, going first in half of them; draws count as half a win"""
+    seed = int(decklist_hash(decklist)[:8], 16)
+    score = 0.0
+    for opp_idx, opponent in enumerate(gauntlet):
+        for game_idx in range(games_per_opponent):
+            winner = play_headless_game(_worker_universe, (decklist, opponent), game_idx % 2, max_turns,
+                                        seed + opp_idx * games_per_opponent + game_idx)
+            score += 1 if winner == 0 else 0.5 if winner == -1 else 0
+    return score / (len(gauntlet) * games_per_opponent)
+
+
+# ----- Evolution -----
+@dataclass
+class DeckOptimizer:
+    universe: CardUniverse
+    gauntlet: list[Decklist]
+    deck_size: int = 40
+    population_size: int = 32
+    elite_cnt: int = 4
+    mutation_cnt: int = 3  # card swaps per mutation
+    games_per_opponent: int = 10
+    max_turns: int = 12
+    checkpoint_path: Path | None = None
+    seed: int | None = None
+    generation: int = 0
+    population: list[Decklist] = field(default_factory=list)
+    fitness_cache: dict[str, float] = field(default_factory=dict)  # decklist hash: fitness
+    fitness_cache_settings: dict | None = None  # the evaluation_settings fitness_cache was scored under
+
+    def __post_init__(self):
+        if not DeckBuilder.min_deck_size <= self.deck_size <= DeckBuilder.max_deck_size:
+            raise ValueError(f"Decks must have between {DeckBuilder.min_deck_size} & "
+                             f"{DeckBuilder.max_deck_size} cards")
+        self.rng = random.Random(self.seed)
+        playable = [c for c in self.universe.cards if is_playable(c)]
+        self.basic_lands = [c.slug for c in playable if c.is_land]
+        self.spells = [c.slug for c in playable if not c.is_land]
+        if self.checkpoint_path and Path(self.checkpoint_path).exists():
+            self.load_checkpoint()
+
+    @property
+    def evaluation_settings(self) -> dict:
+        """What a fitness depends on besides the decklist; cached fitnesses are only reused while these are unchanged"""
+        return {'gauntlet': [decklist_hash(d) for d in self.gauntlet], 'games_per_opponent': self.games_per_opponent,
+                'max_turns': self.max_turns}
+
+    def copy_limit(self, slug: str) -> int:
+        return self.deck_size if slug in BASIC_LANDS else DeckBuilder.max_non_basic_land_instances
+
+    def random_decklist(self) -> Decklist:
+        cards = Counter()
+        land_cnt = round(self.deck_size * 0.4)
+        for _ in range(land_cnt):
+            cards[self.rng.choice(self.basic_lands)] += 1
+        self._fill(cards)
+        return normalize(cards)
+
+    def _fill(self, cards: Counter) -> None:
+        candidates = self.spells + self.basic_lands
+        while sum(cards.values()) < self.deck_size:
+            slug = self.rng.choice(candidates)
+            if cards[slug] < self.copy_limit(slug):
+                cards[slug] += 1
+
+    def mutate(self, decklist: Decklist) -> Decklist:
+        cards = Counter(dict(decklist))
+        for _ in range(self.mutation_cnt):
+            cards[self.rng.choice(list(cards.elements()))] -= 1
+            self._fill(cards)
+        return normalize(cards)
+
+    def crossover(self, parent_a: Decklist, parent_b: Decklist) -> Decklist:
+        """Cards both parents agree on are kept; the rest are drawn from either parent's remaining cards"""
+        a, b = Counter(dict(parent_a)), Counter(dict(parent_b))
+        child = a & b
+        pool = list(((a | b) - child).elements())
+        self.rng.shuffle(pool)
+        for slug in pool:
+            if sum(child.values()) >= self.deck_size:
+                break
+            if child[slug] < self.copy_limit(slug):
+                child[slug] += 1
+        self._fill(child)
+        return normalize(child)
+
+    def evaluate_population(self, executor: ProcessPoolExecutor) -> list[float]:
+        if self.fitness_cache_settings != self.evaluation_settings:
+            self.fitness_cache = {}
+            self.fitness_cache_settings = self.evaluation_settings
+        uncached = list({decklist_hash(d): d for d in self.population
+                         if decklist_hash(d) not in self.fitness_cache}.items())
+        fitnesses = executor.map(evaluate, [d for _, d in uncached], [self.gauntlet] * len(uncached),
+                                 [self.games_per_opponent] * len(uncached), [self.max_turns] * len(uncached))
+        for (deck_hash, _), fitness in zip(uncached, fitnesses):
+            self.fitness_cache[deck_hash] = fitness
+        return [self.fitness_cache[decklist_hash(d)] for d in self.population]
+
+    def next_generation(self, fitnesses: list[float]) -> list[Decklist]:
+        ranked = [d for _, d in sorted(zip(fitnesses, self.population), key=lambda x: x[0], reverse=True)]
+        parents = ranked[:max(self.population_size // 2, 2)]
+        children = ranked[:self.elite_cnt]
+        while len(children) < self.population_size:
+            child = self.crossover(*self.rng.sample(parents, 2))
+            children.append(self.mutate(child))
+        return children
+
+    def run(self, generations: int, workers: int | None = None) -> tuple[Decklist, float]:
+        if not self.population:
+            self.population = [self.random_decklist() for _ in range(self.population_size)]
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(self.universe.set_codes, self.universe.file_path)) as executor:
+            while self.generation < generations:
+                fitnesses = self.evaluate_population(executor)
+                print(f"Generation {self.generation}: best {max(fitnesses):.3f}, "
+                      f"mean {sum(fitnesses) / len(fitnesses):.3f}, {len(self.fitness_cache)} decks evaluated")
+                self.population = self.next_generation(fitnesses)
+                self.generation += 1
+                self.save_checkpoint()
+            fitnesses = self.evaluate_population(executor)
+        best_fitness, best = max(zip(fitnesses, self.population), key=lambda x: x[0])
+        return best, best_fitness
+
+    # ----- Checkpoints -----
+    def save_checkpoint(self) -> None:
+        if not self.checkpoint_path:
+            return
+        checkpoint = {'generation': self.generation,
+                      'population': [[list(card) for card in d] for d in self.population],
+                      'fitness_cache': self.fitness_cache,
+                      'fitness_cache_settings': self.fitness_cache_settings,
+                      'rng_state': self.rng.getstate()}
+        path = Path(self.checkpoint_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        write_json_to_file(tmp_path, checkpoint)
+        os.replace(tmp_path, path)  # never leave a half-written checkpoint behind
+
+    def load_checkpoint(self) -> None:
+        checkpoint = read_json_file(self.checkpoint_path)
+        self.generation = checkpoint['generation']
+        self.population = [tuple((slug, qty) for slug, qty in d) for d in checkpoint['population']]
+        self.fitness_cache = checkpoint['fitness_cache']
+        self.fitness_cache_settings = checkpoint.get('fitness_cache_settings')  # None (re-scored) for older checkpoints
+        version, internal_state, gauss_next = checkpoint['rng_state']
+        self.rng.setstate((version, tuple(internal_state), gauss_next))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sets', nargs='+', default=['4E'])
+    parser.add_argument('--generations', type=int, default=20)
+    parser.add_argument('--population', type=int, default=32)
+    parser.add_argument('--deck-size', type=int, default=40)
+    parser.add_argument('--games', type=int, default=10, help="games per gauntlet opponent")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--checkpoint', type=Path)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    optimizer = DeckOptimizer(CardUniverse(args.sets), gauntlet=[my_cards, his_cards],
+                              deck_size=args.deck_size, population_size=args.population,
+                              games_per_opponent=args.games, checkpoint_path=args.checkpoint, seed=args.seed)
+    best_deck, best_fitness = optimizer.run(args.generations, args.workers)
+    print(f"Best deck ({best_fitness:.3f}):")
+    for slug, qty in best_deck:
+        print(qty, slug)
@@ -0,0 +1,100 @@
+"""Saving & loading decks. Two formats:
+- text, one "qty slug" line per card, with # comments; for people
+- binary deck libraries keyed by the card universe's slug ids; for loading thousands of decks at once
+
+Binary layout, little-endian: header (magic, version, slug table checksum, deck count), then per deck its unique card
+count followed by (slug id, qty) pairs"""
+import struct
+import zlib
+from pathlib import Path
+from typing import Iterable
+
+from build_deck import Deck, DeckBuilder
+from card import CardUniverse
+
+Decklist = tuple[tuple[str, int], ...]  # ((slug, qty), ...), sorted by slug so that equal decks compare equal
+
+MAGIC = b'MGDL'
+VERSION = 1
+HEADER = struct.Struct('<4sBII')  # magic, version, slug table checksum, deck count
+DECK_HEADER = struct.Struct('<H')  # unique card count
+CARD_ENTRY = struct.Struct('<HB')  # slug id, qty
+
+
+def normalize(cards: dict[str, int] | Iterable[tuple[str, int]]) -> Decklist:
+    cards = dict(cards)
+    return tuple(sorted((slug, qty) for slug, qty in cards.items() if qty))
+
+
+# ----- Text -----
+def parse_decklist_text(text: str) -> Decklist:
+    cards: dict[str, int] = {}
+    for line_num, line in enumerate(text.splitlines(), start=1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        qty, _, slug = line.partition(' ')
+        if not qty.isdigit() or not slug.strip():
+            raise ValueError(f"Line {line_num} should look like '4 serra-angel', not '{line}'")
+        cards[slug.strip()] = cards.get(slug.strip(), 0) + int(qty)
+    return normalize(cards)
+
+
+def format_decklist_text(decklist: Decklist) -> str:
+    return ''.join(f'{qty} {slug}\n' for slug, qty in decklist)
+
+
+def read_decklist(file_path: str | Path) -> Decklist:
+    return parse_decklist_text(Path(file_path).read_text(encoding='utf-8'))
+
+
+def write_decklist(file_path: str | Path, decklist: Decklist) -> None:
+    Path(file_path).write_text(format_decklist_text(decklist), encoding='utf-8')
+
+
+# ----- Binary deck libraries -----
+def _slug_table_checksum(universe: CardUniverse) -> int:
+    """Guards against reading a library with a different card data file, whose slug ids would mean other cards"""
+    return zlib.crc32('\n'.join(universe.slug_ids).encode())
+
+
+def encode_deck_library(decklists: list[Decklist], universe: CardUniverse) -> bytes:
+    slug_ids = universe.slug_ids
+    chunks = [HEADER.pack(MAGIC, VERSION, _slug_table_checksum(universe), len(decklists))]
+    for decklist in decklists:
+        chunks.append(DECK_HEADER.pack(len(decklist)))
+        chunks.extend(CARD_ENTRY.pack(slug_ids[slug], qty) for slug, qty in decklist)
+    return b''.join(chunks)
+
+
+def decode_deck_library(data: bytes, universe: CardUniverse) -> list[Decklist]:
+    magic, version, checksum, deck_cnt = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a version {VERSION} deck library")
+    if checksum != _slug_table_checksum(universe):
+        raise ValueError("This deck library was written against a different card data file")
+    slugs = list(universe.slug_ids)  # slug_ids are 0..n in order, so a list maps id -> slug
+    view = memoryview(data)
+    offset = HEADER.size
+    decklists = []
+    for _ in range(deck_cnt):
+        (unique_cnt,) = DECK_HEADER.unpack_from(view, offset)
+        offset += DECK_HEADER.size
+        entries_end = offset + unique_cnt * CARD_ENTRY.size
+        decklists.append(tuple((slugs[slug_id], qty) for slug_id, qty in CARD_ENTRY.iter_unpack(view[offset:entries_end])))
+        offset = entries_end
+    return decklists
+
+
+def save_deck_library(file_path: str | Path, decklists: list[Decklist], universe: CardUniverse) -> None:
+    Path(file_path).write_bytes(encode_deck_library(decklists, universe))
+
+
+def load_deck_library(file_path: str | Path, universe: CardUniverse) -> list[Decklist]:
+    return decode_deck_library(Path(file_path).read_bytes(), universe)
+
+
+def load_decks(file_path: str | Path, universe: CardUniverse, player_idx: int = 0) -> list[Deck]:
+    """Straight from a deck library file to playable Decks"""
+    return [DeckBuilder.from_decklist(universe, player_idx, decklist).complete_deck()
+            for decklist in load_deck_library(file_path, universe)]
@@ -1,8 +1,14 @@
+import asyncio
+import copy
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
 
 from build_deck import CardUniverse, Deck, DeckBuilder
+from decklist import read_decklist
 from game_state import GameState, Phase, Action, PlayNonBasicLandToBoard, PlayLand, PassTheTurn
-from players import Player, ConsolePlayer
+from instrumentation import EngineProfiler
+from players import Player, AsyncPlayer, ConsolePlayer, decide_move, decide_move_key
 from renderers import Renderer, ConsoleRenderer
 
 @dataclass
@@ -10,63 +16,120 @@ class Engine:
     players: list[Player]
     renderer: Renderer
     gs: GameState = None
+    profiler: EngineProfiler | None = None  # opt-in; see instrumentation.py
     # log: Log = field(default_factory=Log)
 
     @property
     def player_cnt(self) -> int:
         return len(self.players)
 
-    def play(self) -> None:
+    def _attach_profiler(self) -> None:
+        self.gs.profiler = self.profiler
+        if self.profiler:
+            self.profiler.start()
+
+    def _begin_turn(self) -> None:
+        self.gs.begin_turn()  # recorded in the game history, so it can be undone like a move
+        if self.profiler:
+            self.profiler.lap(Phase.UNTAP, 'begin_turn')
+
+    def play(self, max_turns: int | None = None) -> None:
         # ... this might be where the decks are built?
 
-        while True:
-            self.gs.action_on_idx = self.gs.player_turn_idx
-            self.gs.turn_number += 1
-            self.gs.has_played_land = False
-            self.gs.phase = Phase.UNTAP
-            for c in self.gs.boards[self.gs.player_turn_idx].cards:
-                c.untap()
-                for turn_num, act in self.gs.game_history:
-                    if (isinstance(act, PlayNonBasicLandToBoard) and act.card.id == c.id and
-                            self.gs.turn_number - turn_num == 2):
-                        c.has_summoning_sickness = False
-            # phase = Phase.UPKEEP
-            # phase = Phase.DRAW
-            self.gs.phase = Phase.CAST
+        self._attach_profiler()
+        profiler = self.profiler
+        while max_turns is None or self.gs.turn_number < max_turns:
+            self._begin_turn()
+            while True:
+                phase, player_idx = self.gs.phase, self.gs.action_on_idx
+                self.renderer.render(self.gs, self.players)
+                if profiler:
+                    profiler.lap(phase, 'render')
+                action = self.players[player_idx].make_move(self.gs)
+                if profiler:
+                    profiler.record_decision(phase, player_idx)
+                self.gs.make_move(action)
+                if profiler:
+                    profiler.record_action(phase, type(action).__name__)
+                if isinstance(action, PassTheTurn):
+                    break
+
+    async def play_async(self, move_deadline: float | None = None, executor: Executor | None = None,
+                         max_turns: int | None = None) -> None:
+        """Same loop as play(), but never blocks the event loop, so one process can drive many games.
+        Sync players are run in the executor (the loop's default thread pool if None); if a player misses
+        the move_deadline (seconds), their default move is played instead"""
+        self._attach_profiler()
+        profiler = self.profiler
+        while max_turns is None or self.gs.turn_number < max_turns:
+            self._begin_turn()
             while True:
+                phase, player_idx = self.gs.phase, self.gs.action_on_idx
                 self.renderer.render(self.gs, self.players)
-                action = self.players[self.gs.action_on_idx].make_move(self.gs)
-                action.play()
-                self.gs.game_history.append((self.gs.turn_number, action))
-                if isinstance(action, PlayLand):
-                    self.gs.has_played_land = True
+                if profiler:
+                    profiler.lap(phase, 'render')
+                action = await self._await_move(self.players[player_idx], move_deadline, executor)
+                if profiler:
+                    profiler.record_decision(phase, player_idx)
+                self.gs.make_move(action)
+                if profiler:
+                    profiler.record_action(phase, type(action).__name__)
                 if isinstance(action, PassTheTurn):
                     break
 
+    async def _await_move(self, player: Player, move_deadline: float | None, executor: Executor | None) -> Action:
+        if isinstance(player, AsyncPlayer):
+            move = player.make_move_async(self.gs)
+        elif isinstance(executor, ProcessPoolExecutor):  # decides on the pickled copy it's sent
+            move = asyncio.get_running_loop().run_in_executor(executor, decide_move_key, player, self.gs)
+        elif move_deadline is not None:
+            # a thread that misses the deadline keeps running after the engine has moved on, so it gets a copy to
+            # search (make/undo) on rather than the live state
+            move = asyncio.get_running_loop().run_in_executor(executor, decide_move_key, player,
+                                                              copy.deepcopy(self.gs))
+        else:
+            move = asyncio.get_running_loop().run_in_executor(executor, decide_move, player, self.gs)
+        try:
+            action = await asyncio.wait_for(move, move_deadline)
+        except TimeoutError:
+            # a sync player's thread can't be interrupted; its eventual answer is simply discarded
+            return player.default_move(self.gs)
+        if isinstance(action, tuple):
+            action = self._match_available_action(player, action)
+        return action
+
+    def _match_available_action(self, player: Player, action_key: tuple[str, str]) -> Action:
+        """A bot that decided on a copy of the game state; find the equivalent action on this one"""
+        for avail_action in self.gs.get_available_actions(player.idx):
+            if (type(avail_action).__name__, repr(avail_action)) == action_key:
+                return avail_action
+        return player.default_move(self.gs)
+
 
 # build decks
-universe = CardUniverse(['4E'])
-my_cards = (('plains', 16), ('serra-angel', 4), ('savannah-lions', 4), ('white-knight', 4), ('tundra-wolves', 4),
-            ('swords-to-plowshares', 4), ('wrath-of-god', 4))
-his_cards = (('island', 16), ('air-elemental', 4), ('merfolk-of-the-pearl-trident', 4), ('counterspell', 4),
-             ('jump', 4), ('zephyr-falcon', 4), ('lord-of-atlantis', 4))
-
-decks = []
-for i, cards in enumerate((my_cards, his_cards)):
-    deck_builder = DeckBuilder(universe, i)
-    for card_slug, qty in cards:
-        for _ in range(qty):
-            deck_builder.add_card_by_slug(card_slug)
-    deck: Deck = deck_builder.complete_deck()
-    decks.append(deck)
-
-# create players
-players = [ConsolePlayer(0, 'Mark', False), ConsolePlayer(1, 'Bull', False)]
-
-# create engine
-e = Engine(players=players,
-           renderer=ConsoleRenderer(),
-           gs=GameState(len(players), 0, decks=decks))
-e.play()
+DECKS_DIR = Path(__file__).parent / 'decks'
+my_cards = read_decklist(DECKS_DIR / 'white_weenie.txt')
+his_cards = read_decklist(DECKS_DIR / 'blue_fliers.txt')
+
+
+def build_decks(universe: CardUniverse, decklists=(my_cards, his_cards)) -> list[Deck]:
+    return [DeckBuilder.from_decklist(universe, i, cards).complete_deck() for i, cards in enumerate(decklists)]
+
+
+async def play_many(engines: list[Engine], **play_async_kwargs) -> None:
+    """Drives many games concurrently on the running event loop"""
+    await asyncio.gather(*(e.play_async(**play_async_kwargs) for e in engines))
+
+
+if __name__ == '__main__':
+    universe = CardUniverse(['4E'])
+    decks = build_decks(universe)
 
+    # create players
+    players = [ConsolePlayer(0, 'Mark', False), ConsolePlayer(1, 'Bull', False)]
 
+    # create engine
+    e = Engine(players=players,
+               renderer=ConsoleRenderer(),
+               gs=GameState(len(players), 0, decks=decks))
+    e.play()
@@ -3,14 +3,24 @@ from abc import ABC
 from itertools import combinations
 from dataclasses import dataclass, field
 from enum import Enum
+import json
 import random
+import weakref
+from pathlib import Path
+from time import perf_counter
 
 from build_deck import GameCard, Deck
 from card import COLOR_LETTERS
 from phase_fsm import Phase
+from state_changes import (ActionOnChanged, CardMoved, CardTapped, ChangeFeed, CombatUpdated, CombatView,
+                           PhaseChanged, StateChange, TurnPassed, TurnStarted, Zone)
 
 LAND_MANA_DICT = {'island': 'U', 'forest': 'G', 'swamp': 'B', 'mountain': 'R', 'plains': 'W'}
 
+def combat_view(combats: list) -> CombatView:
+    return tuple((attacker.id, tuple(b.id for b in blockers)) for attacker, blockers in combats)
+
+
 def draw(dest_pile: list[GameCard], source_pile: list[GameCard], card_cnt: int):
     for i in range(card_cnt):
         dest_pile.append(source_pile.pop(0))
@@ -73,10 +83,14 @@ class Board:
     def subtract_mana(self, mana_color: str, cnt: int) -> None:
         self.available_mana[mana_color] -= cnt
 
-    def pay_casting_cost(self, casting_cost: str) -> None:
+    def pay_casting_cost(self, casting_cost: str) -> list[GameCard]:
+        """Taps a land per casting cost symbol; returns the tapped lands, so the payment can be undone"""
+        tapped_lands = []
         for _ in casting_cost:
             untapped_lands = [c for c in self.cards if c.props.is_land and not c.is_tapped]
             untapped_lands[0].tap()
+            tapped_lands.append(untapped_lands[0])
+        return tapped_lands
 
     def add_defender(self, attacker: GameCard):
         ...
@@ -84,17 +98,27 @@ class Board:
 
 @dataclass
 class Action(ABC):
+    """play() records the minimal inverse delta it needs, so that undo() can revert it in O(delta)"""
     player_idx: int
 
     @abc.abstractmethod
     def play(self) -> None:
         ...
 
+    @abc.abstractmethod
+    def undo(self) -> None:
+        ...
+
+    @abc.abstractmethod
+    def changes(self) -> list[StateChange]:
+        """What play() changed; only valid while the action is applied"""
+        ...
+
 
 @dataclass
 class ActionStack:
     # TODO: think "FIFO"
-    actions: list[Action] = field(default=list)
+    actions: list[Action] = field(default_factory=list)
 
 
 @dataclass
@@ -114,6 +138,12 @@ class PlayLand(Action):
             raise NotImplementedError("I can't handle non-basic lands")
         self.board.add_mana(mana, 1)
 
+    def undo(self) -> None:
+        self.source_hand.cards.insert(self.card_in_hand_idx, self.board.cards.pop())
+
+    def changes(self) -> list[StateChange]:
+        return [CardMoved(self.card.id, self.player_idx, Zone.HAND, Zone.BOARD)]
+
 
 @dataclass
 class PlayNonBasicLandToBoard(Action):
@@ -126,10 +156,19 @@ class PlayNonBasicLandToBoard(Action):
         return f"Play {self.card.props.name} creature to board"
 
     def play(self) -> None:
-        self.board.pay_casting_cost(self.card.props.casting_cost)
+        self._tapped_lands = self.board.pay_casting_cost(self.card.props.casting_cost)
         self.board.cards.append(self.source_hand.cards.pop(self.card_in_hand_idx))
         # TODO: find land card(s) to tap
 
+    def undo(self) -> None:
+        self.source_hand.cards.insert(self.card_in_hand_idx, self.board.cards.pop())
+        for land in self._tapped_lands:
+            land.untap()
+
+    def changes(self) -> list[StateChange]:
+        return ([CardTapped(land.id, self.player_idx, True) for land in self._tapped_lands] +
+                [CardMoved(self.card.id, self.player_idx, Zone.HAND, Zone.BOARD)])
+
 
 @dataclass
 class PlaySorceryOrInstant(Action):
@@ -148,6 +187,13 @@ class PlaySorceryOrInstant(Action):
         self.action_stack.actions.append(self)
         self.source_hand.cards.pop(self.card_in_hand_idx)
 
+    def undo(self) -> None:
+        self.action_stack.actions.pop()
+        self.source_hand.cards.insert(self.card_in_hand_idx, self.card)
+
+    def changes(self) -> list[StateChange]:
+        return [CardMoved(self.card.id, self.player_idx, Zone.HAND, Zone.STACK)]
+
 
 @dataclass
 class CreatureAttack(Action):
@@ -158,9 +204,19 @@ class CreatureAttack(Action):
         return f"Add {self.card.props.name} to attack"
 
     def play(self) -> None:
+        self._was_tapped = self.card.is_tapped
         self.card.tap()
         self.board.attacking_creatures.append(self.card)
 
+    def undo(self) -> None:
+        self.board.attacking_creatures.pop()
+        if not self._was_tapped:
+            self.card.untap()
+
+    def changes(self) -> list[StateChange]:
+        # the combat itself is published once attackers are final, by FinishDeclaringAttackers
+        return [] if self._was_tapped else [CardTapped(self.card.id, self.player_idx, True)]
+
 
 @dataclass
 class BeginCombat(Action):
@@ -170,8 +226,15 @@ class BeginCombat(Action):
         return "Begin Combat"
 
     def play(self) -> None:
+        self._prev_phase = self.gs.phase
         self.gs.phase = Phase.DECLARE_ATTACKERS
 
+    def undo(self) -> None:
+        self.gs.phase = self._prev_phase
+
+    def changes(self) -> list[StateChange]:
+        return [PhaseChanged(self._prev_phase, self.gs.phase)]
+
 
 @dataclass
 class FinishDeclaringAttackers(Action):
@@ -181,10 +244,22 @@ class FinishDeclaringAttackers(Action):
         return "Done Declaring Attackers"
 
     def play(self) -> None:
+        self._prev = (self.gs.phase, self.gs.combats, self.gs.action_on_idx)
         self.gs.phase = Phase.DECLARE_BLOCKERS
         self.gs.combats = [[c, []] for c in self.gs.boards[self.gs.player_turn_idx].attacking_creatures]
         self.gs.action_on_idx = 1 if self.gs.action_on_idx == 0 else 0
 
+    def undo(self) -> None:
+        self.gs.phase, self.gs.combats, self.gs.action_on_idx = self._prev
+
+    def changes(self) -> list[StateChange]:
+        prev_phase, prev_combats, prev_action_on_idx = self._prev
+        changes = [PhaseChanged(prev_phase, self.gs.phase),
+                   ActionOnChanged(prev_action_on_idx, self.gs.action_on_idx)]
+        if combat_view(prev_combats) != combat_view(self.gs.combats):
+            changes.append(CombatUpdated(combat_view(prev_combats), combat_view(self.gs.combats)))
+        return changes
+
 
 @dataclass
 class AssignBlocker(Action):
@@ -196,9 +271,20 @@ class AssignBlocker(Action):
         return f"Block {self.attacker} with {self.blocker}"
 
     def play(self) -> None:
+        self._blocked = []
         for i, (attacker, blockers) in enumerate(self.gs.combats):
             if attacker == self.attacker:
                 blockers.append(self.blocker)
+                self._blocked.append(blockers)
+
+    def undo(self) -> None:
+        for blockers in self._blocked:
+            blockers.pop()
+
+    def changes(self) -> list[StateChange]:
+        combats = combat_view(self.gs.combats)
+        prev_combats = tuple((a, b[:-1] if a == self.attacker.id else b) for a, b in combats)
+        return [CombatUpdated(prev_combats, combats)]
 
 
 @dataclass
@@ -209,8 +295,15 @@ class FinishBlocking(Action):
         return f"Finish Blocks"
 
     def play(self) -> None:
+        self._prev_phase = self.gs.phase
         self.gs.phase = Phase.ATTACK_AND_BLOCK_INSTANTS_AND_ABILITIES
 
+    def undo(self) -> None:
+        self.gs.phase = self._prev_phase
+
+    def changes(self) -> list[StateChange]:
+        return [PhaseChanged(self._prev_phase, self.gs.phase)]
+
 @dataclass
 class MoveToEndStep(Action):
     gs: "GameState"
@@ -219,8 +312,15 @@ class MoveToEndStep(Action):
         return "Moving to End Step"
 
     def play(self) -> None:
+        self._prev_phase = self.gs.phase
         self.gs.phase = Phase.END_STEP
 
+    def undo(self) -> None:
+        self.gs.phase = self._prev_phase
+
+    def changes(self) -> list[StateChange]:
+        return [PhaseChanged(self._prev_phase, self.gs.phase)]
+
 
 @dataclass
 class PassTheTurn(Action):
@@ -230,9 +330,72 @@ class PassTheTurn(Action):
         return "Pass the Turn"
 
     def play(self) -> None:
+        self._prev = (self.gs.phase, self.gs.player_turn_idx)
         self.gs.phase = Phase.UNTAP
         self.gs.player_turn_idx = 1 if self.gs.player_turn_idx == 0 else 0
 
+    def undo(self) -> None:
+        self.gs.phase, self.gs.player_turn_idx = self._prev
+
+    def changes(self) -> list[StateChange]:
+        prev_phase, prev_player_turn_idx = self._prev
+        return [PhaseChanged(prev_phase, self.gs.phase), TurnPassed(prev_player_turn_idx, self.gs.player_turn_idx)]
+
+
+@dataclass
+class BeginTurn(Action):
+    """The engine's start-of-turn bookkeeping, recorded like a move so that undo can cross turn boundaries:
+    untaps the turn player's board, ends summoning sickness there, and clears last turn's combat"""
+    gs: "GameState"
+
+    def __repr__(self) -> str:
+        return f"Begin turn {self.gs.turn_number}"
+
+    def play(self) -> None:
+        gs = self.gs
+        board = gs.boards[gs.player_turn_idx]
+        self._prev = (gs.action_on_idx, gs.turn_number, gs.has_played_land, gs.phase, gs.combats,
+                      [b.attacking_creatures for b in gs.boards])
+        self._untapped = [c for c in board.cards if c.is_tapped]
+        self._cured = [c for c in board.cards if c.has_summoning_sickness]
+        gs.action_on_idx = gs.player_turn_idx
+        gs.turn_number += 1
+        gs.has_played_land = False
+        for c in self._untapped:
+            c.untap()
+        # everything on the board has been there since its controller's last turn
+        for c in self._cured:
+            c.has_summoning_sickness = False
+        # last turn's combat is over; don't carry it (or its attackers) forward
+        gs.combats = []
+        for b in gs.boards:
+            b.attacking_creatures = []
+        # phase = Phase.UPKEEP
+        # phase = Phase.DRAW
+        gs.phase = Phase.CAST
+
+    def undo(self) -> None:
+        gs = self.gs
+        gs.action_on_idx, gs.turn_number, gs.has_played_land, gs.phase, gs.combats, attacking_creatures = self._prev
+        for b, attackers in zip(gs.boards, attacking_creatures):
+            b.attacking_creatures = attackers
+        for c in self._untapped:
+            c.tap()
+        for c in self._cured:
+            c.has_summoning_sickness = True
+
+    def changes(self) -> list[StateChange]:
+        prev_action_on_idx, prev_turn_number, _, prev_phase, prev_combats, _ = self._prev
+        changes = []
+        if prev_action_on_idx != self.gs.action_on_idx:
+            changes.append(ActionOnChanged(prev_action_on_idx, self.gs.action_on_idx))
+        changes.append(TurnStarted(prev_turn_number, self.gs.turn_number))
+        changes.extend(CardTapped(c.id, self.player_idx, False) for c in self._untapped)
+        if prev_combats:
+            changes.append(CombatUpdated(combat_view(prev_combats), ()))
+        changes.append(PhaseChanged(prev_phase, self.gs.phase))
+        return changes
+
 
 @dataclass
 class GameState:
@@ -243,8 +406,13 @@ class GameState:
     graveyards: list[list] = field(default_factory=list)
     hands: list[Hand] = field(default_factory=list)
     phase = Phase.UNTAP
-    action_stack = ActionStack()
+    action_stack: ActionStack = field(default_factory=ActionStack)  # per game; was a class attribute shared by all games
     game_history: list[tuple[int, Action]] = field(default_factory=list)
+    redo_history: list[tuple[int, Action]] = field(default_factory=list)
+    changes: ChangeFeed = field(default_factory=ChangeFeed)
+    profiler: "EngineProfiler" = field(default=None, repr=False)  # set by Engine when profiling
+    history_limit: int | None = None  # moves kept in memory (and undoable); None keeps them all
+    history_spill_path: str | Path | None = None  # moves beyond history_limit are appended here as JSON lines
     turn_number = 0
     has_played_land = False
     action_on_idx: int = field(default=None)
@@ -262,12 +430,43 @@ class GameState:
             hand.sort_cards()
         self.action_on_idx = self.player_turn_idx
 
-    def get_available_actions(self, p_id: int):
+    def __getstate__(self) -> dict:
+        """A pickled or copied GameState (ex: for a bot deciding in a pool) is a snapshot of the table; its history
+        stays behind, as those actions only hold weak references back to this GameState. So do its subscribers and
+        profiler, as the copy's moves aren't the game's"""
+        state = self.__dict__.copy()
+        state['game_history'] = []
+        state['redo_history'] = []
+        state['changes'] = ChangeFeed()
+        state['profiler'] = None
+        return state
+
+    def view(self, seat: int) -> dict:
+        """What a seat is allowed to see, flattened to card ids so that it encodes compactly"""
+        opp_seat = 1 if seat == 0 else 0
+        return {'ph': self.phase.name, 'tn': self.turn_number, 'tp': self.player_turn_idx, 'ao': self.action_on_idx,
+                'b': [[[c.id, c.is_tapped] for c in board.cards] for board in self.boards],
+                'h': [c.id for c in self.hands[seat].cards],
+                'oh': len(self.hands[opp_seat].cards),
+                'st': [a.card.id for a in self.action_stack.actions],
+                'cb': combat_view(self.combats)}
+
+    def get_available_actions(self, p_id: int) -> list[Action]:
+        if self.profiler is None:
+            return self._get_available_actions(p_id)
+        start = perf_counter()
+        available_actions = self._get_available_actions(p_id)
+        self.profiler.record_available_actions(len(available_actions), perf_counter() - start)
+        return available_actions
+
+    def _get_available_actions(self, p_id: int) -> list[Action]:
         available_actions: list[Action] = []
         hand = self.hands[p_id]
         board = self.boards[p_id]
+        # actions end up in game_history; a weak reference back keeps GameState <-> history from being a cycle
+        gs = weakref.proxy(self)
 
-        available_actions.append(PassTheTurn(p_id, self))
+        available_actions.append(PassTheTurn(p_id, gs))
 
         if self.phase == Phase.CAST:
             # play a land
@@ -290,7 +489,7 @@ class GameState:
             # declare combat
             for c in board.cards:
                 if c.can_attack and not c.has_summoning_sickness:
-                    available_actions.append(BeginCombat(p_id, self))
+                    available_actions.append(BeginCombat(p_id, gs))
 
         if self.phase == Phase.DECLARE_ATTACKERS:
             # add attackers
@@ -300,14 +499,14 @@ class GameState:
 
             # finish declaring attackers; move to declare blockers
             if board.attacking_creatures:
-                available_actions.append(FinishDeclaringAttackers(p_id, self))
+                available_actions.append(FinishDeclaringAttackers(p_id, gs))
 
         if self.phase == Phase.DECLARE_BLOCKERS:
-            already_assigned_blockers = [c for blocking_combo in self.combats for c in blocking_combo]
+            already_assigned_blockers = [b for _, blockers in self.combats for b in blockers]
             remaining_blockers = [c for c in self.boards[self.action_on_idx].available_blockers if c not in already_assigned_blockers]
             for blocker in remaining_blockers:
                 for attacker, _ in self.combats:
-                    available_actions.append(AssignBlocker(self.action_on_idx, blocker, attacker, self))
+                    available_actions.append(AssignBlocker(self.action_on_idx, blocker, attacker, gs))
 
         if self.phase == Phase.ATTACK_AND_BLOCK_INSTANTS_AND_ABILITIES:
             ...
@@ -317,7 +516,61 @@ class GameState:
 
         return available_actions
 
-    def make_move(self, action: Action):
-        ...
+    def begin_turn(self) -> BeginTurn:
+        action = BeginTurn(self.player_turn_idx, weakref.proxy(self))
+        self.make_move(action)
+        return action
+
+    def make_move(self, action: Action) -> None:
+        action.play()
+        self.changes.publish(*action.changes())
+        self._record(action)
+        self.redo_history.clear()  # a new move forks the timeline
+        if isinstance(action, PlayLand):
+            self.has_played_land = True
+
+    def _record(self, action: Action) -> None:
+        self.game_history.append((self.turn_number, action))
+        if self.history_limit is not None and len(self.game_history) > self.history_limit * 1.25:
+            self.trim_history()
+
+    def trim_history(self) -> None:
+        """Drops the oldest moves beyond history_limit, spilling them to history_spill_path if one is set.
+        Trims in batches (see make_move), so that dropping from the front of the list stays amortized O(1)"""
+        excess_cnt = len(self.game_history) - self.history_limit
+        if excess_cnt <= 0:
+            return
+        spilled, self.game_history = self.game_history[:excess_cnt], self.game_history[excess_cnt:]
+        if self.history_spill_path:
+            with open(self.history_spill_path, 'a', encoding='utf-8') as f:
+                for turn_number, action in spilled:
+                    card = getattr(action, 'card', None)
+                    f.write(json.dumps([turn_number, type(action).__name__, action.player_idx,
+                                        card.id if card else None, repr(action)], separators=(',', ':')) + '\n')
+
+    def undo(self) -> Action | None:
+        """Reverts the last move using its recorded inverse delta, rather than restoring a copy of the state.
+        The start of each turn is recorded as a BeginTurn, so undoing can go back across turns"""
+        if not self.game_history:
+            return None
+        turn_number, action = self.game_history.pop()
+        applied_changes = action.changes()
+        action.undo()
+        self.changes.publish(*[c.inverse() for c in reversed(applied_changes)])
+        if isinstance(action, PlayLand):
+            self.has_played_land = False  # only 1 land per turn, so none had been played before it
+        self.redo_history.append((turn_number, action))
+        return action
+
+    def redo(self) -> Action | None:
+        if not self.redo_history:
+            return None
+        _, action = self.redo_history.pop()
+        action.play()
+        self.changes.publish(*action.changes())
+        self._record(action)
+        if isinstance(action, PlayLand):
+            self.has_played_land = True
+        return action
 
 
@@ -0,0 +1,89 @@
+"""Opt-in profiling for Engine & GameState. With no profiler attached, the engine only pays for `if profiler` checks.
+One profiler per Engine: it times the engine's steps by lapping a single clock"""
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+
+from file_utils import write_json_to_file
+from phase_fsm import Phase
+
+ROOT_FRAME = 'Engine.play'
+
+
+@dataclass
+class TimingStat:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def as_dict(self) -> dict:
+        return {'count': self.count, 'total_ms': round(self.total_seconds * 1000, 3),
+                'mean_ms': round(self.total_seconds / self.count * 1000, 4) if self.count else 0,
+                'max_ms': round(self.max_seconds * 1000, 4)}
+
+
+class EngineProfiler:
+    def __init__(self):
+        self.phase_seconds: dict[str, float] = defaultdict(float)
+        self.action_stats: dict[str, TimingStat] = defaultdict(TimingStat)
+        self.decision_stats: dict[int, TimingStat] = defaultdict(TimingStat)  # player idx: stats
+        self.available_actions_stats = TimingStat()
+        self.available_actions_sizes: Counter = Counter()  # result size: call count
+        self.folded_stacks: Counter = Counter()  # 'frame;frame;frame': microseconds of self time
+        self._last_lap = perf_counter()
+        self._nested: list[tuple[str, float]] = []  # timed calls inside the current lap
+
+    def start(self) -> None:
+        self._last_lap = perf_counter()
+        self._nested.clear()
+
+    def lap(self, phase: Phase, *frames: str) -> float:
+        """Attributes the time since the previous lap to phase;frames, and returns it"""
+        now = perf_counter()
+        elapsed = now - self._last_lap
+        self._last_lap = now
+        self.phase_seconds[phase.name] += elapsed
+        stack = ';'.join((ROOT_FRAME, phase.name) + frames)
+        nested_seconds = 0.0
+        for name, seconds in self._nested:
+            self.folded_stacks[f'{stack};{name}'] += seconds * 1e6
+            nested_seconds += seconds
+        self._nested.clear()
+        self.folded_stacks[stack] += max(elapsed - nested_seconds, 0) * 1e6
+        return elapsed
+
+    def record_decision(self, phase: Phase, player_idx: int) -> None:
+        self.decision_stats[player_idx].add(self.lap(phase, 'decide', f'player_{player_idx}'))
+
+    def record_action(self, phase: Phase, action_name: str) -> None:
+        self.action_stats[action_name].add(self.lap(phase, 'apply', action_name))
+
+    def record_available_actions(self, result_size: int, seconds: float) -> None:
+        self.available_actions_stats.add(seconds)
+        self.available_actions_sizes[result_size] += 1
+        self._nested.append(('GameState.get_available_actions', seconds))
+
+    # ----- Export -----
+    def summary(self) -> dict:
+        calls = self.available_actions_stats.count
+        return {'phases': {name: {'total_ms': round(seconds * 1000, 3)} for name, seconds in self.phase_seconds.items()},
+                'actions': {name: stat.as_dict() for name, stat in self.action_stats.items()},
+                'decisions': {f'player_{idx}': stat.as_dict() for idx, stat in self.decision_stats.items()},
+                'available_actions': self.available_actions_stats.as_dict() | {
+                    'mean_size': round(sum(size * cnt for size, cnt in self.available_actions_sizes.items()) / calls, 2)
+                    if calls else 0,
+                    'max_size': max(self.available_actions_sizes, default=0)}}
+
+    def write_summary(self, file_path: str | Path) -> None:
+        write_json_to_file(file_path, self.summary())
+
+    def write_folded_stacks(self, file_path: str | Path) -> None:
+        """One 'frame;frame;frame microseconds' line per stack; feed to flamegraph.pl or speedscope"""
+        lines = [f'{stack} {round(us)}' for stack, us in sorted(self.folded_stacks.items()) if round(us)]
+        Path(file_path).write_text('\n'.join(lines) + '\n', encoding='utf-8')
@@ -8,17 +8,18 @@ from renderer_pygame.scenes.play_scene import PlayScene
 
 class MyGame(Game):
     def __init__(self, card_univ: CardUniverse):
-        super().__init__(width=1500, height=900, title="Magicnacki")
+        super().__init__(width=1500, height=900, title="Magicnacki", use_dirty_rects=True,
+                         use_idle_wait=True)
 
         self.card_univ = card_univ
 
-        # Register scenes
+        # Register scenes; the menu preloads the others in the background
         self.scenes.add_scene("menu", MenuScene(self))
-        self.scenes.add_scene("build_deck", BuildDeckScene(self))
-        self.scenes.add_scene("play", PlayScene(self))
+        self.scenes.register_scene("build_deck", BuildDeckScene)
+        self.scenes.register_scene("play", PlayScene)
         self.scenes.set_scene("menu", use_fade=False)  # Start in menu
 
-        self.scenes.load_transition_sound("assets/a_Major_7_Sharp_11.mp3")
+        self.scenes.load_transition_sound("assets/a_Major_7_Sharp_11.mp3", in_background=True)
 
 
 if __name__ == "__main__":
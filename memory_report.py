@@ -0,0 +1,86 @@
+"""Where a running game's memory goes: bytes per zone & per card instance, plus tracemalloc's view of the process.
+Card props (the shared Card objects from the universe) aren't counted against a game, as every game shares them"""
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from enum import Enum
+from weakref import ProxyTypes
+
+from build_deck import GameCard
+from card import Card
+from game_state import GameState
+
+
+def deep_size(obj, seen: set[int]) -> int:
+    """sys.getsizeof, summed over everything obj refers to that isn't already in seen, shared card props, enums,
+    or a GameState (zones are measured separately)"""
+    stack, size = [obj], 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, (Card, GameState, Enum, type)) or type(o) in ProxyTypes:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif hasattr(o, '__dict__'):
+            stack.append(o.__dict__)
+    return size
+
+
+@dataclass
+class MemoryReport:
+    zone_bytes: dict[str, int]
+    card_instance_cnt: int
+    bytes_per_card_instance: float
+    history_len: int
+    traced_bytes: int | None = None  # current & peak bytes, if tracemalloc is tracing
+    traced_peak_bytes: int | None = None
+    top_allocations: list[tuple[str, int]] = field(default_factory=list)  # 'file:line': bytes
+
+
+def zone_sizes(gs: GameState) -> dict[str, int]:
+    """Cards are attributed to the first zone they're found in, so history only counts what it alone keeps alive"""
+    seen: set[int] = set()
+    return {
+        'libraries': deep_size([d.cards for d in gs.decks], seen),
+        'hands': deep_size([h.cards for h in gs.hands], seen),
+        'boards': deep_size(gs.boards, seen),
+        'graveyards': deep_size(gs.graveyards, seen),
+        'action_stack': deep_size(gs.action_stack, seen),
+        'combats': deep_size(gs.combats, seen),
+        'history': deep_size(gs.game_history, seen),
+        'redo_history': deep_size(gs.redo_history, seen),
+    }
+
+
+def memory_report(gs: GameState, top_cnt: int = 10) -> MemoryReport:
+    # snapshot first, so that the walk below doesn't show up in it
+    snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+    zone_bytes = zone_sizes(gs)
+    cards = [c for d in gs.decks for c in d.cards]
+    cards += [c for h in gs.hands for c in h.cards]
+    cards += [c for b in gs.boards for c in b.cards]
+    cards += [c for g in gs.graveyards for c in g if isinstance(c, GameCard)]
+    seen: set[int] = set()
+    card_bytes = sum(deep_size(c, seen) for c in cards)
+    report = MemoryReport(zone_bytes, len(cards), card_bytes / len(cards) if cards else 0.0, len(gs.game_history))
+    if snapshot:
+        report.traced_bytes, report.traced_peak_bytes = tracemalloc.get_traced_memory()
+        stats = snapshot.statistics('lineno')[:top_cnt]
+        report.top_allocations = [(f'{s.traceback[0].filename}:{s.traceback[0].lineno}', s.size) for s in stats]
+    return report
+
+
+def format_report(report: MemoryReport) -> str:
+    lines = [f'{"zone":<14}{"bytes":>12}']
+    lines += [f'{zone:<14}{size:>12,}' for zone, size in report.zone_bytes.items()]
+    lines.append(f'{report.card_instance_cnt} card instances, {report.bytes_per_card_instance:,.0f} bytes each; '
+                 f'{report.history_len} moves in history')
+    if report.traced_bytes is not None:
+        lines.append(f'tracemalloc: {report.traced_bytes:,} bytes now, {report.traced_peak_bytes:,} at peak')
+        lines += [f'  {size:>12,}  {site}' for site, size in report.top_allocations]
+    return '\n'.join(lines)
@@ -2,7 +2,8 @@ from abc import ABC, abstractmethod
 from contextlib import suppress
 from dataclasses import dataclass
 
-from game_state import Action, GameState
+from game_state import (Action, AssignBlocker, BeginCombat, CreatureAttack, FinishDeclaringAttackers, GameState,
+                        PlayLand, PlayNonBasicLandToBoard)
 
 
 @dataclass
@@ -15,6 +16,33 @@ class Player(ABC):
     def make_move(self, gs: GameState):
         ...
 
+    def default_move(self, gs: GameState) -> Action:
+        """Played on the player's behalf when they miss a move deadline; passing the turn is always available"""
+        return gs.get_available_actions(self.idx)[0]
+
+
+@dataclass
+class AsyncPlayer(Player):
+    """A player whose moves are awaited rather than blocked on, ex: a remote client or a UI waiting on a click"""
+    def make_move(self, gs: GameState):
+        raise NotImplementedError("An AsyncPlayer's moves must be awaited with make_move_async")
+
+    @abstractmethod
+    async def make_move_async(self, gs: GameState) -> Action:
+        ...
+
+
+def decide_move(player: Player, gs: GameState) -> Action:
+    """Module-level, so that it can be shipped to a thread pool"""
+    return player.make_move(gs)
+
+
+def decide_move_key(player: Player, gs: GameState) -> tuple[str, str]:
+    """For a bot deciding on a copy of the game state (a process pool's, or a thread's under a move deadline): the
+    chosen action weakly references that copy, so it's identified by its type & description instead"""
+    action = player.make_move(gs)
+    return type(action).__name__, repr(action)
+
 
 @dataclass
 class ConsolePlayer(Player):
@@ -27,3 +55,22 @@ class ConsolePlayer(Player):
         with suppress(KeyboardInterrupt):
             sel_action: int = int(input("Please select an action "))
             return avail_actions[sel_action]
+
+
+@dataclass
+class GreedyBot(Player):
+    """Plays a land, then its most expensive permanent, attacks with everything and blocks wherever it can"""
+    is_bot: bool = True
+
+    PRIORITIES = (PlayLand, PlayNonBasicLandToBoard, BeginCombat, CreatureAttack, FinishDeclaringAttackers,
+                  AssignBlocker)
+
+    def make_move(self, gs: GameState) -> Action:
+        avail_actions = gs.get_available_actions(self.idx)
+        for action_type in self.PRIORITIES:
+            candidates = [a for a in avail_actions if isinstance(a, action_type)]
+            if candidates:
+                if action_type is PlayNonBasicLandToBoard:
+                    return max(candidates, key=lambda a: a.card.props.casting_weight)
+                return candidates[0]
+        return self.default_move(gs)
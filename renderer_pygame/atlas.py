@@ -0,0 +1,116 @@
+"""Card images packed into a few large sheets, so that a screen full of cards is a handful of surfaces (and files)
+instead of one per card. Built offline with Pillow:
+
+    python -m renderer_pygame.atlas assets/images assets/atlas --size 200x285
+
+index.json maps 'slug/set_code' to [sheet idx, x, y, w, h]; Atlas blits those sub-rects straight from the sheets"""
+import argparse
+from pathlib import Path
+
+import pygame as pg
+from PIL import Image
+
+from file_utils import read_json_file, write_json_to_file
+from renderer_pygame.image_store import ImageStore
+
+INDEX_NAME = 'index.json'
+SHEET_SIZE = (2048, 2048)  # ~70 cards at 200x285 per sheet; 16MB each once decoded
+
+AtlasRect = tuple[int, int, int, int, int]  # sheet idx, x, y, w, h
+
+
+def shelf_pack(sizes: dict[str, tuple[int, int]], sheet_size: tuple[int, int],
+               padding: int = 1) -> dict[str, AtlasRect]:
+    """Places rects left to right on shelves, tallest first, starting a new shelf when a row is full and a new
+    sheet when a sheet is. Equal sizes (the usual case for cards) pack into a plain grid"""
+    rects = {}
+    sheet_idx, x, y, shelf_h = 0, 0, 0, 0
+    for key, (w, h) in sorted(sizes.items(), key=lambda kv: (-kv[1][1], kv[0])):
+        if w > sheet_size[0] or h > sheet_size[1]:
+            raise ValueError(f"{key} ({w}x{h}) doesn't fit on a {sheet_size[0]}x{sheet_size[1]} sheet")
+        if x + w > sheet_size[0]:  # next shelf
+            x, y, shelf_h = 0, y + shelf_h + padding, 0
+        if y + h > sheet_size[1]:  # next sheet
+            sheet_idx, x, y, shelf_h = sheet_idx + 1, 0, 0, 0
+        rects[key] = (sheet_idx, x, y, w, h)
+        x += w + padding
+        shelf_h = max(shelf_h, h)
+    return rects
+
+
+def build_atlas(images_path: str | Path, atlas_path: str | Path, size: tuple[int, int],
+                sheet_size: tuple[int, int] = SHEET_SIZE) -> dict:
+    """Resizes every card image under images_path to size and packs them into sheets under atlas_path. Printings
+    that share art share a rect"""
+    atlas_path = Path(atlas_path)
+    sources = ImageStore(images_path).sources()
+    unique_rects = shelf_pack({str(p): size for p in set(sources.values())}, sheet_size)
+    sheet_cnt = max((r[0] for r in unique_rects.values()), default=-1) + 1
+    sheets = [Image.new('RGB', sheet_size) for _ in range(sheet_cnt)]
+    for src_path, (sheet_idx, x, y, w, h) in unique_rects.items():
+        with Image.open(src_path) as image:
+            sheets[sheet_idx].paste(image.convert('RGB').resize((w, h), Image.Resampling.LANCZOS), (x, y))
+    rects = {key: unique_rects[str(src_path)] for key, src_path in sources.items()}
+    atlas_path.mkdir(parents=True, exist_ok=True)
+    sheet_names = []
+    for i, sheet in enumerate(sheets):
+        sheet_names.append(f'sheet_{i}.png')
+        sheet.save(atlas_path / sheet_names[-1])
+    index = {'size': list(size), 'sheets': sheet_names, 'rects': {k: list(r) for k, r in rects.items()}}
+    write_json_to_file(atlas_path / INDEX_NAME, index)
+    return index
+
+
+class Atlas:
+    """Sheets are loaded (on the main thread) the first time one of their cards is drawn"""
+
+    def __init__(self, atlas_path: str | Path):
+        self.atlas_path = Path(atlas_path)
+        index = read_json_file(self.atlas_path / INDEX_NAME)
+        self.size: tuple[int, int] = tuple(index['size'])
+        self.sheet_names: list[str] = index['sheets']
+        self.rects: dict[str, AtlasRect] = {k: tuple(r) for k, r in index['rects'].items()}
+        self._sheets: list[pg.Surface | None] = [None] * len(self.sheet_names)
+
+    @classmethod
+    def load(cls, atlas_path: str | Path) -> "Atlas | None":
+        """The atlas at atlas_path, or None if one hasn't been built"""
+        return cls(atlas_path) if (Path(atlas_path) / INDEX_NAME).is_file() else None
+
+    def has(self, slug: str, set_code: str) -> bool:
+        return f'{slug}/{set_code}' in self.rects
+
+    def sheet(self, sheet_idx: int) -> pg.Surface:
+        if self._sheets[sheet_idx] is None:
+            surf = pg.image.load(str(self.atlas_path / self.sheet_names[sheet_idx]))
+            self._sheets[sheet_idx] = surf.convert() if pg.display.get_surface() is not None else surf
+        return self._sheets[sheet_idx]
+
+    def blit(self, surface: pg.Surface, slug: str, set_code: str, pos: tuple[float, float]) -> pg.Rect:
+        sheet_idx, x, y, w, h = self.rects[f'{slug}/{set_code}']
+        return surface.blit(self.sheet(sheet_idx), pos, pg.Rect(x, y, w, h))
+
+    def subsurface(self, slug: str, set_code: str) -> pg.Surface:
+        """Shares the sheet's pixels; for callers that need a Surface rather than a blit"""
+        sheet_idx, x, y, w, h = self.rects[f'{slug}/{set_code}']
+        return self.sheet(sheet_idx).subsurface(pg.Rect(x, y, w, h))
+
+
+def parse_size(text: str) -> tuple[int, int]:
+    w, h = text.lower().split('x')
+    return int(w), int(h)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Pack card images into texture atlas sheets')
+    parser.add_argument('images_path')
+    parser.add_argument('atlas_path')
+    parser.add_argument('--size', type=parse_size, default=(200, 285), help='card size in the atlas, as WxH')
+    parser.add_argument('--sheet-size', type=parse_size, default=SHEET_SIZE)
+    args = parser.parse_args()
+    index = build_atlas(args.images_path, args.atlas_path, args.size, args.sheet_size)
+    print(f"Packed {len(index['rects'])} images into {len(index['sheets'])} sheets at {args.atlas_path}")
+
+
+if __name__ == '__main__':
+    main()
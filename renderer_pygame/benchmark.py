@@ -0,0 +1,124 @@
+"""Runs each scene headless for a number of frames, with scripted input (carousel scrolling, filter toggling, table
+scrolling), and prints frame-time statistics; for catching renderer regressions without a display.
+
+    python -m renderer_pygame.benchmark --frames 600 --max-p95-ms 8"""
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # before pygame is imported; no window, no display needed
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame as pg
+
+from card import CardUniverse
+from renderer_pygame.config import COLOR_DICT
+from renderer_pygame.frame_profiler import FrameProfiler
+from renderer_pygame.game import Game
+from renderer_pygame.scenes.build_deck_scene import BuildDeckScene
+from renderer_pygame.scenes.menu_scene import MenuScene
+from renderer_pygame.scenes.play_scene import PlayScene
+from renderer_pygame.scenes.scene_abc import Scene
+
+CARD_DATA_PATH = Path(__file__).parent.parent / 'gatherer' / 'card_data.json'
+DECK_CARD_CNT = 12  # in the deck builder's deck, so its table has rows to scroll
+
+Script = Callable[[Scene, int], list[pg.event.Event]]  # the scene & frame index -> events to post before the frame
+
+
+def click(pos: tuple[int, int]) -> pg.event.Event:
+    return pg.event.Event(pg.MOUSEBUTTONDOWN, button=1, pos=pos)
+
+
+def no_input(scene: Scene, frame_idx: int) -> list[pg.event.Event]:
+    return []
+
+
+def build_deck_input(scene: BuildDeckScene, frame_idx: int) -> list[pg.event.Event]:
+    """Scrolls the carousel right for 120 frames then back left, toggles a color off & on every 60 frames, and
+    scrolls the table every 40"""
+    events = []
+    if frame_idx % 12 == 0:
+        btn = scene.img_carousel.right_btn if frame_idx % 240 < 120 else scene.img_carousel.left_btn
+        events.append(click(btn.rect.center))
+    if frame_idx % 60 == 30:
+        color_letters = list(COLOR_DICT)
+        box = scene.color_boxes[color_letters[frame_idx // 120 % len(color_letters)]]
+        events.append(click(box.rect.center))
+    if frame_idx % 40 == 20:
+        pg.mouse.set_pos(scene.table.table_rect.center)
+        events.append(pg.event.Event(pg.MOUSEWHEEL, x=0, y=-1 if frame_idx % 160 < 80 else 1))
+    return events
+
+
+SCENES: dict[str, tuple[type[Scene], Script]] = {
+    'menu': (MenuScene, no_input),
+    'build_deck': (BuildDeckScene, build_deck_input),
+    'play': (PlayScene, no_input),
+}
+
+
+def run_benchmark(game: Game, scene_names: list[str], frame_cnt: int, warmup_cnt: int = 30) -> FrameProfiler:
+    """game needs a card_univ. Each scene gets warmup_cnt unmeasured frames first, for its images to load"""
+    game.profiler = FrameProfiler(window=frame_cnt)
+    game.fps = 0  # don't wait between frames
+    for name in scene_names:
+        scene_cls, script = SCENES[name]
+        scene = scene_cls(game)
+        if isinstance(scene, BuildDeckScene):
+            for card_image in scene.images[:DECK_CARD_CNT]:
+                scene.deck_builder.add_card(game.card_univ[card_image.slug])
+        game.scenes.add_scene(name, scene)
+        game.scenes.set_scene(name, use_fade=False)
+        for frame_idx in range(warmup_cnt + frame_cnt):
+            if frame_idx == warmup_cnt:
+                game.profiler.clear(game.active_scene_name)
+            for event in script(scene, frame_idx):
+                pg.event.post(event)
+            game.step()
+    return game.profiler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run each scene headless with scripted input and report frame times')
+    parser.add_argument('--scenes', nargs='*', choices=list(SCENES), default=list(SCENES))
+    parser.add_argument('--frames', type=int, default=600, help='measured frames per scene')
+    parser.add_argument('--warmup', type=int, default=30, help='unmeasured frames per scene, first')
+    parser.add_argument('--sets', nargs='*', default=['4E'])
+    parser.add_argument('--card-data', type=Path, default=CARD_DATA_PATH)
+    parser.add_argument('--images', default='assets/images')
+    parser.add_argument('--thumbnails', default='assets/thumbnails')
+    parser.add_argument('--atlas', default='assets/atlas')
+    parser.add_argument('--pack', default='assets/images.pack')
+    parser.add_argument('--full-redraw', action='store_true', help='redraw the whole screen every frame')
+    parser.add_argument('--json', type=Path, help='also write the statistics here')
+    parser.add_argument('--max-p95-ms', type=float, help="exit with 1 if any scene's p95 frame time is over this")
+    args = parser.parse_args()
+
+    game = Game(1500, 900, 'benchmark', images_path=args.images, thumbnails_path=args.thumbnails,
+                atlas_path=args.atlas, pack_path=args.pack, use_dirty_rects=not args.full_redraw)
+    game.card_univ = CardUniverse(args.sets, file_path=str(args.card_data))
+    profiler = run_benchmark(game, args.scenes, args.frames, args.warmup)
+    game.image_cache.close()
+    if game.image_cache.pack:
+        game.image_cache.pack.close()
+    pg.quit()
+
+    print(profiler.format_report())
+    report = profiler.report()
+    if args.json:
+        args.json.write_text(json.dumps({scene_name: {phase: asdict(stats) for phase, stats in stats_by_phase.items()}
+                                         for scene_name, stats_by_phase in report.items()}, indent=2))
+    if args.max_p95_ms is not None:
+        slow = [name for name, stats_by_phase in report.items() if stats_by_phase['frame'].p95 > args.max_p95_ms]
+        if slow:
+            print(f"p95 frame time over {args.max_p95_ms} ms: {', '.join(slow)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
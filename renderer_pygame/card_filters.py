@@ -0,0 +1,80 @@
+"""Which cards the deck builder shows. Every filterable property is indexed once as bitsets over the card list (bit i
+is cards[i]), so applying a filter is a handful of ORs & ANDs, and it's only applied when the filter changes"""
+from collections import defaultdict
+from dataclasses import dataclass
+
+from card import Card
+from renderer_pygame.config import COLOR_DICT
+
+
+@dataclass(frozen=True)
+class CardFilter:
+    """Empty sets don't filter; colors match a card if any of its colors is in them"""
+    colors: frozenset[str] = frozenset(COLOR_DICT)
+    creatures_only: bool = False
+    card_types: frozenset[str] = frozenset()
+    rarities: frozenset[str] = frozenset()
+    set_codes: frozenset[str] = frozenset()
+    max_casting_weight: int | None = None
+    text: str = ''  # in the name, types or rules text; case-insensitive
+
+
+class CardFilterIndex:
+    def __init__(self, cards: list[Card]):
+        self.cards = cards
+        self.by_color: dict[str, int] = defaultdict(int)
+        self.by_type: dict[str, int] = defaultdict(int)
+        self.by_rarity: dict[str, int] = defaultdict(int)
+        self.by_set: dict[str, int] = defaultdict(int)
+        self.by_casting_weight: dict[int, int] = defaultdict(int)
+        for i, card in enumerate(cards):
+            bit = 1 << i
+            for color in card.colors:
+                self.by_color[color] |= bit
+            for card_type in card.card_types:
+                self.by_type[card_type] |= bit
+            self.by_rarity[card.rarity] |= bit
+            for set_code in card.set_codes:
+                self.by_set[set_code] |= bit
+            self.by_casting_weight[card.casting_weight] |= bit
+        self._search_text = [' '.join([c.name, *c.card_types, c.oracle_rules_text or c.rules_text or '']).lower()
+                             for c in cards]
+        self._last: tuple[CardFilter, list[int]] | None = None
+
+    def bits(self, card_filter: CardFilter) -> int:
+        bits = _union(self.by_color, card_filter.colors)
+        if card_filter.creatures_only:
+            bits &= self.by_type['Creature']
+        if card_filter.card_types:
+            bits &= _union(self.by_type, card_filter.card_types)
+        if card_filter.rarities:
+            bits &= _union(self.by_rarity, card_filter.rarities)
+        if card_filter.set_codes:
+            bits &= _union(self.by_set, card_filter.set_codes)
+        if card_filter.max_casting_weight is not None:
+            bits &= _union(self.by_casting_weight,
+                           [w for w in self.by_casting_weight if w <= card_filter.max_casting_weight])
+        if card_filter.text and bits:
+            needle = card_filter.text.lower()
+            bits &= sum(1 << i for i, text in enumerate(self._search_text) if needle in text)
+        return bits
+
+    def matching(self, card_filter: CardFilter) -> list[int]:
+        """Indices of the cards that pass card_filter, in card order; the last answer is reused until it changes"""
+        if self._last and self._last[0] == card_filter:
+            return self._last[1]
+        bits = self.bits(card_filter)
+        indices = []
+        while bits:  # only visits the set bits; shifting past every clear one would copy the bitset each time
+            low = bits & -bits
+            indices.append(low.bit_length() - 1)
+            bits ^= low
+        self._last = card_filter, indices
+        return indices
+
+
+def _union(bitsets: dict, keys) -> int:
+    bits = 0
+    for key in keys:
+        bits |= bitsets.get(key, 0)
+    return bits
@@ -1,5 +1,7 @@
 import pygame as pg
 
+from renderer_pygame.common.text import Font
+
 class ColoredBoxButton:
     def __init__(self, x, y, color, size=30, checked=True):
         self.rect = pg.Rect(x, y, size, size)
@@ -20,6 +22,8 @@ class ColoredBoxButton:
                 return True  # an event was handled
 
 class Button:
+    FONT = Font('arial', 32)
+
     def __init__(self, x, y, w, h, label):
         self.x = x
         self.y = y
@@ -30,7 +34,7 @@ class Button:
 
     def draw(self, surface):
         pg.draw.rect(surface, (70, 70, 70), self.rect, border_radius=6)
-        label = pg.font.SysFont("arial", 32).render(self.label, True, (220, 220, 220))
+        label = self.FONT.render(self.label, (220, 220, 220))
         label_rect = label.get_rect(center=self.rect.center)
         surface.blit(label, label_rect)
 
@@ -38,6 +42,8 @@ class Button:
         ...
 
 class Toggle:
+    FONT = Font('arial', 14, bold=True)
+
     def __init__(self, x, y, label, label_w=125, slider_w=50, slider_h=30, checked=False):
         self.label_x = x
         self.label_y = y
@@ -53,7 +59,11 @@ class Toggle:
 
     @property
     def pg_label(self):
-        return pg.font.SysFont('arial', 14, bold=True).render(self.label, True, (220, 220, 220))
+        return self.FONT.render(self.label, (220, 220, 220))
+
+    @property
+    def rect(self) -> pg.Rect:
+        return pg.Rect(self.label_x, self.label_y, self.toggle_x - self.label_x + self.slider_w, self.slider_h)
 
     def draw(self, surface):
         surface.blit(self.pg_label, (self.label_x, self.label_y + 10))
@@ -1,9 +1,14 @@
+import math
+
 import pygame as pg
+from renderer_pygame.atlas import Atlas
 from renderer_pygame.common.components import Button
+from renderer_pygame.image_cache import ImageCache
 
 class ImageCarousel:
     def __init__(self, x, y, w, h, img_size: tuple[int, int], visible_cnt: int, carousel_images: list,
-                 img_spacing: int = 15, slide_speed: float = 8.0):
+                 image_cache: ImageCache, atlas: Atlas | None = None, img_spacing: int = 15,
+                 slide_speed: float = 8.0, prefetch_cnt: int | None = None):
         self.x = x
         self.y = y
         self.w = w
@@ -12,6 +17,8 @@ class ImageCarousel:
         self.img_spacing = img_spacing
         self.visible_count = visible_cnt
         self.slide_speed = slide_speed
+        self.prefetch_cnt = visible_cnt if prefetch_cnt is None else prefetch_cnt  # images loaded ahead, each side
+        self.placeholder_surf = pg.Surface(self.img_size)
 
         # Carousel logic
         self.index_offset = 0
@@ -22,27 +29,59 @@ class ImageCarousel:
         self.left_btn = Button(80, self.y + self.img_size[1] // 2 - 25, 50, 50, "<")
         self.right_btn = Button(self.w - 50, self.y + self.img_size[1] // 2 - 25, 50, 50, ">")
 
-        self.images = carousel_images
+        self.images = carousel_images  # each has a slug & set_code; surfaces come from the cache when drawn
+        self.image_cache = image_cache
+        self.atlas = atlas if atlas and atlas.size == tuple(img_size) else None  # only usable at our size
+
+    @property
+    def rect(self) -> pg.Rect:
+        """Everything the carousel draws on, including the buttons & images sliding in from the right"""
+        return pg.Rect(0, self.y, self.x + self.w + self.img_size[0], max(self.h, self.img_size[1]))
+
+    @property
+    def is_animating(self) -> bool:
+        return abs(self.target_offset - self.slide_offset) > 0.5
 
     @property
     def in_focus_idx(self) -> int:
         return self.index_offset + (self.visible_count // 2)
 
+    @property
+    def stride(self) -> int:
+        return self.img_size[0] + self.img_spacing
+
+    def visible_range(self) -> range:
+        """Indices of the images on screen, from slide_offset alone; drawing costs the same for 10 cards or 10,000"""
+        first = math.ceil((-self.img_size[0] - self.x - self.slide_offset) / self.stride)
+        last = math.floor((self.w - self.x - self.slide_offset) / self.stride)
+        return range(max(first, 0), min(last + 1, len(self.images)))
+
+    def prefetch(self, visible: range) -> None:
+        """Asks the cache for the images just off either edge, so they're decoded before they slide in. Called
+        before the visible ones are requested, as the cache serves the newest requests first"""
+        if self.atlas:
+            return
+        for i in (*range(max(visible.start - self.prefetch_cnt, 0), visible.start),
+                  *range(visible.stop, min(visible.stop + self.prefetch_cnt, len(self.images)))):
+            self.image_cache.get(self.images[i].slug, self.images[i].set_code, self.img_size)
+
     def draw(self, surface):
-        total_width = self.img_size[0] * self.visible_count + self.img_spacing * (self.visible_count - 1)
         start_x = self.x
 
         # Draw placeholder spaces at the front of carousel, else can never grab index 0
-        placeholder_card_surf = pg.Surface((self.img_size[0], self.img_size[1]))
         for i in range(self.visible_count // 2):
-            surface.blit(placeholder_card_surf, (start_x - (self.img_spacing - self.img_size[0]) * i, self.y))
-        # Draw all images
-        displayed_card_cnt = 0
-        for card_image in self.images:
-            x = start_x + displayed_card_cnt * (self.img_size[0] + self.img_spacing) + self.slide_offset
-            displayed_card_cnt += 1
-            if -self.img_size[0] <= x <= self.w:
-                surface.blit(card_image.image, (x, self.y))
+            surface.blit(self.placeholder_surf, (start_x - (self.img_spacing - self.img_size[0]) * i, self.y))
+        # Draw the images on screen
+        visible = self.visible_range()
+        self.prefetch(visible)
+        for i in visible:
+            card_image = self.images[i]
+            x = start_x + i * self.stride + self.slide_offset
+            if self.atlas and self.atlas.has(card_image.slug, card_image.set_code):
+                self.atlas.blit(surface, card_image.slug, card_image.set_code, (x, self.y))
+            else:
+                surface.blit(self.image_cache.get(card_image.slug, card_image.set_code, self.img_size),
+                             (x, self.y))
 
         # Carousel buttons
         self.left_btn.draw(surface)
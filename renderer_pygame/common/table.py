@@ -3,68 +3,139 @@ from typing import Any, Self
 
 import pygame as pg
 
-@dataclass
-class Font:
-    name: str
-    size: int
-    bold: bool = False
-    italic: bool = False
+from renderer_pygame.common.text import Font
 
-    def __call__(self, *args, **kwargs):
-        return pg.font.SysFont(self.name, self.size, self.bold, self.italic)
+BG_COLOR = (128, 128, 128)
+TEXT_COLOR = (255, 255, 255)
 
 
 @dataclass
 class Table:
+    """Each row is rendered into its own surface the first time it's in view, and only re-rendered when its values
+    change; rows that never scroll into view are never rendered. The header and the rows in view are composed into one cached surface, which is what gets drawn; it's recomposed on changes and
+    scrolls. Only visible_row_cnt rows are shown at a time (all of them if None); the mouse wheel scrolls"""
     surface: pg.Surface
     x: int
     y: int
     header_height: int
     row_height: int
-    header_font: pg.Font
-    row_font: pg.Font
+    header_font: Font
+    row_font: Font
     column_widths: list[int]
     header_names: list[str]
     rows: list[list[str]] = field(default_factory=list)
-    items_to_blit: list = field(default_factory=list)
+    visible_row_cnt: int | None = None
+    scroll_idx: int = 0  # the first row in view
 
     def __post_init__(self):
         if len(self.column_widths) != len(self.header_names):
             raise ValueError("There must be the same number of column widths as header names; "
                              "use None where you don't want to have a column header")
 
-        # Build header items and keep a copy, so we can restore it when clearing rows
-        self._header_items = []
-        x_pos = self.x
-        for header, col_width in zip(self.header_names, self.column_widths):
-            text = self.header_font.render(header, True, (255, 255, 255))
-            self._header_items.append((text, (x_pos, self.y + 30)))
-            x_pos += col_width
-
-        self.items_to_blit = list(self._header_items)
+        # The header's rendered once; the rows each have a surface (None until they're first in view), in the same
+        # order as self.rows
+        self.rendered_row_cnt = 0  # rows rendered so far; for checking that updates stay incremental
+        self._header_surf = self._render_cells(self.header_names, self.header_font, self.header_height)
+        self._row_surfs: list[pg.Surface | None] = [None] * len(self.rows)
+        self._composed: pg.Surface | None = None
 
     @property
     def row_cnt(self) -> int:
         return len(self.rows)
 
+    @property
+    def shown_row_cnt(self) -> int:
+        return self.row_cnt if self.visible_row_cnt is None else min(self.row_cnt, self.visible_row_cnt)
+
     @property
     def table_rect(self) -> pg.Rect:
         table_width = sum(self.column_widths)
-        table_height = self.header_height + (self.row_height * self.row_cnt) + 60
+        table_height = self.header_height + (self.row_height * (self.shown_row_cnt + 1)) + 30
         return pg.Rect(self.x, self.y, table_width, table_height)
 
+    @property
+    def items_to_blit(self) -> list[tuple[pg.Surface, tuple[int, int]]]:
+        return [(self.composed, (self.x, self.y))]
+
+    @property
+    def composed(self) -> pg.Surface:
+        if self._composed is None:
+            rect = self.table_rect
+            self._composed = pg.Surface(rect.size)
+            self._composed.fill(BG_COLOR)
+            self._composed.blit(self._header_surf, (0, 30))
+            for i in range(self.scroll_idx, self.scroll_idx + self.shown_row_cnt):
+                row_y = self.header_height + (i - self.scroll_idx + 1) * self.row_height + 30
+                if self._row_surfs[i] is None:
+                    self._row_surfs[i] = self._render_row(self.rows[i])
+                self._composed.blit(self._row_surfs[i], (0, row_y))
+        return self._composed
+
+    def draw(self, surface: pg.Surface) -> None:
+        surface.blit(self.composed, (self.x, self.y))
+
     def clear_rows(self) -> None:
         self.rows.clear()
-        self.items_to_blit = list(self._header_items)
+        self._row_surfs.clear()
+        self.scroll_to(0)
 
     def add_row(self, values: list[str]) -> None:
+        self.insert_row(self.row_cnt, values)
+
+    def insert_row(self, idx: int, values: list[str]) -> None:
+        self._check_row(values)
+        self.rows.insert(idx, list(values))
+        self._row_surfs.insert(idx, None)
+        self._composed = None
+
+    def set_row(self, idx: int, values: list[str]) -> None:
+        self._check_row(values)
+        if self.rows[idx] != list(values):
+            self.rows[idx] = list(values)
+            self._row_surfs[idx] = None
+            self._composed = None
+
+    def remove_row(self, idx: int) -> None:
+        del self.rows[idx]
+        del self._row_surfs[idx]
+        self.scroll_to(self.scroll_idx)
+
+    def set_rows(self, rows: list[list[str]]) -> None:
+        """Replaces the rows, keeping the surfaces of the ones that were already in the table"""
+        for values in rows:
+            self._check_row(values)
+        surfs_by_values = {tuple(values): surf for values, surf in zip(self.rows, self._row_surfs) if surf}
+        self._row_surfs = [surfs_by_values.get(tuple(values)) for values in rows]
+        self.rows = [list(values) for values in rows]
+        self.scroll_to(self.scroll_idx)
+
+    def scroll_to(self, idx: int) -> None:
+        max_idx = max(self.row_cnt - self.shown_row_cnt, 0)
+        self.scroll_idx = min(max(idx, 0), max_idx)
+        self._composed = None
+
+    def handle_event(self, event) -> bool:
+        """Returns True if the table scrolled"""
+        if event.type == pg.MOUSEWHEEL and self.table_rect.collidepoint(pg.mouse.get_pos()):
+            prev_scroll_idx = self.scroll_idx
+            self.scroll_to(self.scroll_idx - event.y)
+            return self.scroll_idx != prev_scroll_idx
+        return False
+
+    def _check_row(self, values: list[str]) -> None:
         if len(values) != len(self.header_names):
             raise ValueError("There must be the same number of values as header names; "
                              "use None where you don't want to have a value")
-        self.rows.append(values)
-        x_pos = self.x
-        y_pos = self.y + self.header_height + (self.row_cnt * self.row_height)
-        for i, v in enumerate(values):
-            text = self.row_font.render(v, True, (255, 255, 255))
-            self.items_to_blit.append((text, (x_pos, y_pos + 30)))
-            x_pos += self.column_widths[i]
+
+    def _render_row(self, values: list[str]) -> pg.Surface:
+        self.rendered_row_cnt += 1
+        return self._render_cells(values, self.row_font, self.row_height)
+
+    def _render_cells(self, values: list[str], font: Font, height: int) -> pg.Surface:
+        surf = pg.Surface((sum(self.column_widths), max(height, font().get_linesize())), pg.SRCALPHA)
+        x_pos = 0
+        for v, col_width in zip(values, self.column_widths):
+            if v:
+                surf.blit(font.render(v, TEXT_COLOR), (x_pos, 0))
+            x_pos += col_width
+        return surf
@@ -0,0 +1,61 @@
+"""One pg.font.Font per (name, size, style) for the whole process, and an LRU of rendered text surfaces, so that
+drawing the same label every frame doesn't create a font or a surface"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache
+
+import pygame as pg
+
+TEXT_CACHE_SIZE = 1024  # rendered strings; plenty for every label, table cell & readout on screen at once
+
+
+@cache
+def get_font(name: str, size: int, bold: bool = False, italic: bool = False) -> pg.font.Font:
+    return pg.font.SysFont(name, size, bold, italic)
+
+
+@dataclass(frozen=True)
+class Font:
+    name: str
+    size: int
+    bold: bool = False
+    italic: bool = False
+
+    def __call__(self, *args, **kwargs) -> pg.font.Font:
+        return get_font(self.name, self.size, self.bold, self.italic)
+
+    def render(self, text: str, color, antialias: bool = True) -> pg.Surface:
+        return text_cache.render(self, text, color, antialias)
+
+
+class TextCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._surfaces: OrderedDict[tuple, pg.Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # scenes can be built on a loading thread; see SceneManager.preload
+
+    def render(self, font: Font, text: str, color, antialias: bool = True) -> pg.Surface:
+        """The returned surface is shared; blit it, don't draw on it"""
+        key = (font, text, color if isinstance(color, (str, tuple)) else tuple(color), antialias)
+        with self._lock:
+            surf = self._surfaces.get(key)
+            if surf is not None:
+                self._surfaces.move_to_end(key)
+                self.hits += 1
+                return surf
+            self.misses += 1
+            surf = font().render(text, antialias, color)
+            self._surfaces[key] = surf
+            if len(self._surfaces) > self.max_size:
+                self._surfaces.popitem(last=False)
+            return surf
+
+    def clear(self) -> None:
+        with self._lock:
+            self._surfaces.clear()
+
+
+text_cache = TextCache(TEXT_CACHE_SIZE)
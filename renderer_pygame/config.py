@@ -2,3 +2,7 @@ COLORS_W_COLORLESS = ('R', 'G', 'U', 'B', 'W', 'C')
 COLOR_NAMES = ('brown3', 'darkgreen', 'royalblue1', 'gray23', 'lemonchiffon', 'burlywood4')
 
 COLOR_DICT = {letter: name for letter, name in zip(COLORS_W_COLORLESS, COLOR_NAMES)}
+
+IMAGE_CACHE_BUDGET_MB = 256  # decoded card images kept in memory; least recently drawn are evicted first
+THUMBNAIL_SIZES = ((200, 285),)  # BuildDeckScene.IMG_SIZE; card images are pre-scaled to each of these on disk
+IDLE_WAIT_MS = 500  # longest Game.run sleeps on a still screen before looking at background work again
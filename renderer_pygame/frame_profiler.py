@@ -0,0 +1,118 @@
+"""How long each scene's handle_events, update & draw take, over the last window frames; shown in the corner by Game
+when show_profiler is on (F2), and summarized by benchmark.py"""
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import pygame as pg
+
+from renderer_pygame.common.text import Font
+
+PHASES = ('handle_events', 'update', 'draw', 'frame')  # frame is all of Game.step but the wait for the next frame
+READOUT_FONT = Font('couriernew', 14)  # monospaced, so the columns line up
+READOUT_LINE_HEIGHT = 18
+READOUT_W = 600
+REFRESH_FRAMES = 15  # the overlay's text is re-rendered this often, so it's readable & cheap
+
+
+@dataclass(frozen=True)
+class PhaseStats:
+    """In milliseconds"""
+    cnt: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+    def __str__(self) -> str:
+        return f'p50 {self.p50:6.2f}  p95 {self.p95:6.2f}  p99 {self.p99:6.2f}  max {self.max:6.2f} ms'
+
+
+def percentile(sorted_samples: list[float], pct: float) -> float:
+    """Nearest-rank"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(round(pct / 100 * len(sorted_samples)) - 1, 0)
+    return sorted_samples[min(rank, len(sorted_samples) - 1)]
+
+
+class FrameProfiler:
+    def __init__(self, window: int = 300):
+        self.window = window
+        self.samples: dict[tuple[str, str], deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self._frame_ends: deque[float] = deque(maxlen=self.window)  # perf_counter() at the end of each frame
+        self._readout: pg.Surface | None = None
+        self._frames_since_readout = 0
+
+    @contextmanager
+    def measure(self, scene_name: str, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(scene_name, phase, time.perf_counter() - start)
+
+    def record(self, scene_name: str, phase: str, seconds: float) -> None:
+        self.samples[scene_name, phase].append(seconds * 1000)
+        if phase == 'frame':
+            self._frame_ends.append(time.perf_counter())
+            self._frames_since_readout += 1
+
+    @property
+    def fps(self) -> float:
+        if len(self._frame_ends) < 2:
+            return 0.0
+        return (len(self._frame_ends) - 1) / (self._frame_ends[-1] - self._frame_ends[0])
+
+    @property
+    def scene_names(self) -> list[str]:
+        return list(dict.fromkeys(scene_name for scene_name, _ in self.samples))
+
+    def stats(self, scene_name: str, phase: str) -> PhaseStats | None:
+        samples = sorted(self.samples.get((scene_name, phase), ()))
+        if not samples:
+            return None
+        return PhaseStats(len(samples), sum(samples) / len(samples), percentile(samples, 50),
+                          percentile(samples, 95), percentile(samples, 99), samples[-1])
+
+    def report(self) -> dict[str, dict[str, PhaseStats]]:
+        return {scene_name: {phase: stats for phase in PHASES if (stats := self.stats(scene_name, phase))}
+                for scene_name in self.scene_names}
+
+    def format_report(self) -> str:
+        lines = []
+        for scene_name, stats_by_phase in self.report().items():
+            lines.append(f'{scene_name} ({stats_by_phase["frame"].cnt} frames)' if 'frame' in stats_by_phase
+                         else scene_name)
+            lines.extend(f'  {phase:<14}{stats}' for phase, stats in stats_by_phase.items())
+        return '\n'.join(lines)
+
+    def clear(self, scene_name: str | None = None) -> None:
+        """Only scene_name's timings, if given"""
+        for key in [key for key in self.samples if scene_name in (None, key[0])]:
+            del self.samples[key]
+        self._frame_ends.clear()
+        self._readout = None
+
+    def draw(self, surface: pg.Surface, scene_name: str) -> pg.Rect:
+        """FPS & the scene's phase timings, in the bottom-right corner; opaque, like RenderStats'"""
+        if self._readout is None or self._frames_since_readout >= REFRESH_FRAMES:
+            self._readout = self._render_readout(scene_name)
+            self._frames_since_readout = 0
+        rect = self._readout.get_rect(bottomright=surface.get_rect().bottomright)
+        surface.blit(self._readout, rect)
+        return rect
+
+    def _render_readout(self, scene_name: str) -> pg.Surface:
+        lines = [f'{scene_name}  {self.fps:5.1f} fps']
+        for phase in PHASES:
+            if stats := self.stats(scene_name, phase):
+                lines.append(f'{phase:<14}{stats}')
+        readout = pg.Surface((READOUT_W, READOUT_LINE_HEIGHT * len(lines) + 4))
+        readout.fill((0, 0, 0))
+        font = READOUT_FONT()  # not through text_cache; these strings change every time
+        for i, line in enumerate(lines):
+            readout.blit(font.render(line, True, (0, 255, 0)), (4, 2 + i * READOUT_LINE_HEIGHT))
+        return readout
@@ -1,16 +1,26 @@
 import os
 import sys
-from pathlib import Path
+import time
 
 import pygame as pg
 
+from renderer_pygame.atlas import Atlas
+from renderer_pygame.config import IDLE_WAIT_MS, IMAGE_CACHE_BUDGET_MB, THUMBNAIL_SIZES
+from renderer_pygame.frame_profiler import FrameProfiler
+from renderer_pygame.image_cache import ImageCache
+from renderer_pygame.image_pack import ImagePack
+from renderer_pygame.render_stats import RenderStats
+from renderer_pygame.thumbnails import ThumbnailCache
 from renderer_pygame.scenes.scene_manager import SceneManager
 
 
 class Game:
     """A generic game shell using pygame-ce."""
 
-    def __init__(self, width=800, height=600, title="My Game", fps=60, images_path: str = 'assets/images'):
+    def __init__(self, width=800, height=600, title="My Game", fps=60, images_path: str = 'assets/images',
+                 thumbnails_path: str = 'assets/thumbnails', atlas_path: str = 'assets/atlas',
+                 pack_path: str = 'assets/images.pack', use_dirty_rects: bool = False,
+                 use_idle_wait: bool = False):
         pg.init()
         pg.mixer.init()  # 🔊 ensure mixer is ready
         self.width = width
@@ -22,57 +32,27 @@ class Game:
         self.screen = pg.display.set_mode((self.width, self.height))
         pg.display.set_caption(self.title)
         self.clock = pg.time.Clock()
+        # redraw & update only the parts of the screen that scenes mark dirty, instead of everything every frame
+        self.use_dirty_rects = use_dirty_rects
+        self.render_stats = RenderStats(self.width * self.height)
+        self.show_render_stats = False  # F3
+        self.profiler = FrameProfiler()  # per-scene handle_events / update / draw timings
+        self.show_profiler = False  # F2
+        # when nothing is animating or dirty, sleep until an event instead of running frames at fps; see Scene
+        self.use_idle_wait = use_idle_wait
 
         # Game state
         self.running = True
         self.paused = False
         self.scenes = SceneManager(self)
 
-        # 🖼️ Store loaded images here
-        self.images = {}
-
-        # Auto-load all images in a given folder
-        self.load_images(images_path)
-
-    # -----------------------------------------------------------------
-    # Image loader
-    # -----------------------------------------------------------------
-    def load_images(self, folder_path: str | Path, recursive: bool = True):
-        """Loads images into a nested dictionary structure that mirrors the folder tree."""
-        folder = Path(folder_path)
-        valid_exts = {".png", ".jpg", ".jpeg", ".gif"}
-
-        if not folder.exists():
-            print(f"[Warning] Image folder not found: {folder}")
-            return
-
-        def insert_nested(struct: dict, parts: list[str], image_obj):
-            """Recursively insert image_obj into struct following the parts list."""
-            part = parts[0]
-            if len(parts) == 1:
-                name = Path(part).stem
-                struct[name] = image_obj
-            else:
-                if part not in struct:
-                    struct[part] = {}
-                insert_nested(struct[part], parts[1:], image_obj)
-
-        # Choose iteration strategy
-        files = folder.rglob("*") if recursive else folder.glob("*")
-
-        for file_path in files:
-            if file_path.suffix.lower() in valid_exts and file_path.is_file():
-                relative_parts = file_path.relative_to(folder).parts
-                try:
-                    image = pg.image.load(str(file_path)).convert_alpha()
-                    insert_nested(self.images, list(relative_parts), image)
-                except Exception as e:
-                    print(f"[Error] Failed to load image {file_path.name}: {e}")
-
-        print(f"[Info] Loaded images from {folder}")
-
-        for k, v in self.images.items():
-            print(k, v)
+        # 🖼️ Card images are loaded the first time they're drawn; see image_cache.py
+        # Thumbnails missing from disk are built in the background; until then, images are scaled as they load
+        self.thumbnails = ThumbnailCache(images_path, thumbnails_path, THUMBNAIL_SIZES)
+        self.thumbnails.build_in_background()
+        self.image_cache = ImageCache(images_path, IMAGE_CACHE_BUDGET_MB * 1024 * 1024, self.thumbnails,
+                                      ImagePack.open(pack_path))  # None until built; see image_pack.py
+        self.atlas = Atlas.load(atlas_path)  # None until built; see atlas.py
 
     # -------------------------------------------------------------------------
     # Lifecycle hooks — override these in subclasses
@@ -108,27 +88,89 @@ class Game:
     # -------------------------------------------------------------------------
     # Main loop
     # -------------------------------------------------------------------------
-    def run(self):
-        while self.running:
+    @property
+    def is_idle(self) -> bool:
+        """Nothing will change until there's an event: no scene is animating or has anything to redraw, and no images
+        are waiting to be pumped"""
+        if self.paused:
+            return True
+        return not self.scenes.needs_redraw and not self.image_cache.is_loading
+
+    def wait_for_events(self) -> list[pg.event.Event]:
+        """Blocks until there's an event, or IDLE_WAIT_MS passes, so background work (ex: thumbnails) is still noticed"""
+        event = pg.event.wait(IDLE_WAIT_MS)
+        events = [] if event.type == pg.NOEVENT else [event]
+        return events + pg.event.get()
+
+    @property
+    def active_scene_name(self) -> str:
+        return type(self.scenes.active_scene).__name__ if self.scenes.active_scene else ''
+
+    def step(self) -> None:
+        """One frame: waits for it (or, with use_idle_wait on a still screen, for an event), then handles events,
+        updates & draws. run() calls this until running is False; benchmark.py calls it directly"""
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        is_animating = self.scenes.is_animating
+        if self.use_idle_wait and self.is_idle:
+            events = self.wait_for_events()
+            self.clock.tick()  # time spent waiting isn't animation time
+            dt = 0.0
+        else:
             dt = self.clock.tick(self.fps) / 1000.0
             events = pg.event.get()
+        frame_start = time.perf_counter()
+        scene_name = self.active_scene_name
 
-            # Global event handling
-            for event in events:
-                if event.type == pg.QUIT:
-                    self.running = False
-                elif event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE:
-                    self.running = False
-
-            # Delegate to active scene
-            if not self.paused and self.scenes.active_scene:
+        # Global event handling
+        for event in events:
+            if event.type == pg.QUIT:
+                self.running = False
+            elif event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE:
+                self.running = False
+            elif event.type == pg.KEYDOWN and event.key in (pg.K_F2, pg.K_F3):
+                if event.key == pg.K_F2:
+                    self.show_profiler = not self.show_profiler
+                else:
+                    self.show_render_stats = not self.show_render_stats
+                if self.scenes.active_scene:
+                    self.scenes.active_scene.mark_dirty()
+
+        if self.image_cache.pump() and self.scenes.active_scene:
+            self.scenes.active_scene.on_images_ready()
+
+        # Delegate to active scene
+        rects = []
+        if not self.paused and self.scenes.active_scene:
+            with self.profiler.measure(scene_name, 'handle_events'):
                 self.scenes.handle_events(events)
+            with self.profiler.measure(scene_name, 'update'):
                 self.scenes.update(dt)
-                self.scenes.draw()
-
+            if self.scenes.needs_redraw or not self.use_idle_wait:
+                with self.profiler.measure(scene_name, 'draw'):
+                    rects = self.scenes.draw()
+        self.render_stats.record(rects)
+        if self.show_render_stats:
+            rects.append(self.render_stats.draw(self.screen))
+        if self.show_profiler:
+            rects.append(self.profiler.draw(self.screen, scene_name))
+
+        if self.use_dirty_rects:
+            pg.display.update(rects)
+        elif rects or not self.use_idle_wait:
             pg.display.flip()
+        self.profiler.record(scene_name, 'frame', time.perf_counter() - frame_start)
+        self.render_stats.record_cpu(is_animating, time.process_time() - cpu_start,
+                                     time.perf_counter() - wall_start)
+
+    def run(self):
+        while self.running:
+            self.step()
 
+        if self.show_render_stats:
+            print(self.render_stats.cpu_report)
         self.on_quit()
+        self.image_cache.close()
+        if self.image_cache.pack:
+            self.image_cache.pack.close()
         pg.quit()
         sys.exit()
-
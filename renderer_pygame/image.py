@@ -1,46 +1,167 @@
-#  a module to create images from website links
+"""Downloads every card's image into the image store, as a pipeline: a thread pool of pooled HTTP sessions fetches
+images, a process pool decodes, hashes & re-encodes them, and the main thread writes them. Printings already in the
+store are skipped and the aliases are checkpointed as it goes, so an interrupted run picks up where it left off.
+
+    python -m renderer_pygame.image --sizes 200x285"""
+import argparse
+import itertools
+import multiprocessing
+import threading
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
 
 from file_utils import read_json_file
+from renderer_pygame.atlas import parse_size
+from renderer_pygame.image_store import ImageStore, pixel_hash
+from renderer_pygame.thumbnails import ThumbnailCache
 from PIL import Image
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+URL_FILE_PATH = Path(__file__).parent.parent / 'gatherer' / 'card_data.json'
+OUTPUT_PATH = Path(__file__).parent / 'assets' / 'images'
+THUMBNAILS_PATH = Path(__file__).parent / 'assets' / 'thumbnails'
+
+_sessions = threading.local()  # one Session (and its connection pool) per download thread
 
-# TODO: get these into an .env file
-URL_FILE_PATH = Path('/Users/Bernacki_Laptop/PycharmProjects/magicnacki/gatherer/card_data.json')
-OUTPUT_PATH = Path('/Users/Bernacki_Laptop/PycharmProjects/magicnacki/renderer_pygame/assets/images/')
 
-OUTPUT_EXTENSION = '.jpg'
+def get_session(pool_size: int = 4) -> requests.Session:
+    session = getattr(_sessions, 'session', None)
+    if session is None:
+        session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _sessions.session = session
+    return session
 
-def get_bytes_from_url(url: str):
-    return requests.get(url).content
 
+def get_bytes_from_url(url: str, timeout: float = 30.0):
+    response = get_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
 
-def create_image_object(bytes_obj: bytes, is_output_jpg: bool = True) -> Image:
+
+def transcode(bytes_obj: bytes) -> tuple[str, bytes]:
+    """Runs in a worker process: returns the image's pixel hash, and its bytes as a JPEG (as downloaded, if it
+    already was one)"""
     image = Image.open(BytesIO(bytes_obj))
-    if is_output_jpg:
-        image = image.convert("RGB")  # JPG doesn't support transparency
-    return image
+    is_jpeg = image.format == 'JPEG'
+    image = image.convert("RGB")
+    if is_jpeg:
+        return pixel_hash(image), bytes_obj
+    buffer = BytesIO()
+    image.save(buffer, "JPEG")
+    return pixel_hash(image), buffer.getvalue()
 
 
-def save_image_file(image_object: Image, file_path_dir: Path, file_name: str, file_ext: str = '.jpg') -> None:
-    """Accepts a Pillow Image, creates a .jpg file, and saves it to a Path directory / file_name.file_ext """
-    # TODO: "JPEG" is hard-coded; not sure what other file types Pillow can save as ...
-    output_path = file_path_dir / f'{file_name}{file_ext}'
-    output_path.parent.mkdir(exist_ok=True)
-    image_object.save(output_path, "JPEG")
+@dataclass
+class PipelineStats:
+    downloaded: int = 0
+    stored: int = 0  # new unique images
+    aliased: int = 0  # printings whose art was already stored
+    skipped: int = 0  # printings already in the store before this run
+    failed: int = 0
 
 
-if __name__ == '__main__':
-    if input("Are you sure you want to create all these image files? (Y/n) ") != 'Y':
+def download_images(card_data: dict[str, dict[str, dict]], output_path: str | Path = OUTPUT_PATH,
+                    set_codes: list[str] | None = None, download_workers: int = 8, encode_workers: int | None = None,
+                    checkpoint_every: int = 50, max_in_flight: int | None = None,
+                    verbose: bool = True) -> PipelineStats:
+    """card_data is card_data.json's layout: {set_code: {slug: {'img_url': ...}}}. At most max_in_flight images
+    (2 per download worker by default) are downloading or encoding at once, so downloads can't outrun the encoders
+    and pile up in memory"""
+    store = ImageStore(output_path)
+    stats = PipelineStats()
+    printings_by_url: dict[str, list[tuple[str, str]]] = defaultdict(list)  # printings sharing a URL share art
+    for set_code, set_data in card_data.items():
+        if set_codes and set_code not in set_codes:
+            continue
+        for slug, card in set_data.items():
+            if store.has(slug, set_code):
+                stats.skipped += 1
+            else:
+                printings_by_url[card['img_url']].append((slug, set_code))
+    total = len(printings_by_url)
+    if not total:
+        return stats
+
+    def log(message: str) -> None:
+        if verbose:
+            print(f'[{finished_cnt}/{total}] {message}')
+
+    # spawn, not fork: the download threads may be mid-request when the first worker starts
+    with ThreadPoolExecutor(download_workers) as downloads, \
+            ProcessPoolExecutor(encode_workers, mp_context=multiprocessing.get_context('spawn')) as encodes:
+        pending: dict[Future, tuple[str, str]] = {}
+        urls = iter(printings_by_url)
+        max_in_flight = max_in_flight or 2 * download_workers
+        finished_cnt = 0  # images stored or failed, at whichever stage
+        try:
+            while True:
+                for url in itertools.islice(urls, max_in_flight - len(pending)):
+                    pending[downloads.submit(get_bytes_from_url, url)] = ('download', url)
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, url = pending.pop(future)
+                    printings = printings_by_url[url]
+                    try:
+                        result = future.result()
+                    except Exception as e:  # a failed image is retried on the next run
+                        stats.failed += 1
+                        finished_cnt += 1
+                        log(f'Failed to {stage} {url}: {e}')
+                        continue
+                    if stage == 'download':
+                        stats.downloaded += 1
+                        pending[encodes.submit(transcode, result)] = ('encode', url)
+                        continue
+                    sha1, jpeg_data = result
+                    finished_cnt += 1
+                    for slug, set_code in printings:
+                        if store.put_encoded(slug, set_code, sha1, jpeg_data):
+                            stats.stored += 1
+                            log(f'Saved {set_code} {slug}')
+                        else:
+                            stats.aliased += 1
+                    if finished_cnt % checkpoint_every == 0:
+                        store.save_aliases()
+        finally:
+            for future in pending:
+                future.cancel()
+            store.save_aliases()
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Download every card's image into the image store")
+    parser.add_argument('--card-data', type=Path, default=URL_FILE_PATH)
+    parser.add_argument('--output', type=Path, default=OUTPUT_PATH)
+    parser.add_argument('--sets', nargs='*', help='set codes to download; all of them if omitted')
+    parser.add_argument('--download-workers', type=int, default=8)
+    parser.add_argument('--encode-workers', type=int, default=None)
+    parser.add_argument('--sizes', type=parse_size, nargs='*', default=[],
+                        help='also write display-size variants (ex: 200x285) to the thumbnail cache')
+    parser.add_argument('--thumbnails', type=Path, default=THUMBNAILS_PATH)
+    parser.add_argument('-y', '--yes', action='store_true', help="don't ask for confirmation")
+    args = parser.parse_args()
+
+    if not args.yes and input("Are you sure you want to create all these image files? (Y/n) ") != 'Y':
         exit()
-    file_w_links: dict[str: dict[str: str]] = read_json_file(URL_FILE_PATH)
-    for set_code, set_data in file_w_links.items():
-        for slug, card_data in set_data.items():
-            url = card_data['img_url']
-            bytes_ = get_bytes_from_url(url)
-            image_obj = create_image_object(bytes_)
-            image_file_name = set_code
-            save_image_file(image_obj, OUTPUT_PATH / slug, image_file_name)
-            print(f'Saved {image_file_name} {slug}')
+    stats = download_images(read_json_file(args.card_data), args.output, args.sets, args.download_workers,
+                            args.encode_workers)
+    print(stats)
+    if args.sizes:
+        built_cnt = ThumbnailCache(args.output, args.thumbnails, args.sizes).build(args.encode_workers)
+        print(f'Built display-size variants of {built_cnt} images')
+
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""On-demand card images: decoded on a background thread the first time they're drawn, kept in an LRU that's
+bounded by a memory budget. Until an image is ready, get() hands back a placeholder of the requested size"""
+import queue
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pygame as pg
+
+from renderer_pygame.image_pack import ImagePack
+from renderer_pygame.image_store import ImageStore
+from renderer_pygame.thumbnails import ThumbnailCache
+
+ImageKey = tuple[str, str, tuple[int, int] | None]  # slug, set code, size (None: as stored)
+CacheKey = tuple[str, tuple[int, int] | None]  # content key (shared by reprints with the same art), size
+
+PLACEHOLDER_COLOR = (60, 60, 60)
+
+
+class ImageCache:
+    def __init__(self, images_path: str | Path, budget_bytes: int, thumbnails: ThumbnailCache | None = None,
+                 pack: ImagePack | None = None):
+        self.images_path = Path(images_path)
+        self.store = ImageStore(images_path)
+        self.budget_bytes = budget_bytes
+        self.thumbnails = thumbnails  # pre-scaled copies on disk; used when one matches the requested size
+        self.pack = pack  # all images in one memory-mapped file; preferred over images_path's loose files
+        self.used_bytes = 0
+        self._surfaces: OrderedDict[CacheKey, pg.Surface] = OrderedDict()  # least recently used first
+        self._placeholders: dict[tuple[int, int], pg.Surface] = {}
+        self._missing: set[CacheKey] = set()
+        self._pending: set[CacheKey] = set()
+        # newest request first: whatever was asked for last is what's on screen now
+        self._requests: queue.LifoQueue[ImageKey | None] = queue.LifoQueue()
+        self._decoded: queue.SimpleQueue[tuple[CacheKey, pg.Surface | None]] = queue.SimpleQueue()
+        self._worker = threading.Thread(target=self._decode_loop, name='image-cache', daemon=True)
+        self._worker.start()
+
+    def get(self, slug: str, set_code: str, size: tuple[int, int] | None = None) -> pg.Surface:
+        key = (self.store.content_key(slug, set_code), size)
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self._surfaces.move_to_end(key)
+            return surf
+        if key not in self._pending and key not in self._missing:
+            self._pending.add(key)
+            self._requests.put((slug, set_code, size))
+        return self.placeholder(size)
+
+    def is_loaded(self, slug: str, set_code: str, size: tuple[int, int] | None = None) -> bool:
+        return (self.store.content_key(slug, set_code), size) in self._surfaces
+
+    @property
+    def is_loading(self) -> bool:
+        """Whether images that were asked for are still being decoded; they need pumping once they are"""
+        return bool(self._pending)
+
+    def placeholder(self, size: tuple[int, int] | None) -> pg.Surface:
+        size = size or (1, 1)
+        if size not in self._placeholders:
+            surf = pg.Surface(size)
+            surf.fill(PLACEHOLDER_COLOR)
+            self._placeholders[size] = surf
+        return self._placeholders[size]
+
+    def pump(self) -> int:
+        """Moves decoded images into the cache; call once per frame from the main thread, as converting a surface to
+        the display's pixel format isn't safe from any other thread. Returns how many images became ready"""
+        ready_cnt = 0
+        while True:
+            try:
+                key, surf = self._decoded.get_nowait()
+            except queue.Empty:
+                return ready_cnt
+            self._pending.discard(key)
+            if key in self._surfaces:  # also decoded by preload()
+                continue
+            if surf is None:
+                self._missing.add(key)
+                continue
+            if pg.display.get_surface() is not None:
+                surf = surf.convert_alpha()
+            self._insert(key, surf)
+            ready_cnt += 1
+
+    def preload(self, slug: str, set_code: str, size: tuple[int, int] | None = None) -> None:
+        """Decodes the image on the calling thread, ex: a scene loading in the background; it's in the cache once
+        pump() has run. Safe from any thread"""
+        self._decoded.put(self._decode((slug, set_code, size)))
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+        self.used_bytes = 0
+
+    def close(self) -> None:
+        """Stops the decoding thread, once it's done with the image it's on; after that, the pack can be closed"""
+        self._requests.put(None)  # taken next: the queue is last in, first out
+        self._worker.join()
+
+    def _insert(self, key: CacheKey, surf: pg.Surface) -> None:
+        self._surfaces[key] = surf
+        self.used_bytes += surface_bytes(surf)
+        while self.used_bytes > self.budget_bytes and len(self._surfaces) > 1:
+            _, evicted = self._surfaces.popitem(last=False)
+            self.used_bytes -= surface_bytes(evicted)
+
+    def _decode_loop(self) -> None:
+        while (key := self._requests.get()) is not None:
+            self._decoded.put(self._decode(key))
+
+    def _decode(self, key: ImageKey) -> tuple[CacheKey, pg.Surface | None]:
+        slug, set_code, size = key
+        try:
+            surf = self._load(slug, set_code, size)
+            if surf and size and surf.get_size() != size:
+                surf = pg.transform.smoothscale(surf, size)
+        except Exception as e:  # ex: a truncated file or a bad pack slice; the decoding thread mustn't die of it
+            print(f"[Error] Failed to load image {slug}/{set_code}: {e!r}")
+            surf = None
+        return (self.store.content_key(slug, set_code), size), surf
+
+    def _load(self, slug: str, set_code: str, size: tuple[int, int] | None) -> pg.Surface | None:
+        """From a thumbnail already at size, then the image pack, then the image's own file. Packed art's thumbnail is
+        found through its content key, so it costs no stat of the loose file"""
+        if self.pack and self.pack.has(slug, set_code):
+            if size and self.thumbnails and (thumb_path := self.thumbnails.path_for_content(
+                    self.store.content_key(slug, set_code), size)):
+                try:
+                    return pg.image.load(str(thumb_path))
+                except FileNotFoundError:  # not built yet
+                    pass
+            return pg.image.load(*self.pack.open_image(slug, set_code))
+        path = self.store.path_for(slug, set_code)
+        if path and size and self.thumbnails and (thumb_path := self.thumbnails.path_for(path, size)):
+            return pg.image.load(str(thumb_path))
+        if path:
+            return pg.image.load(str(path))
+        return None
+
+def surface_bytes(surf: pg.Surface) -> int:
+    return surf.get_pitch() * surf.get_height()
@@ -0,0 +1,127 @@
+"""All card images in one file, read through mmap: opening the pack is the only file I/O at startup, an image is
+decoded straight from its slice of the mapping, and every client process on a box shares the same page cache.
+
+    python -m renderer_pygame.image_pack assets/images assets/images.pack
+
+Layout: HEADER, then each unique image's encoded bytes as they were on disk, then the index: per printing, its key
+('<slug>/<set_code>.<ext>', utf-8, prefixed by its length) and its image's offset & length in the file"""
+import argparse
+import io
+import mmap
+import struct
+from pathlib import Path
+
+from renderer_pygame.image_store import ImageStore
+
+MAGIC = b'MGIP'
+VERSION = 1
+HEADER = struct.Struct('<4sBIQ')  # magic, version, image count, index offset
+KEY_LEN = struct.Struct('<H')
+INDEX_ENTRY = struct.Struct('<QI')  # data offset, data length
+
+
+def write_image_pack(images_path: str | Path, pack_path: str | Path) -> int:
+    """Packs every card image under images_path; returns how many were packed. Art shared by several printings is
+    written once, and their index entries all point at it"""
+    pack_path = Path(pack_path)
+    index = []
+    written: dict[Path, tuple[int, int]] = {}  # source: offset, length
+    tmp_path = pack_path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        for key, src_path in sorted(ImageStore(images_path).sources().items()):
+            if src_path not in written:
+                data = src_path.read_bytes()
+                written[src_path] = f.tell(), len(data)
+                f.write(data)
+            index.append((f'{key}{src_path.suffix}', *written[src_path]))
+        index_offset = f.tell()
+        for key, offset, length in index:
+            key_bytes = key.encode()
+            f.write(KEY_LEN.pack(len(key_bytes)) + key_bytes + INDEX_ENTRY.pack(offset, length))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(index), index_offset))
+    tmp_path.replace(pack_path)
+    return len(index)
+
+
+class MemoryviewReader(io.RawIOBase):
+    """A read-only file over a memoryview, so that decoders read from the mapping without copying the whole image"""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = min(len(buffer), len(self._view) - self._pos)
+        buffer[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(base + offset, 0)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+class ImagePack:
+    def __init__(self, pack_path: str | Path):
+        self.pack_path = Path(pack_path)
+        with open(self.pack_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, image_cnt, index_offset = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.pack_path} isn't a version {VERSION} image pack")
+        self._entries: dict[str, tuple[int, int, str]] = {}  # 'slug/set_code': offset, length, file extension
+        pos = index_offset
+        for _ in range(image_cnt):
+            (key_len,) = KEY_LEN.unpack_from(self._mmap, pos)
+            key = self._mmap[pos + KEY_LEN.size:pos + KEY_LEN.size + key_len].decode()
+            offset, length = INDEX_ENTRY.unpack_from(self._mmap, pos + KEY_LEN.size + key_len)
+            pos += KEY_LEN.size + key_len + INDEX_ENTRY.size
+            stem, ext = key.rsplit('.', 1)
+            self._entries[stem] = (offset, length, ext)
+
+    @classmethod
+    def open(cls, pack_path: str | Path) -> "ImagePack | None":
+        """The pack at pack_path, or None if one hasn't been built"""
+        return cls(pack_path) if Path(pack_path).is_file() else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def has(self, slug: str, set_code: str) -> bool:
+        return f'{slug}/{set_code}' in self._entries
+
+    def view(self, slug: str, set_code: str) -> memoryview:
+        """The image's encoded bytes; a slice of the mapping, not a copy"""
+        offset, length, _ = self._entries[f'{slug}/{set_code}']
+        return memoryview(self._mmap)[offset:offset + length]
+
+    def open_image(self, slug: str, set_code: str) -> tuple[MemoryviewReader, str]:
+        """A file to decode the image from, and its name hint (ex: 'jpg') for pg.image.load"""
+        return MemoryviewReader(self.view(slug, set_code)), self._entries[f'{slug}/{set_code}'][2]
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Pack card images into a single memory-mappable file')
+    parser.add_argument('images_path')
+    parser.add_argument('pack_path')
+    args = parser.parse_args()
+    print(f'Packed {write_image_pack(args.images_path, args.pack_path)} images into {args.pack_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Card images stored once per unique art: a reprint whose pixels match an earlier printing is an alias of it.
+
+    <images>/objects/<sha1 of pixels>.jpg
+    <images>/aliases.json   {'<slug>/<set_code>': '<sha1>'}
+
+Images saved the old way, as <images>/<slug>/<set_code>.jpg, still resolve; `python -m renderer_pygame.image_store
+<images>` moves them into the store"""
+import hashlib
+import io
+import os
+from pathlib import Path
+
+from PIL import Image
+
+from file_utils import read_json_file, write_json_to_file
+
+VALID_EXTS = ('.jpg', '.jpeg', '.png', '.gif')
+OBJECTS_DIR = 'objects'
+ALIASES_NAME = 'aliases.json'
+OBJECT_EXT = '.jpg'
+
+
+def pixel_hash(image: Image.Image) -> str:
+    """Hashes what the image looks like rather than how it was encoded, so re-encoded copies of the same art match"""
+    image = image.convert('RGB')
+    h = hashlib.sha1(f'{image.width}x{image.height}'.encode())
+    h.update(image.tobytes())
+    return h.hexdigest()
+
+
+class ImageStore:
+    def __init__(self, images_path: str | Path):
+        self.images_path = Path(images_path)
+        aliases_path = self.images_path / ALIASES_NAME
+        self.aliases: dict[str, str] = read_json_file(aliases_path) if aliases_path.is_file() else {}
+
+    def object_path(self, sha1: str) -> Path:
+        return self.images_path / OBJECTS_DIR / f'{sha1}{OBJECT_EXT}'
+
+    def content_key(self, slug: str, set_code: str) -> str:
+        """Equal for every printing that shares art, so callers can share whatever they build from it"""
+        return self.aliases.get(f'{slug}/{set_code}') or f'{slug}/{set_code}'
+
+    def path_for(self, slug: str, set_code: str) -> Path | None:
+        if sha1 := self.aliases.get(f'{slug}/{set_code}'):
+            return self.object_path(sha1)
+        for ext in VALID_EXTS:
+            path = self.images_path / slug / f'{set_code}{ext}'
+            if path.is_file():
+                return path
+        return None
+
+    def has(self, slug: str, set_code: str) -> bool:
+        sha1 = self.aliases.get(f'{slug}/{set_code}')
+        return sha1 is not None and self.object_path(sha1).is_file()
+
+    def put(self, slug: str, set_code: str, image: Image.Image, jpeg_data: bytes | None = None) -> tuple[str, bool]:
+        """Stores image as slug/set_code's art; returns its sha1, and whether it was new art. If the image came from
+        JPEG bytes, pass them along to be written as-is rather than re-encoded"""
+        sha1 = pixel_hash(image)
+        if jpeg_data is None and not self.object_path(sha1).is_file():
+            buffer = io.BytesIO()
+            image.convert('RGB').save(buffer, 'JPEG')
+            jpeg_data = buffer.getvalue()
+        return sha1, self.put_encoded(slug, set_code, sha1, jpeg_data)
+
+    def put_encoded(self, slug: str, set_code: str, sha1: str, jpeg_data: bytes | None) -> bool:
+        """Stores already hashed & encoded art (ex: from a worker process); returns whether it was new"""
+        self.aliases[f'{slug}/{set_code}'] = sha1
+        path = self.object_path(sha1)
+        if path.is_file():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.write_bytes(jpeg_data)
+        os.replace(tmp_path, path)
+        return True
+
+    def save_aliases(self) -> None:
+        self.images_path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.images_path / f'{ALIASES_NAME}.tmp'
+        write_json_to_file(tmp_path, dict(sorted(self.aliases.items())))
+        os.replace(tmp_path, self.images_path / ALIASES_NAME)
+
+    def sources(self) -> dict[str, Path]:
+        """'slug/set_code': the file holding its art, for stored & old-style images alike. Printings that share art
+        share a Path"""
+        sources = {}
+        for src_path in sorted(self.images_path.glob('*/*')):
+            if src_path.parent.name != OBJECTS_DIR and src_path.suffix.lower() in VALID_EXTS:
+                sources[f'{src_path.parent.name}/{src_path.stem}'] = src_path
+        for key, sha1 in self.aliases.items():
+            sources[key] = self.object_path(sha1)
+        return sources
+
+    def migrate_loose_files(self) -> tuple[int, int]:
+        """Moves old-style <slug>/<set_code> files into the store; returns (files moved, unique images kept)"""
+        moved_cnt = 0
+        for key, src_path in self.sources().items():
+            if src_path.parent.name == OBJECTS_DIR:
+                continue
+            slug, set_code = key.split('/')
+            data = src_path.read_bytes()
+            with Image.open(src_path) as image:
+                self.put(slug, set_code, image, data if image.format == 'JPEG' else None)
+            src_path.unlink()
+            if not any(src_path.parent.iterdir()):
+                src_path.parent.rmdir()
+            moved_cnt += 1
+        self.save_aliases()
+        return moved_cnt, len(set(self.aliases.values()))
+
+
+if __name__ == '__main__':
+    import sys
+    moved, unique = ImageStore(sys.argv[1]).migrate_loose_files()
+    print(f'Moved {moved} images into the store; {unique} unique images')
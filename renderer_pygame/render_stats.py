@@ -0,0 +1,78 @@
+"""How much of the screen each frame redraws, and how much CPU the game uses while idle & while animating; shown in
+the corner by Game when show_render_stats is on (F3)"""
+from dataclasses import dataclass
+
+import pygame as pg
+
+from renderer_pygame.common.text import Font
+
+READOUT_FONT = Font('arial', 14)
+READOUT_RECT = pg.Rect(0, 0, 470, 20)  # top-right corner; positioned by RenderStats.draw
+
+
+@dataclass
+class RenderStats:
+    screen_area: int
+    frame_cnt: int = 0
+    rect_cnt: int = 0  # last frame's
+    # last frame's, in pixels: what was drawn (the scene's drawn once, clipped to the rect around its dirty rects), &
+    # what of it was updated on screen (the dirty rects themselves)
+    area: int = 0
+    updated_area: int = 0
+    total_area: int = 0
+    # process CPU time & wall time, in seconds, spent on frames where nothing was animating vs. those where it was
+    idle_cpu: float = 0.0
+    idle_wall: float = 0.0
+    animating_cpu: float = 0.0
+    animating_wall: float = 0.0
+
+    def record(self, rects: list[pg.Rect]) -> None:
+        self.frame_cnt += 1
+        self.rect_cnt = len(rects)
+        drawn = rects[0].unionall(rects[1:]) if rects else pg.Rect(0, 0, 0, 0)
+        self.area = drawn.w * drawn.h
+        self.updated_area = sum(r.w * r.h for r in rects)
+        self.total_area += self.area
+
+    def record_cpu(self, is_animating: bool, cpu: float, wall: float) -> None:
+        if is_animating:
+            self.animating_cpu += cpu
+            self.animating_wall += wall
+        else:
+            self.idle_cpu += cpu
+            self.idle_wall += wall
+
+    @property
+    def idle_cpu_frac(self) -> float:
+        """Of one core"""
+        return self.idle_cpu / self.idle_wall if self.idle_wall else 0.0
+
+    @property
+    def animating_cpu_frac(self) -> float:
+        return self.animating_cpu / self.animating_wall if self.animating_wall else 0.0
+
+    @property
+    def cpu_report(self) -> str:
+        return (f'CPU idle {self.idle_cpu_frac:.1%} over {self.idle_wall:.1f}s, '
+                f'animating {self.animating_cpu_frac:.1%} over {self.animating_wall:.1f}s')
+
+    @property
+    def area_frac(self) -> float:
+        return self.area / self.screen_area
+
+    @property
+    def mean_area_frac(self) -> float:
+        return self.total_area / (self.screen_area * self.frame_cnt) if self.frame_cnt else 0.0
+
+    @property
+    def readout(self) -> str:
+        return (f'redrawn {self.area_frac:6.1%} ({self.rect_cnt} rects: {self.updated_area / self.screen_area:5.1%}), '
+                f'avg {self.mean_area_frac:5.1%}, '
+                f'CPU idle {self.idle_cpu_frac:4.0%} / anim {self.animating_cpu_frac:4.0%}')
+
+    def draw(self, surface: pg.Surface) -> pg.Rect:
+        """Opaque, so it never needs the scene redrawn under it"""
+        rect = READOUT_RECT.move(surface.get_width() - READOUT_RECT.w, 0)
+        surface.fill((0, 0, 0), rect)
+        surface.blit(READOUT_FONT.render(self.readout, (0, 255, 0)), rect.move(4, 2))
+        return rect
@@ -1,48 +1,52 @@
+import threading
 from dataclasses import dataclass
 
 from build_deck import DeckBuilder
+from deck_analytics import DeckAnalytics, analyze_deck
 import pygame as pg
+from renderer_pygame.card_filters import CardFilter, CardFilterIndex
 from renderer_pygame.config import COLOR_DICT
 from renderer_pygame.scenes.scene_abc import Scene
 from renderer_pygame.common.components import ColoredBoxButton, Toggle, Button
 from renderer_pygame.common.image_carousel import ImageCarousel
 from renderer_pygame.common.table import Table
+from renderer_pygame.common.text import Font
 
 @dataclass
 class CardImage:
     slug: str
     colors: str
     card_types: list[str]
-    image: pg.Surface  # only loading one image per card
+    set_code: str  # only showing one image per card
 
 
 class BuildDeckScene(Scene):
     def __init__(self, game):
         super().__init__(game)
-        self.font = pg.font.SysFont("arial", 32)
-        self.font_smaller = pg.font.SysFont("arial", 14)
+        self.font = Font("arial", 32)
+        self.font_smaller = Font("arial", 14)
 
         # ----- Selecting Cards -----
         # Layout and style
         self.BG_COLOR = (25, 25, 25)
         self.FILTERS_X = 10
         self.FILTERS_Y = 10
+        self.FILTERS_RECT = pg.Rect(0, 0, 820, 75)  # color boxes & toggle, for dirty-rect redraws
+        self.ANALYTICS_RECT = pg.Rect(820, 0, self.game.width - 820, 75)
         self.IMG_SIZE = (200, 285)
 
         self.deck_builder = DeckBuilder(self.game.card_univ, 0)
 
-        # For all cards in the universe, load those images to a nested dictionary
-        self.images = []
-        for card in sorted(self.game.card_univ.cards, key=lambda c: c.slug):
-            for img in self.game.images[card.slug].values():  # load the first image for each card
-                self.images.append(CardImage(card.slug, card.colors, card.card_types,
-                                             pg.transform.smoothscale(img, self.IMG_SIZE)))
-                break
+        # For all cards in the universe, the earliest set's image; the carousel loads them as they come into view
+        cards = [card for card in sorted(self.game.card_univ.cards, key=lambda c: c.slug) if card.images]
+        self.images = [CardImage(card.slug, card.colors, card.card_types, next(iter(card.images))) for card in cards]
+        self.filter_index = CardFilterIndex(cards)  # same order as self.images
 
         if not self.images:
             raise SystemExit("No images found!")
 
-        self.img_carousel = ImageCarousel(50, 100, 1200, self.IMG_SIZE[1], self.IMG_SIZE, 5, self.images)
+        self.img_carousel = ImageCarousel(50, 100, 1200, self.IMG_SIZE[1], self.IMG_SIZE, 5, self.images,
+                                          self.game.image_cache, self.game.atlas)
 
         # Card Carousel Filters
         self.color_boxes: dict[str, ColoredBoxButton | None] = {c: None for c in COLOR_DICT}
@@ -54,15 +58,25 @@ class BuildDeckScene(Scene):
         self.creatures_only_btn = Toggle(self.FILTERS_X + 300, self.FILTERS_Y + 10, 'Creatures Only')
 
         self.select_this_card_outline = pg.Rect(self.img_carousel.x + (self.img_carousel.visible_count // 2 * (self.IMG_SIZE[0] + self.img_carousel.img_spacing)) - 10, self.img_carousel.y - 15, 220, self.IMG_SIZE[1] + 30)
-        self.add_to_deck_btn: Button = None
+        self.add_to_deck_btn = Button(self.game.width // 2 - 100, self.img_carousel.y + self.IMG_SIZE[1] + 50, 200, 50,
+                                      "Add to Deck")
+        self.apply_filters()
 
         # ----- Your Deck table -----
-        self.table = Table(self.game.screen, 50, 550, 50, 35, pg.font.SysFont('arial', 24, bold=True),
-                           pg.font.SysFont('arial', 16),
-                           [200, 150, 150, 150, 150, 150, 150],
-                           ['Card', 'Count', 'Casting Cost', 'Types', 'P/T', 'KW Abilities', 'Image'])
+        self.table = Table(self.game.screen, 50, 550, 50, 35, Font('arial', 24, bold=True), Font('arial', 16),
+                           [200, 150, 150, 150, 150, 150, 150, 120],
+                           ['Card', 'Count', 'Casting Cost', 'Types', 'P/T', 'KW Abilities', 'Image', 'On Curve'],
+                           visible_row_cnt=6)  # as many as fit below the carousel; the mouse wheel scrolls
         self.rows_built = False
 
+        # ----- Deck analytics; recomputed on a background thread whenever the deck changes -----
+        self.ANALYTICS_SAMPLE_CNT = 50_000
+        self.analytics: DeckAnalytics | None = None
+        self.analytics_lines: list[pg.Surface] = []
+        self.deck_version = 0  # bumped on every edit, so a result for an older deck is recognized & dropped
+        self.analytics_running = False  # one run at a time; edits during a run are picked up when it's done
+        self._analytics_result: tuple[int, DeckAnalytics | None] | None = None  # (deck version, ...), set by the thread
+
     @property
     def selected_slug(self) -> str | None:
         if self.img_carousel.in_focus_idx > len(self.img_carousel.images) - 1:
@@ -75,15 +89,22 @@ class BuildDeckScene(Scene):
             if event.type == pg.K_m:
                 self.game.scenes.set_scene("menu", use_fade=True)
 
+            filter_changed = False
             for color_box in self.color_boxes.values():
-                color_box.handle_event(event)
+                filter_changed |= bool(color_box.handle_event(event))
 
-            self.creatures_only_btn.handle_event(event)
+            filter_changed |= bool(self.creatures_only_btn.handle_event(event))
+            if filter_changed:
+                self.apply_filters()
+                self.mark_dirty(self.FILTERS_RECT)
 
             self.img_carousel.handle_event(event)
 
+            if self.table.handle_event(event):
+                self.mark_dirty(self.table.table_rect)
+
             if event.type == pg.MOUSEBUTTONDOWN:
-                if self.add_to_deck_btn and self.add_to_deck_btn.rect.collidepoint(event.pos):
+                if self.add_to_deck_btn.rect.collidepoint(event.pos):
                     if not self.selected_slug:
                         continue
                     card = self.game.card_univ[self.selected_slug]
@@ -93,42 +114,128 @@ class BuildDeckScene(Scene):
                     for c in self.deck_builder.cards:
                         print(c)
 
+    def warm(self):
+        """Decodes the carousel's first screen of images, so they're there when the scene's shown"""
+        carousel = self.img_carousel
+        visible = carousel.visible_range()
+        indices = range(visible.start, min(visible.stop + carousel.prefetch_cnt, len(carousel.images)))
+        for done_cnt, i in enumerate(indices, 1):
+            card_image = carousel.images[i]
+            if not (carousel.atlas and carousel.atlas.has(card_image.slug, card_image.set_code)):
+                self.game.image_cache.preload(card_image.slug, card_image.set_code, self.IMG_SIZE)
+            yield done_cnt / len(indices)
+
+    @property
+    def is_animating(self) -> bool:
+        return self.img_carousel.is_animating
+
     # --- Update slide animation ---
     def update(self, dt):
         # Smooth interpolation
-        self.img_carousel.slide_offset += (self.img_carousel.target_offset - self.img_carousel.slide_offset) * min(self.img_carousel.slide_speed * dt, 1)
+        if self.img_carousel.is_animating:
+            self.img_carousel.slide_offset += (self.img_carousel.target_offset - self.img_carousel.slide_offset) * min(self.img_carousel.slide_speed * dt, 1)
+            if not self.img_carousel.is_animating:
+                self.img_carousel.slide_offset = self.img_carousel.target_offset  # settle exactly, then stop redrawing
+            self.mark_dirty(self.carousel_rect)
 
         # only build rows once per deck state change
         if not self.rows_built:
+            self.deck_version += 1
+            if not self.analytics_running:
+                self.start_analytics()
             self.build_table_rows()
             self.rows_built = True
 
-        # update the active carousel images
-        self.img_carousel.images = [i for i in self.images if self.color_boxes[i.colors[0]].checked and
-                                    ('Creature' in i.card_types or not self.creatures_only_btn.checked)]
+        if (result := self._analytics_result) is not None:
+            self._analytics_result = None
+            self.analytics_running = False
+            deck_version, analytics = result
+            if deck_version == self.deck_version:
+                self.set_analytics(analytics)
+                self.build_table_rows()  # for the On Curve column
+            else:
+                self.start_analytics()
+
+    @property
+    def card_filter(self) -> CardFilter:
+        return CardFilter(colors=frozenset(c for c, box in self.color_boxes.items() if box.checked),
+                          creatures_only=self.creatures_only_btn.checked)
+
+    @property
+    def carousel_rect(self) -> pg.Rect:
+        return self.img_carousel.rect.union(self.select_this_card_outline)
+
+    def on_images_ready(self) -> None:
+        self.mark_dirty(self.carousel_rect)
+
+    def apply_filters(self) -> None:
+        """Only called when a filter changes; the carousel keeps its list in between"""
+        self.img_carousel.images = [self.images[i] for i in self.filter_index.matching(self.card_filter)]
+        self.mark_dirty(self.carousel_rect)
 
     def build_table_rows(self) -> None:
-        """Rebuild the table when deck contents change"""
-        self.table.clear_rows()
+        """Update the table when deck contents change, or their analytics arrive"""
+        on_curve_rates = self.analytics.on_curve_rates if self.analytics else {}
+        self.mark_dirty(self.table.table_rect)  # as it was; it may shrink
+        rows = []
         for c in self.deck_builder.unique_cards_sorted:
             p_t_text = f'{c.props.power}/{c.props.toughness}' if c.props.power or c.props.toughness else ''
-            self.table.add_row([c.props.name, str(self.deck_builder.get_slug_cnt(c.props.slug)),
-                                c.props.casting_cost, ', '.join(c.props.card_types),
-                                p_t_text, ', '.join(c.props.keyword_abilities),
-                                'Something re: Image'])
+            on_curve_text = f'{on_curve_rates[c.props.slug]:.0%}' if c.props.slug in on_curve_rates else ''
+            rows.append([c.props.name, str(self.deck_builder.get_slug_cnt(c.props.slug)),
+                         c.props.casting_cost, ', '.join(c.props.card_types),
+                         p_t_text, ', '.join(c.props.keyword_abilities),
+                         'Something re: Image', on_curve_text])
+        self.table.set_rows(rows)  # only re-renders the rows that changed
+        self.mark_dirty(self.table.table_rect)
+
+    def start_analytics(self) -> None:
+        """Samples the deck as it is now on a background thread; update() picks the result up"""
+        def run(cards, deck_version):
+            analytics = None
+            try:
+                analytics = analyze_deck(cards, self.ANALYTICS_SAMPLE_CNT)
+            except Exception as e:
+                print(f"[Error] Deck analytics failed: {e!r}")
+            finally:  # always answered, or analytics_running would never clear
+                self._analytics_result = deck_version, analytics
+
+        self.analytics_running = True
+        threading.Thread(target=run, args=(list(self.deck_builder.cards), self.deck_version), name='deck-analytics',
+                         daemon=True).start()
+
+    def set_analytics(self, analytics: DeckAnalytics | None) -> None:
+        self.analytics = analytics
+        if not self.analytics:
+            self.analytics_lines = []
+            return
+        land_drops = ', '.join(f'T{t}: {p:.0%}' for t, p in enumerate(self.analytics.p_land_drops[:5], start=1))
+        texts = [f'Keep 7: {self.analytics.p_keep:.0%}   Screw: {self.analytics.p_mana_screw:.0%}   '
+                 f'Flood: {self.analytics.p_mana_flood:.0%}',
+                 f'Land drops  {land_drops}']
+        self.analytics_lines = [self.font_smaller.render(t, (220, 220, 220)) for t in texts]
+        self.mark_dirty(self.ANALYTICS_RECT)
 
     # --- Draw everything ---
-    def draw(self):
-        screen = self.game.screen
-        screen.fill(self.BG_COLOR)
+    def draw_static(self, surface):
+        surface.fill(self.BG_COLOR)
 
         # Draw filters
-        pg.draw.rect(screen, (220, 220, 220), pg.Rect(10, 10, 800, 60), 1, 6)
-        text = self.font_smaller.render('Filters', True, (220, 220, 220))
-        screen.blit(text, (15, 0))
+        pg.draw.rect(surface, (220, 220, 220), pg.Rect(10, 10, 800, 60), 1, 6)
+        text = self.font_smaller.render('Filters', (220, 220, 220))
+        surface.blit(text, (15, 0))
+
+        # Add to Deck button
+        self.add_to_deck_btn.draw(surface)
+
+    def draw(self):
+        screen = self.game.screen
+        screen.blit(self.static_layer, (0, 0))
 
         self.creatures_only_btn.draw(screen)
 
+        for i, line in enumerate(self.analytics_lines):
+            screen.blit(line, (830, 15 + i * 25))
+
         for color_box in self.color_boxes.values():
             color_box.draw(screen)
 
@@ -137,13 +244,7 @@ class BuildDeckScene(Scene):
         # Select This Card rectangle outline
         pg.draw.rect(screen, (220, 220, 220), self.select_this_card_outline, width=5, border_radius=6)
 
-        # Add to Deck button
-        self.add_to_deck_btn = Button(self.game.width // 2 - 100, self.img_carousel.y + self.IMG_SIZE[1] + 50, 200, 50, "Add to Deck")
-        self.add_to_deck_btn.draw(screen)
-
-        screen.fill((128, 128, 128), self.table.table_rect)
-        for surf, pos in self.table.items_to_blit:
-            screen.blit(surf, pos)
+        self.table.draw(screen)
 
 
 # TODO:
@@ -1,12 +1,13 @@
 import pygame as pg
 
+from renderer_pygame.common.text import Font
 from renderer_pygame.scenes.scene_abc import Scene
 
 
 class PlayScene(Scene):
     def __init__(self, game):
         super().__init__(game)
-        self.font = pg.font.SysFont("arial", 48)
+        self.font = Font("arial", 48)
 
     def handle_events(self, events):
         for event in events:
@@ -19,9 +20,12 @@ class PlayScene(Scene):
     def update(self, dt):
         pass
 
+    def draw_static(self, surface):
+        surface.fill("darkslategray")
+        text = self.font.render("You are playing Magicnacki; press M for menu", "white")
+        surface.blit(text, (100, 250))
+        small = self.font.render("Press Q to Quit", "lightgray")
+        surface.blit(small, (180, 320))
+
     def draw(self):
-        self.game.screen.fill("darkslategray")
-        text = self.font.render("You are playing Magicnacki; press M for menu", True, "white")
-        self.game.screen.blit(text, (100, 250))
-        small = self.font.render("Press Q to Quit", True, "lightgray")
-        self.game.screen.blit(small, (180, 320))
+        self.game.screen.blit(self.static_layer, (0, 0))  # nothing here changes
@@ -1,11 +1,25 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+
+import pygame as pg
 
 
 class Scene(ABC):
-    """Abstract base class for all game scenes."""
+    """Abstract base class for all game scenes.
+
+    In dirty-rect mode (Game.use_dirty_rects), a scene is only redrawn where it's been marked dirty: draw() runs once
+    a frame with the screen clipped to the rect around the dirty rects, and only they're updated on screen. What
+    never changes goes in draw_static(), which is drawn once into a cached layer that draw() blits.
+
+    With Game.use_idle_wait, a scene is only updated & drawn while it's animating or has been marked dirty; otherwise
+    the game sleeps until the next event. So a scene that changes must say so: mark_dirty() what changed, and return
+    True from is_animating for as long as it moves on its own"""
 
     def __init__(self, game):
         self.game = game
+        self._dirty_rects: list[pg.Rect] = []
+        self._static_layer: pg.Surface | None = None
+        self.mark_dirty()
 
     @abstractmethod
     def handle_events(self, events): ...
@@ -13,3 +27,67 @@ class Scene(ABC):
     def update(self, dt): ...
     @abstractmethod
     def draw(self): ...
+
+    @property
+    def is_animating(self) -> bool:
+        """Whether the scene changes without any input, so needs a frame at the full frame rate"""
+        return False
+
+    @property
+    def needs_redraw(self) -> bool:
+        return bool(self._dirty_rects) or self.is_animating
+
+    def draw_static(self, surface: pg.Surface) -> None:
+        """Draws the parts of the scene that never change; override to use static_layer"""
+        surface.fill("black")
+
+    @property
+    def static_layer(self) -> pg.Surface:
+        if self._static_layer is None:
+            self._static_layer = pg.Surface(self.game.screen.get_size()).convert()
+            self.draw_static(self._static_layer)
+        return self._static_layer
+
+    def invalidate_static_layer(self) -> None:
+        self._static_layer = None
+        self.mark_dirty()
+
+    def mark_dirty(self, rect: pg.Rect | None = None) -> None:
+        """rect needs redrawing next frame; the whole screen if None"""
+        self._dirty_rects.append(pg.Rect(rect) if rect else self.game.screen.get_rect())
+
+    def clear_dirty(self) -> None:
+        """For when the whole scene was just drawn"""
+        self._dirty_rects.clear()
+
+    def warm(self) -> Iterator[float]:
+        """Expensive preparation done up front, on SceneManager's loading thread; yields how far along it is, from 0 to
+        1. Mustn't touch anything the main thread may be using"""
+        yield from ()
+
+    def on_enter(self) -> None:
+        """Called when the scene becomes the active one; ex: to preload the scenes it leads to"""
+
+    def on_images_ready(self) -> None:
+        """Called when the image cache has new images; scenes showing cards mark where they are drawn"""
+
+    def draw_dirty(self) -> list[pg.Rect]:
+        """Redraws the dirty parts of the scene, and returns them for pg.display.update. The scene's drawn once, clipped
+        to the rect around them all: a draw call per rect would pay for the scene's blits once per rect, and whatever
+        lies between them is redrawn as it was"""
+        screen = self.game.screen
+        screen_rect = screen.get_rect()
+        rects: list[pg.Rect] = []
+        for rect in self._dirty_rects:  # merge overlapping rects, so nothing is drawn twice
+            rect = rect.clip(screen_rect)
+            if not rect.w or not rect.h:
+                continue
+            while (i := rect.collidelist(rects)) != -1:
+                rect.union_ip(rects.pop(i))
+            rects.append(rect)
+        self.clear_dirty()
+        if rects:
+            screen.set_clip(rects[0].unionall(rects[1:]))
+            self.draw()
+            screen.set_clip(None)
+        return rects
@@ -1,82 +1,209 @@
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+
 import pygame as pg
 
 from renderer_pygame.scenes.scene_abc import Scene
+from renderer_pygame.scenes.transitions import TRANSITIONS, Transition
+
+PROGRESS_BAR_RECT = pg.Rect(0, 0, 400, 16)  # centered on the screen
+PROGRESS_COLOR = (200, 200, 200)
+
+
+@dataclass
+class SceneLoad:
+    """A scene being constructed & warmed on a background thread"""
+    name: str
+    progress: float = 0.0  # constructing is the first half, Scene.warm() the second
+    scene: Scene | None = None
+    error: BaseException | None = None
+    done: bool = False
 
 
 class SceneManager:
-    """Handles switching between scenes with optional fade transitions."""
+    """Handles switching between scenes with optional fade transitions (see transitions.py).
+
+    Scenes registered with a factory are constructed on a background thread by preload(), or when first set; until a
+    scene is ready, set_scene shows a progress bar, and its fade starts once it is"""
 
-    def __init__(self, game):
+    def __init__(self, game, transition: str = 'fade'):
         self.game = game
         self.scenes = {}
+        self.factories: dict[str, Callable[..., Scene]] = {}  # called with the game
+        self.loads: dict[str, SceneLoad] = {}
+        # the scene set_scene is waiting on, whether to fade, & the transition
+        self.waiting_for: tuple[str, bool, str | None] | None = None
         self.active_scene = None
         self.next_scene = None
-        self.fade_alpha = 0
         self.fading = False
-        self.fade_speed = 400  # pixels per second (alpha units/sec)
-        self.fade_surface = pg.Surface((game.width, game.height))
-        self.fade_surface.fill("black")
+        self.default_transition = transition  # a name in TRANSITIONS
+        self.transition: Transition | None = None  # the running one
+        self.transition_time = 0.0  # seconds into it
+        # The outgoing & incoming scenes, drawn once when the transition starts
+        self.old_snapshot: pg.Surface | None = None
+        self.new_snapshot: pg.Surface | None = None
 
         # 🔊 Add a transition sound
         self.transition_sound = None  # optional pg.mixer.Sound object
 
-    def load_transition_sound(self, path: str):
-        """Load a sound to play during transitions."""
-        sound = pg.mixer.Sound(path)
-        sound.set_volume(0.2)  # 0.0–1.0
-        self.transition_sound = sound
+    def load_transition_sound(self, path: str, in_background: bool = False):
+        """Load a sound to play during transitions; transitions are silent until it's loaded."""
+        def load():
+            sound = pg.mixer.Sound(path)
+            sound.set_volume(0.2)  # 0.0–1.0
+            self.transition_sound = sound
+
+        if in_background:
+            threading.Thread(target=load, name='transition-sound', daemon=True).start()
+        else:
+            load()
 
     def add_scene(self, name: str, scene: Scene):
         self.scenes[name] = scene
 
-    def set_scene(self, name: str, use_fade=True):
-        """Begin transition to a new scene."""
-        if name not in self.scenes:
+    def register_scene(self, name: str, factory: Callable[..., Scene]):
+        """factory (ex: a Scene subclass) is called with the game, on a background thread, when the scene's preloaded"""
+        self.factories[name] = factory
+
+    def preload(self, *names: str):
+        """Starts constructing & warming the named scenes in the background, unless they're already loaded or loading;
+        names that weren't registered are skipped"""
+        for name in names:
+            if name in self.scenes or name in self.loads or name not in self.factories:
+                continue
+            load = self.loads[name] = SceneLoad(name)
+            threading.Thread(target=self._load, args=(load,), name=f'scene-{name}', daemon=True).start()
+
+    def _load(self, load: SceneLoad):
+        try:
+            scene = self.factories[load.name](self.game)
+            load.progress = 0.5
+            for warm_progress in scene.warm():
+                load.progress = 0.5 + warm_progress / 2
+            load.scene = scene
+        except BaseException as e:  # re-raised on the main thread, by update()
+            load.error = e
+        load.progress = 1.0
+        load.done = True
+
+    @property
+    def loading_progress(self) -> float | None:
+        """Of the scene set_scene is waiting on; None if it isn't waiting"""
+        return self.loads[self.waiting_for[0]].progress if self.waiting_for else None
+
+    def set_scene(self, name: str, use_fade=True, transition: str | None = None):
+        """Begin transition to a new scene; transition is a name in TRANSITIONS, default_transition if None."""
+        if name not in self.scenes and name not in self.factories:
             raise ValueError(f"Scene '{name}' not found.")
-        if self.fading:
+        if transition is not None and transition not in TRANSITIONS:
+            raise ValueError(f"Transition '{transition}' not found.")
+        if self.fading or self.waiting_for:
             return  # prevent overlapping transitions
+        if name not in self.scenes:  # the transition starts when it's loaded; see update
+            self.preload(name)
+            self.waiting_for = (name, use_fade, transition)
+            return
 
         if use_fade and self.active_scene:
             self.fading = True
             self.next_scene = self.scenes[name]
-            self.fade_alpha = 0
+            self.transition = TRANSITIONS[transition or self.default_transition]
+            self.transition_time = 0.0
+            self.old_snapshot = self.snapshot(self.active_scene)
+            self.next_scene.update(0)  # for anything it builds before its first draw, ex: the deck table's rows
+            self.new_snapshot = self.snapshot(self.next_scene)
 
             # 🔊 Play transition sound once when fade starts
             if self.transition_sound:
                 self.transition_sound.play()
         else:
             self.active_scene = self.scenes[name]
+            self.active_scene.mark_dirty()
+            self.active_scene.on_enter()
+
+    def snapshot(self, scene: Scene) -> pg.Surface:
+        """The whole scene, drawn to the screen & copied; the screen's redrawn by the transition's first frame"""
+        screen = self.game.screen
+        screen.set_clip(None)
+        scene.draw()
+        return screen.copy()
+
+    @property
+    def is_animating(self) -> bool:
+        return self.fading or bool(self.waiting_for) or bool(self.active_scene and self.active_scene.is_animating)
+
+    @property
+    def needs_redraw(self) -> bool:
+        return self.fading or bool(self.waiting_for) or bool(self.active_scene and self.active_scene.needs_redraw)
 
     def handle_events(self, events):
-        if not self.fading and self.active_scene:
+        if not self.fading and not self.waiting_for and self.active_scene:
             self.active_scene.handle_events(events)
 
     def update(self, dt):
-        """Handles scene updates and fade logic."""
+        """Handles scene loads, scene updates and fade logic."""
+        for name, load in list(self.loads.items()):
+            if not load.done:
+                continue
+            del self.loads[name]
+            if load.error:
+                raise load.error
+            self.add_scene(name, load.scene)
+            if self.waiting_for and self.waiting_for[0] == name:
+                _, use_fade, transition = self.waiting_for
+                self.waiting_for = None
+                if self.active_scene:
+                    self.active_scene.mark_dirty()  # the last frame had the progress bar on it
+                self.set_scene(name, use_fade, transition)
+
         if self.fading:
-            self.fade_alpha += self.fade_speed * dt
-            if self.fade_alpha >= 255:
-                self.fade_alpha = 255
-                # Swap scenes at midpoint of fade
-                if self.next_scene:
-                    self.active_scene = self.next_scene
-                    self.next_scene = None
-                # Start fade-out (reverse)
-                self.fade_speed *= -1
-            elif self.fade_alpha <= 0 and self.fade_speed < 0:
-                # Fade finished
-                self.fade_alpha = 0
-                self.fade_speed *= -1
+            # Neither scene is updated or drawn meanwhile; the transition only blends their snapshots
+            self.transition_time += dt
+            if self.transition_time >= self.transition.duration:
+                # Transition finished
+                self.active_scene = self.next_scene
+                self.next_scene = None
                 self.fading = False
+                self.transition = None
+                self.old_snapshot = self.new_snapshot = None
+                self.active_scene.mark_dirty()  # the last transition frame was only its snapshot
+                self.active_scene.on_enter()
         else:
             if self.active_scene:
                 self.active_scene.update(dt)
 
-    def draw(self):
-        """Draws the active scene and the fade overlay if active."""
-        if self.active_scene:
-            self.active_scene.draw()
-
+    def draw(self) -> list[pg.Rect]:
+        """Draws the active scene, the transition, or the active scene under the loading progress bar; returns the
+        parts of the screen that were drawn."""
+        if self.waiting_for:
+            return self.draw_loading()
         if self.fading:
-            self.fade_surface.set_alpha(int(self.fade_alpha))
-            self.game.screen.blit(self.fade_surface, (0, 0))
+            t = min(self.transition_time / self.transition.duration, 1.0)
+            self.transition.draw(self.game.screen, self.old_snapshot, self.new_snapshot, t)
+            return [self.game.screen.get_rect()]
+        if not self.game.use_dirty_rects:
+            if self.active_scene:
+                self.active_scene.draw()
+                self.active_scene.clear_dirty()
+            return [self.game.screen.get_rect()]
+        return self.active_scene.draw_dirty() if self.active_scene else []
+
+    def draw_loading(self) -> list[pg.Rect]:
+        """The progress bar, over the scene that's being left (or a blank screen, if there's none yet)"""
+        screen = self.game.screen
+        if not self.active_scene:
+            screen.fill("black")
+            rects = [screen.get_rect()]
+        elif self.game.use_dirty_rects:
+            rects = self.active_scene.draw_dirty()
+        else:
+            self.active_scene.draw()
+            self.active_scene.clear_dirty()
+            rects = [screen.get_rect()]
+        bar = PROGRESS_BAR_RECT.copy()
+        bar.center = screen.get_rect().center
+        screen.fill("black", bar.inflate(8, 8))
+        pg.draw.rect(screen, PROGRESS_COLOR, bar, width=1)
+        screen.fill(PROGRESS_COLOR, (bar.x, bar.y, round(bar.w * self.loading_progress), bar.h))
+        return [*rects, bar.inflate(8, 8)]
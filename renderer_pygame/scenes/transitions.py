@@ -0,0 +1,60 @@
+"""Scene transitions, drawn from snapshots of the outgoing & incoming scenes that SceneManager takes when one starts,
+so each frame of a transition costs two blits, however much the scenes themselves draw"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
+import pygame as pg
+
+
+@dataclass
+class Transition(ABC):
+    duration: float = 1.0  # seconds
+
+    @abstractmethod
+    def draw(self, surface: pg.Surface, old: pg.Surface, new: pg.Surface, t: float) -> None:
+        """t goes from 0 (all old) to 1 (all new)"""
+
+
+@dataclass
+class FadeThroughBlack(Transition):
+    duration: float = 1.25
+    _black: pg.Surface | None = field(default=None, init=False, repr=False)
+
+    def draw(self, surface, old, new, t):
+        if self._black is None or self._black.get_size() != surface.get_size():
+            self._black = pg.Surface(surface.get_size())
+            self._black.fill("black")
+        surface.blit(old if t < 0.5 else new, (0, 0))
+        self._black.set_alpha(round(255 * (1 - abs(2 * t - 1))))  # opaque halfway through
+        surface.blit(self._black, (0, 0))
+
+
+@dataclass
+class Crossfade(Transition):
+    duration: float = 0.6
+
+    def draw(self, surface, old, new, t):
+        surface.blit(old, (0, 0))
+        new.set_alpha(round(255 * t))
+        surface.blit(new, (0, 0))
+
+
+@dataclass
+class Slide(Transition):
+    """The new scene pushes the old one out to the left (or the right, if direction is -1)"""
+    duration: float = 0.5
+    direction: int = 1
+
+    def draw(self, surface, old, new, t):
+        t = t * t * (3 - 2 * t)  # smoothstep: eases in & out
+        offset = round(surface.get_width() * t) * self.direction
+        surface.blit(old, (-offset, 0))
+        surface.blit(new, (surface.get_width() * self.direction - offset, 0))
+
+
+TRANSITIONS: dict[str, Transition] = {
+    'fade': FadeThroughBlack(),
+    'crossfade': Crossfade(),
+    'slide_left': Slide(),
+    'slide_right': Slide(direction=-1),
+}
@@ -0,0 +1,125 @@
+"""Card images pre-scaled to the sizes the scenes draw them at, cached on disk so that nothing is scaled at runtime.
+Thumbnails are keyed by the sha1 of their source file and their size: <cache>/<w>x<h>/<sha1>.jpg. The manifest maps
+each source (relative to the images folder) to its sha1, with the mtime & size it was hashed at, so that a warm start
+only stats the sources instead of re-reading them"""
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from file_utils import read_json_file, write_json_to_file
+from renderer_pygame.image_store import OBJECTS_DIR, ImageStore
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def size_dir_name(size: tuple[int, int]) -> str:
+    return f'{size[0]}x{size[1]}'
+
+
+def source_content_key(rel_path: str) -> str:
+    """ImageStore.content_key of the art in a source file: a stored object's sha1, or a loose file's slug/set_code"""
+    parent, name = rel_path.rsplit('/', 1)
+    stem = name.rsplit('.', 1)[0]
+    return stem if parent == OBJECTS_DIR else f'{parent}/{stem}'
+
+
+def make_thumbnails(src_path: str, cache_path: str, sizes: list[tuple[int, int]]) -> tuple[str, int, int]:
+    """Runs in a worker process; writes any missing thumbnails of one source, and returns the source's
+    (sha1, mtime_ns, byte size)"""
+    stat = os.stat(src_path)
+    with open(src_path, 'rb') as f:
+        data = f.read()
+    sha1 = hashlib.sha1(data).hexdigest()
+    image = None
+    for size in sizes:
+        out_path = Path(cache_path) / size_dir_name(size) / f'{sha1}.jpg'
+        if out_path.exists():
+            continue
+        if image is None:
+            image = Image.open(src_path).convert('RGB')
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = out_path.with_suffix(f'.{os.getpid()}.tmp')
+        image.resize(size, Image.Resampling.LANCZOS).save(tmp_path, 'JPEG', quality=90)
+        os.replace(tmp_path, out_path)  # readers never see a half-written thumbnail
+    return sha1, stat.st_mtime_ns, stat.st_size
+
+
+class ThumbnailCache:
+    def __init__(self, images_path: str | Path, cache_path: str | Path, sizes: list[tuple[int, int]]):
+        self.images_path = Path(images_path)
+        self.cache_path = Path(cache_path)
+        self.sizes = [tuple(s) for s in sizes]
+        manifest_path = self.cache_path / MANIFEST_NAME
+        self.entries: dict[str, dict] = read_json_file(manifest_path) if manifest_path.is_file() else {}
+        self.sources_by_content = {source_content_key(rel): rel for rel in self.entries}
+        self._save_lock = threading.Lock()
+
+    def path_for(self, src_path: Path, size: tuple[int, int]) -> Path | None:
+        """The thumbnail of src_path at size, if one's been built from the file as it is now"""
+        if tuple(size) not in self.sizes:
+            return None
+        entry = self.entries.get(self._rel(src_path))
+        if not entry or not self._is_current(src_path, entry):
+            return None
+        thumb_path = self.cache_path / size_dir_name(size) / f'{entry["sha1"]}.jpg'
+        return thumb_path if thumb_path.is_file() else None
+
+    def path_for_content(self, content_key: str, size: tuple[int, int]) -> Path | None:
+        """Where the thumbnail of the art with this ImageStore.content_key would be, going by the manifest alone: its
+        source isn't looked at (ex: the art's read from the image pack), and the thumbnail may not exist"""
+        if tuple(size) not in self.sizes or not (rel := self.sources_by_content.get(content_key)):
+            return None
+        return self.cache_path / size_dir_name(size) / f'{self.entries[rel]["sha1"]}.jpg'
+
+    def stale_sources(self) -> list[Path]:
+        stale = []
+        for src_path in sorted(set(ImageStore(self.images_path).sources().values())):  # shared art: built once
+            entry = self.entries.get(self._rel(src_path))
+            if (not entry or not self._is_current(src_path, entry) or
+                    not all((self.cache_path / size_dir_name(s) / f'{entry["sha1"]}.jpg').is_file() for s in self.sizes)):
+                stale.append(src_path)
+        return stale
+
+    def build(self, max_workers: int | None = None) -> int:
+        """Builds the missing thumbnails in a process pool; returns how many sources were (re)processed"""
+        stale = self.stale_sources()
+        if not stale:
+            return 0
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        # spawn, not fork: the parent may be a pygame process with threads running
+        with ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = executor.map(make_thumbnails, map(str, stale), [str(self.cache_path)] * len(stale),
+                                   [self.sizes] * len(stale), chunksize=16)
+            for src_path, (sha1, mtime_ns, byte_cnt) in zip(stale, results):
+                rel = self._rel(src_path)
+                self.entries[rel] = {'sha1': sha1, 'mtime_ns': mtime_ns, 'bytes': byte_cnt}
+                self.sources_by_content[source_content_key(rel)] = rel
+        self.save_manifest()
+        return len(stale)
+
+    def build_in_background(self, max_workers: int | None = None) -> threading.Thread:
+        thread = threading.Thread(target=self.build, args=(max_workers,), name='thumbnails', daemon=True)
+        thread.start()
+        return thread
+
+    def save_manifest(self) -> None:
+        with self._save_lock:
+            tmp_path = self.cache_path / f'{MANIFEST_NAME}.tmp'
+            write_json_to_file(tmp_path, dict(self.entries))
+            os.replace(tmp_path, self.cache_path / MANIFEST_NAME)
+
+    def _rel(self, src_path: Path) -> str:
+        return Path(src_path).relative_to(self.images_path).as_posix()
+
+    @staticmethod
+    def _is_current(src_path: Path, entry: dict) -> bool:
+        try:
+            stat = src_path.stat()
+        except OSError:
+            return False
+        return stat.st_mtime_ns == entry['mtime_ns'] and stat.st_size == entry['bytes']
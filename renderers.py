@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from game_state import GameState
 from players import Player
@@ -27,3 +27,30 @@ class ConsoleRenderer(Renderer):
         print(f"Board: {gs.boards[action_idx].cards}")
         print(f"Hand: {gs.hands[action_idx].cards}")
         print()
+
+
+@dataclass
+class ChangeLogRenderer(Renderer):
+    """Prints only what changed since the last render, rather than the whole table"""
+    subscriptions: dict = field(default_factory=dict)  # GameState id: Subscription
+
+    def render(self, gs: GameState, players: list[Player]):
+        if id(gs) not in self.subscriptions:
+            self.subscriptions[id(gs)] = gs.changes.subscribe()
+            ConsoleRenderer.render(gs, players)
+            return
+        subscription = self.subscriptions[id(gs)]
+        if subscription.needs_resync:
+            subscription.drain()
+            ConsoleRenderer.render(gs, players)
+            return
+        for change in subscription.drain():
+            print(change)
+
+
+@dataclass
+class NullRenderer(Renderer):
+    """For headless games, ex: simulations & self-play"""
+    @staticmethod
+    def render(gs, players):
+        pass
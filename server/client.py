@@ -0,0 +1,89 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from server.protocol import read_message, write_message
+
+
+@dataclass
+class LoopbackClient:
+    """A headless client that keeps a local copy of its view by applying state changes, and picks moves with a policy.
+    Records the latency from sending each move to hearing back from the server"""
+    name: str
+    choose_action: Callable[[list[str]], int] = lambda labels: random.randrange(len(labels))
+    game_id: int = None
+    seat: int = None
+    view: dict = field(default_factory=dict)
+    card_slugs: dict[tuple[int, int], str] = field(default_factory=dict)  # (player idx, card id): slug
+    latencies: list[float] = field(default_factory=list)
+    _move_sent_at: float = None
+
+    async def connect_tcp(self, host: str = '127.0.0.1', port: int = 8765) -> None:
+        await self.run(*await asyncio.open_connection(host, port))
+
+    async def connect_unix(self, path: str) -> None:
+        await self.run(*await asyncio.open_unix_connection(path))
+
+    async def run(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_message(writer, {'t': 'join', 'n': self.name})
+        while (msg := await read_message(reader)) is not None:
+            if self._move_sent_at is not None:
+                self.latencies.append(time.perf_counter() - self._move_sent_at)
+                self._move_sent_at = None
+            if msg['t'] == 'joined':
+                self.game_id, self.seat = msg['g'], msg['s']
+            elif msg['t'] == 'view':
+                self.view = msg['v']
+                self.add_card_slugs(msg['nc'])
+            elif msg['t'] == 'delta':
+                self.add_card_slugs(msg.get('nc', []))
+                for change in msg['c']:
+                    self.apply_change(change)
+            elif msg['t'] == 'turn':
+                write_message(writer, {'t': 'move', 'n': msg['n'], 'i': self.choose_action(msg['a'])})
+                self._move_sent_at = time.perf_counter()
+                await writer.drain()
+            elif msg['t'] == 'over':
+                break
+        writer.close()
+
+    def add_card_slugs(self, new_cards: list[list]) -> None:
+        self.card_slugs.update({(player_idx, card_id): slug for player_idx, card_id, slug in new_cards})
+
+    def apply_change(self, change: list) -> None:
+        kind, *args = change
+        if kind == 'mv':
+            card_id, player_idx, from_zone, to_zone = args
+            self._remove_from_zone(card_id, player_idx, from_zone)
+            self._add_to_zone(card_id, player_idx, to_zone)
+        elif kind == 'tap':
+            card_id, player_idx, is_tapped = args
+            for board_card in self.view['b'][player_idx]:
+                if board_card[0] == card_id:
+                    board_card[1] = is_tapped
+        else:
+            self.view[kind] = args[0]  # ph, tn, tp, ao & cb replace the whole value
+
+    def _remove_from_zone(self, card_id: int, player_idx: int, zone: str) -> None:
+        if zone == 'HAND':
+            if player_idx == self.seat:
+                self.view['h'].remove(card_id)
+            else:
+                self.view['oh'] -= 1
+        elif zone == 'BOARD':
+            self.view['b'][player_idx] = [c for c in self.view['b'][player_idx] if c[0] != card_id]
+        elif zone == 'STACK':
+            self.view['st'].remove(card_id)
+
+    def _add_to_zone(self, card_id: int, player_idx: int, zone: str) -> None:
+        if zone == 'HAND':
+            if player_idx == self.seat:
+                self.view['h'].append(card_id)
+            else:
+                self.view['oh'] += 1
+        elif zone == 'BOARD':
+            self.view['b'][player_idx].append([card_id, False])
+        elif zone == 'STACK':
+            self.view['st'].append(card_id)
@@ -0,0 +1,204 @@
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+from typing import Callable
+
+from build_deck import Deck, GameCard
+from engine import Engine
+from game_state import GameState
+from players import AsyncPlayer
+from renderers import Renderer
+from server.protocol import encode_change, read_message, write_message
+from state_changes import CardMoved, Subscription, Zone
+
+WRITE_BUFFER_HIGH_WATER = 64 * 1024  # bytes waiting to go out to a client, past which its changes are held back
+
+
+@dataclass
+class Session:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    name: str = ''
+    seat: int = None
+    moves: asyncio.Queue = field(default_factory=asyncio.Queue)  # (turn id, action idx); None once disconnected
+    turn_id: int = 0  # of the last 'turn' sent; a move for any other is stale or out of turn
+    subscription: Subscription = None
+    known_cards: set[tuple[int, int]] = field(default_factory=set)  # (player idx, card id)
+    connected: bool = True
+
+    def send(self, msg: dict) -> None:
+        if self.connected:
+            write_message(self.writer, msg)
+
+    async def flush(self) -> None:
+        if self.connected:
+            try:
+                await self.writer.drain()
+            except ConnectionError:
+                self.disconnect()
+
+    def disconnect(self) -> None:
+        """Wakes a move that's being waited for; from then on the seat plays default moves"""
+        if self.connected:
+            self.connected = False
+            self.moves.put_nowait(None)
+
+    def send_changes(self, gs: GameState) -> None:
+        """The full view on the first call, or when the seat fell too far behind; otherwise only what changed. Nothing
+        while the client isn't keeping up: the changes wait in the subscription, which coalesces them, or gives up &
+        asks for a resync, instead of the write buffer growing without bound"""
+        if self.connected and self.writer.transport.get_write_buffer_size() >= WRITE_BUFFER_HIGH_WATER:
+            return
+        if self.subscription is None or self.subscription.needs_resync:
+            self.subscription = self.subscription or gs.changes.subscribe()
+            self.subscription.drain()
+            visible_cards = [c for board in gs.boards for c in board.cards] + gs.hands[self.seat].cards
+            self.send({'t': 'view', 'v': gs.view(self.seat), 'nc': self._new_card_slugs(visible_cards)})
+            return
+        changes = self.subscription.drain()
+        if not changes:
+            return
+        msg = {'t': 'delta', 'c': [encode_change(c) for c in changes]}
+        moved_cards = {(c.player_idx, c.card_id) for c in changes if isinstance(c, CardMoved) and
+                       (c.to_zone != Zone.HAND or c.player_idx == self.seat)}
+        if new_cards := moved_cards - self.known_cards:
+            msg['nc'] = self._new_card_slugs([c for zone in self._zones(gs) for c in zone
+                                              if (c.orig_owner_id, c.id) in new_cards])
+        self.send(msg)
+
+    def _zones(self, gs: GameState) -> list[list[GameCard]]:
+        return ([board.cards for board in gs.boards] + [gs.hands[self.seat].cards] +
+                [[a.card for a in gs.action_stack.actions]])
+
+    def _new_card_slugs(self, cards: list[GameCard]) -> list[list]:
+        """Slugs travel once per card; afterwards a card is just its id"""
+        new_cards = [[c.orig_owner_id, c.id, c.props.slug] for c in cards
+                     if (c.orig_owner_id, c.id) not in self.known_cards]
+        self.known_cards.update((owner_idx, card_id) for owner_idx, card_id, _ in new_cards)
+        return new_cards
+
+
+class GameAbandoned(Exception):
+    """Every seat has disconnected, so there's no one left to play the game for"""
+
+
+@dataclass
+class RemotePlayer(AsyncPlayer):
+    session: Session = None
+    game: "HostedGame" = None
+
+    async def make_move_async(self, gs: GameState):
+        # with no one left to wait on, the engine would never yield to the event loop again
+        if self.game.is_abandoned:
+            raise GameAbandoned
+        avail_actions = gs.get_available_actions(self.idx)
+        self.session.turn_id += 1
+        self.session.send({'t': 'turn', 'n': self.session.turn_id, 'a': [repr(a) for a in avail_actions]})
+        await self.session.flush()
+        while self.session.connected:
+            move = await self.session.moves.get()
+            if move is None:  # woken by the disconnect
+                break
+            turn_id, idx = move
+            if turn_id == self.session.turn_id and 0 <= idx < len(avail_actions):
+                return avail_actions[idx]
+        return self.default_move(gs)
+
+
+@dataclass
+class DeltaRenderer(Renderer):
+    """Instead of re-rendering the table, streams each seat the state changes since its last update"""
+    sessions: list[Session]
+
+    def render(self, gs: GameState, players):
+        for session in self.sessions:
+            session.send_changes(gs)
+
+
+@dataclass
+class HostedGame:
+    game_id: int
+    sessions: list[Session] = field(default_factory=list)
+    engine: Engine = None
+    task: asyncio.Task = None
+
+    @property
+    def is_abandoned(self) -> bool:
+        return not any(s.connected for s in self.sessions)
+
+
+class GameServer:
+    """Hosts many two-player games in one process; each connection is seated in the next open game"""
+
+    def __init__(self, deck_factory: Callable[[], list[Deck]], move_deadline: float | None = None,
+                 max_turns: int | None = None):
+        self.deck_factory = deck_factory
+        self.move_deadline = move_deadline
+        self.max_turns = max_turns
+        self.games: dict[int, HostedGame] = {}
+        self.finished_game_cnt = 0
+        self.action_cnt = 0
+        self._game_ids = itertools.count(1)
+        self._waiting_game: HostedGame | None = None
+
+    async def start_tcp(self, host: str = '127.0.0.1', port: int = 8765) -> asyncio.Server:
+        return await asyncio.start_server(self._handle_client, host, port, backlog=1024)
+
+    async def start_unix(self, path: str) -> asyncio.Server:
+        return await asyncio.start_unix_server(self._handle_client, path, backlog=1024)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = None
+        try:
+            join = await read_message(reader)
+            if not join or join.get('t') != 'join':
+                writer.close()
+                return
+            session = Session(reader, writer, name=str(join.get('n', '')))
+            game = self._seat(session)
+            session.send({'t': 'joined', 'g': game.game_id, 's': session.seat})
+            if len(game.sessions) == 2:
+                game.task = asyncio.create_task(self._run_game(game))
+
+            while (msg := await read_message(reader)) is not None:
+                if msg.get('t') == 'move' and type(msg.get('n')) is int and type(msg.get('i')) is int:
+                    session.moves.put_nowait((msg['n'], msg['i']))
+        except (ConnectionError, ValueError):  # a malformed or oversized message is dealt with like a hang-up
+            if session is None:
+                writer.close()
+        finally:
+            if session is not None:
+                session.disconnect()
+
+    def _seat(self, session: Session) -> HostedGame:
+        if self._waiting_game is None:
+            self._waiting_game = HostedGame(next(self._game_ids))
+            self.games[self._waiting_game.game_id] = self._waiting_game
+        game = self._waiting_game
+        session.seat = len(game.sessions)
+        game.sessions.append(session)
+        if len(game.sessions) == 2:
+            self._waiting_game = None
+        return game
+
+    async def _run_game(self, game: HostedGame) -> None:
+        players = [RemotePlayer(s.seat, s.name, session=s, game=game) for s in game.sessions]
+        game.engine = Engine(players=players, renderer=DeltaRenderer(game.sessions),
+                             gs=GameState(len(players), 0, decks=self.deck_factory()))
+        actions_before, turns_before = len(game.engine.gs.game_history), game.engine.gs.turn_number
+        try:
+            await game.engine.play_async(move_deadline=self.move_deadline, max_turns=self.max_turns)
+        except GameAbandoned:
+            pass
+        finally:
+            # each turn's start is in the history too, but isn't a player's action
+            self.action_cnt += (len(game.engine.gs.game_history) - actions_before -
+                                (game.engine.gs.turn_number - turns_before))
+            del self.games[game.game_id]
+            self.finished_game_cnt += 1
+            for session in game.sessions:
+                await session.flush()  # so the last changes aren't held back
+                session.send_changes(game.engine.gs)
+                session.send({'t': 'over'})
+                await session.flush()
+                session.writer.close()
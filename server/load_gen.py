@@ -0,0 +1,51 @@
+"""Hosts N games in-process and plays them with loopback clients, then reports server throughput.
+ex: python -m server.load_gen --games 200 --turns 10"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from card import CardUniverse
+from engine import build_decks
+from server.client import LoopbackClient
+from server.game_server import GameServer
+
+
+async def run_load(universe: CardUniverse, game_cnt: int, max_turns: int, port: int | None = None) -> dict:
+    server = GameServer(lambda: build_decks(universe), max_turns=max_turns)
+    clients = [LoopbackClient(f'bot-{i}') for i in range(game_cnt * 2)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if port is None:
+            socket_path = os.path.join(tmp_dir, 'magicnacki.sock')
+            listener = await server.start_unix(socket_path)
+            connections = [c.connect_unix(socket_path) for c in clients]
+        else:
+            listener = await server.start_tcp(port=port)
+            connections = [c.connect_tcp(port=port) for c in clients]
+        start = time.perf_counter()
+        async with listener:
+            await asyncio.gather(*connections)
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(lat for c in clients for lat in c.latencies)
+    return {'games_hosted': server.finished_game_cnt,
+            'actions': server.action_cnt,
+            'seconds': round(elapsed, 3),
+            'actions_per_sec': round(server.action_cnt / elapsed, 1),
+            'p50_action_latency_ms': round(statistics.median(latencies) * 1000, 3) if latencies else None,
+            'p99_action_latency_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3) if latencies else None}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--turns', type=int, default=10)
+    parser.add_argument('--port', type=int, help="use TCP on this port instead of a Unix socket")
+    parser.add_argument('--sets', nargs='+', default=['4E'])
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load(CardUniverse(args.sets), args.games, args.turns, args.port))
+    for k, v in results.items():
+        print(f'{k}: {v}')
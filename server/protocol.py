@@ -0,0 +1,61 @@
+"""Wire format shared by the game server and its clients: each message is a 4-byte big-endian length followed by
+compact JSON. Message types ('t'):
+    client -> server: join {n: name}, move {n: the turn's id, i: index into its actions}
+    server -> client: joined {g: game id, s: seat}, view {v: full table view}, delta {c: encoded state changes},
+                      turn {n: id, a: action labels}, over {}
+a move whose turn id isn't the last one sent (ex: it arrived after the move deadline) is ignored
+view & delta messages also carry nc [[player idx, card id, slug], ...] for cards the client sees for the first time"""
+import asyncio
+import json
+import struct
+
+from state_changes import (ActionOnChanged, CardMoved, CardTapped, CombatUpdated, PhaseChanged, StateChange,
+                           TurnPassed, TurnStarted)
+
+HEADER = struct.Struct('>I')
+MAX_MESSAGE_SIZE = 1 << 20
+
+
+def encode(msg: dict) -> bytes:
+    payload = json.dumps(msg, separators=(',', ':')).encode()
+    return HEADER.pack(len(payload)) + payload
+
+
+def write_message(writer: asyncio.StreamWriter, msg: dict) -> None:
+    writer.write(encode(msg))
+
+
+async def read_message(reader: asyncio.StreamReader) -> dict | None:
+    """Returns None once the other side has hung up; raises ValueError for a message that's too big, or isn't a JSON
+    object"""
+    try:
+        header = await reader.readexactly(HEADER.size)
+        (size,) = HEADER.unpack(header)
+        if size > MAX_MESSAGE_SIZE:
+            raise ValueError(f"Message of {size} bytes exceeds the {MAX_MESSAGE_SIZE} byte limit")
+        msg = json.loads(await reader.readexactly(size))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    if not isinstance(msg, dict):
+        raise ValueError(f"Expected a JSON object, got {type(msg).__name__}")
+    return msg
+
+
+def encode_change(change: StateChange) -> list:
+    """A change as a short list, whose first item is its type"""
+    match change:
+        case CardMoved():
+            return ['mv', change.card_id, change.player_idx, change.from_zone.name, change.to_zone.name]
+        case CardTapped():
+            return ['tap', change.card_id, change.player_idx, change.is_tapped]
+        case PhaseChanged():
+            return ['ph', change.phase.name]
+        case TurnPassed():
+            return ['tp', change.player_idx]
+        case TurnStarted():
+            return ['tn', change.turn_number]
+        case ActionOnChanged():
+            return ['ao', change.player_idx]
+        case CombatUpdated():
+            return ['cb', change.combats]
+    raise NotImplementedError(f"Can't encode {change}")
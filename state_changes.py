@@ -0,0 +1,203 @@
+"""A typed stream of what each move changed, so renderers, spectators and network clients can apply deltas
+instead of re-deriving the whole table after every action"""
+from collections import deque
+from dataclasses import dataclass, replace
+from enum import Enum, auto
+
+from phase_fsm import Phase
+
+
+class Zone(Enum):
+    LIBRARY = auto()
+    HAND = auto()
+    BOARD = auto()
+    STACK = auto()
+    GRAVEYARD = auto()
+
+
+CombatView = tuple[tuple[int, tuple[int, ...]], ...]  # ((attacker id, (blocker ids, ...)), ...)
+
+
+@dataclass(frozen=True)
+class StateChange:
+    @property
+    def coalesce_key(self) -> tuple:
+        """Changes sharing a key can be collapsed into one when a consumer falls behind"""
+        raise NotImplementedError
+
+    def inverse(self) -> "StateChange":
+        raise NotImplementedError
+
+    def merge(self, later: "StateChange") -> "StateChange":
+        """The net effect of self followed by a later change with the same key"""
+        return later
+
+
+# card ids are only unique per deck, so cards are identified by (player_idx, card_id)
+@dataclass(frozen=True)
+class CardMoved(StateChange):
+    card_id: int
+    player_idx: int
+    from_zone: Zone
+    to_zone: Zone
+
+    @property
+    def coalesce_key(self) -> tuple:
+        return 'moved', self.player_idx, self.card_id
+
+    def inverse(self) -> "CardMoved":
+        return replace(self, from_zone=self.to_zone, to_zone=self.from_zone)
+
+    def merge(self, later: "CardMoved") -> "CardMoved":
+        return replace(later, from_zone=self.from_zone)
+
+
+@dataclass(frozen=True)
+class CardTapped(StateChange):
+    card_id: int
+    player_idx: int
+    is_tapped: bool
+
+    @property
+    def coalesce_key(self) -> tuple:
+        return 'tapped', self.player_idx, self.card_id
+
+    def inverse(self) -> "CardTapped":
+        return replace(self, is_tapped=not self.is_tapped)
+
+
+@dataclass(frozen=True)
+class PhaseChanged(StateChange):
+    prev_phase: Phase
+    phase: Phase
+
+    @property
+    def coalesce_key(self) -> tuple:
+        return 'phase',
+
+    def inverse(self) -> "PhaseChanged":
+        return PhaseChanged(self.phase, self.prev_phase)
+
+    def merge(self, later: "PhaseChanged") -> "PhaseChanged":
+        return PhaseChanged(self.prev_phase, later.phase)
+
+
+@dataclass(frozen=True)
+class TurnPassed(StateChange):
+    prev_player_idx: int
+    player_idx: int
+
+    @property
+    def coalesce_key(self) -> tuple:
+        return 'turn',
+
+    def inverse(self) -> "TurnPassed":
+        return TurnPassed(self.player_idx, self.prev_player_idx)
+
+    def merge(self, later: "TurnPassed") -> "TurnPassed":
+        return TurnPassed(self.prev_player_idx, later.player_idx)
+
+
+@dataclass(frozen=True)
+class TurnStarted(StateChange):
+    prev_turn_number: int
+    turn_number: int
+
+    @property
+    def coalesce_key(self) -> tuple:
+        return 'turn_number',
+
+    def inverse(self) -> "TurnStarted":
+        return TurnStarted(self.turn_number, self.prev_turn_number)
+
+    def merge(self, later: "TurnStarted") -> "TurnStarted":
+        return TurnStarted(self.prev_turn_number, later.turn_number)
+
+
+@dataclass(frozen=True)
+class ActionOnChanged(StateChange):
+    prev_player_idx: int
+    player_idx: int
+
+    @property
+    def coalesce_key(self) -> tuple:
+        return 'action_on',
+
+    def inverse(self) -> "ActionOnChanged":
+        return ActionOnChanged(self.player_idx, self.prev_player_idx)
+
+    def merge(self, later: "ActionOnChanged") -> "ActionOnChanged":
+        return ActionOnChanged(self.prev_player_idx, later.player_idx)
+
+
+@dataclass(frozen=True)
+class CombatUpdated(StateChange):
+    prev_combats: CombatView
+    combats: CombatView
+
+    @property
+    def coalesce_key(self) -> tuple:
+        return 'combat',
+
+    def inverse(self) -> "CombatUpdated":
+        return CombatUpdated(self.combats, self.prev_combats)
+
+    def merge(self, later: "CombatUpdated") -> "CombatUpdated":
+        return CombatUpdated(self.prev_combats, later.combats)
+
+
+class Subscription:
+    """A bounded buffer of changes; once full, runs of adjacent pending changes with the same key are coalesced
+    rather than growing, so the order of changes to different keys is kept. If coalescing can't make room, the
+    oldest changes are dropped and needs_resync is set, meaning the consumer should rebuild its view from the full
+    state"""
+
+    def __init__(self, maxlen: int = 256):
+        self.maxlen = maxlen
+        self.needs_resync = False
+        self._pending: deque[StateChange] = deque()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def push(self, change: StateChange) -> None:
+        self._pending.append(change)
+        if len(self._pending) > self.maxlen:
+            self._coalesce()
+        while len(self._pending) > self.maxlen:
+            self._pending.popleft()
+            self.needs_resync = True
+
+    def drain(self) -> list[StateChange]:
+        changes = list(self._pending)
+        self._pending.clear()
+        self.needs_resync = False
+        return changes
+
+    def _coalesce(self) -> None:
+        merged: deque[StateChange] = deque()
+        for change in self._pending:
+            # only adjacent ones: merging across other keys would reorder, ex: a tap before its card moved
+            if merged and merged[-1].coalesce_key == change.coalesce_key:
+                merged[-1] = merged[-1].merge(change)
+            else:
+                merged.append(change)
+        self._pending = merged
+
+
+class ChangeFeed:
+    def __init__(self):
+        self._subscriptions: list[Subscription] = []
+
+    def subscribe(self, maxlen: int = 256) -> Subscription:
+        subscription = Subscription(maxlen)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.remove(subscription)
+
+    def publish(self, *changes: StateChange) -> None:
+        for subscription in self._subscriptions:
+            for change in changes:
+                subscription.push(change)
@@ -0,0 +1,19 @@
+from pathlib import Path
+
+import pytest
+
+from card import CardUniverse
+from engine import build_decks
+
+DATA_DIR = Path(__file__).parent / 'data'
+
+
+@pytest.fixture(scope='session')
+def universe() -> CardUniverse:
+    """The cards in the demo decklists, from a small copy of card_data.json"""
+    return CardUniverse(['4E'], file_path=str(DATA_DIR / 'card_data.json'))
+
+
+@pytest.fixture
+def decks(universe):
+    return build_decks(universe)
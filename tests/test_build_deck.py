@@ -0,0 +1,69 @@
+from collections import Counter
+
+import pytest
+
+from build_deck import DeckBuilder
+from engine import my_cards
+
+
+def assert_consistent(deck_builder: DeckBuilder) -> None:
+    """The indexes agree with the card list, and ids are unique & never above the allocator's last"""
+    slugs = Counter(c.props.slug for c in deck_builder.cards)
+    assert all(deck_builder.get_slug_cnt(slug) == cnt for slug, cnt in slugs.items())
+    assert +deck_builder._slug_cnts == slugs
+    assert {slug: [c.id for c in instances] for slug, instances in deck_builder._slug_instances.items()} == \
+           {slug: [c.id for c in deck_builder.cards if c.props.slug == slug] for slug in slugs}
+    ids = [c.id for c in deck_builder.cards]
+    assert len(set(ids)) == len(ids) and max(ids, default=0) <= deck_builder._last_card_id
+    assert [c.props.slug for c in deck_builder.unique_cards_sorted] == sorted(slugs)
+
+
+def test_indexes_stay_consistent_through_adds_and_removes(universe):
+    deck_builder = DeckBuilder.from_decklist(universe, 0, my_cards)
+    assert_consistent(deck_builder)
+    assert len(deck_builder.cards) == sum(qty for _, qty in my_cards)
+
+    removed_ids = []
+    for slug in ('serra-angel', 'plains', 'serra-angel'):
+        card = deck_builder._slug_instances[slug][0]
+        removed_ids.append(card.id)
+        deck_builder.remove_card(card)
+        assert_consistent(deck_builder)
+    for card in list(deck_builder._slug_instances['savannah-lions']):
+        deck_builder.remove_card(card)
+    assert 'savannah-lions' not in deck_builder._slug_instances
+    assert_consistent(deck_builder)
+
+    deck_builder.add_card(universe['savannah-lions'])
+    deck_builder.add_many('island', 3)
+    deck_builder.add_card_by_slug('serra-angel')
+    assert_consistent(deck_builder)
+    new_ids = [c.id for c in deck_builder.cards[-5:]]
+    assert min(new_ids) > max(removed_ids)  # removed cards' ids aren't handed out again
+
+    with pytest.raises(ValueError):
+        deck_builder.remove_card(card)  # already removed
+
+
+def test_unique_cards_sorted_follows_adds_and_removes(universe):
+    deck_builder = DeckBuilder.from_decklist(universe, 0, [('serra-angel', 1)])
+    assert deck_builder.unique_cards_sorted is deck_builder.unique_cards_sorted  # cached
+    deck_builder.add_many('plains', 2)
+    assert [c.props.slug for c in deck_builder.unique_cards_sorted] == ['plains', 'serra-angel']
+    deck_builder.remove_card(deck_builder.unique_cards_sorted[1])
+    assert [c.props.slug for c in deck_builder.unique_cards_sorted] == ['plains']
+
+
+def test_copy_limit(universe):
+    deck_builder = DeckBuilder(universe, 0)
+    deck_builder.add_many('serra-angel', 3)
+    deck_builder.add_card(universe['serra-angel'])
+    with pytest.raises(ValueError, match='4 instances'):
+        deck_builder.add_card(universe['serra-angel'])
+    with pytest.raises(ValueError):
+        deck_builder.add_many('white-knight', 5)
+    assert deck_builder.get_slug_cnt('white-knight') == 0  # nothing added by a refused add_many
+    deck_builder.add_many('plains', 30)  # basic lands have no limit
+    with pytest.raises(ValueError):
+        DeckBuilder.from_decklist(universe, 0, [('counterspell', 5)])
+    assert_consistent(deck_builder)
@@ -0,0 +1,16 @@
+import time
+from types import SimpleNamespace
+
+from renderer_pygame.scenes import build_deck_scene
+from renderer_pygame.scenes.build_deck_scene import BuildDeckScene
+
+
+def test_failed_analytics_still_report_back(monkeypatch):
+    monkeypatch.setattr(build_deck_scene, 'analyze_deck', lambda cards, sample_cnt: 1 / 0)
+    scene = SimpleNamespace(deck_builder=SimpleNamespace(cards=[]), deck_version=3, ANALYTICS_SAMPLE_CNT=10,
+                            analytics_running=False, _analytics_result=None)
+    BuildDeckScene.start_analytics(scene)
+    deadline = time.monotonic() + 5
+    while scene._analytics_result is None and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert scene._analytics_result == (3, None)
@@ -0,0 +1,18 @@
+import pytest
+
+from renderer_pygame.card_filters import CardFilter, CardFilterIndex
+
+
+@pytest.mark.parametrize('card_filter', [
+    CardFilter(),
+    CardFilter(colors=frozenset('W')),
+    CardFilter(colors=frozenset('U'), creatures_only=True),
+    CardFilter(max_casting_weight=2),
+    CardFilter(text='flying'),
+    CardFilter(colors=frozenset()),
+])
+def test_matching_indices_are_the_cards_whose_bits_are_set(universe, card_filter):
+    cards = sorted(universe.cards, key=lambda c: c.slug)
+    index = CardFilterIndex(cards)
+    bits = index.bits(card_filter)
+    assert index.matching(card_filter) == [i for i in range(len(cards)) if bits & (1 << i)]
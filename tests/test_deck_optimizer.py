@@ -0,0 +1,42 @@
+import pytest
+
+from deck_optimizer import DeckOptimizer, _init_worker
+from engine import his_cards, my_cards
+
+
+class CountingExecutor:
+    """Runs evaluations in this process, counting them"""
+    def __init__(self):
+        self.evaluated_cnt = 0
+
+    def map(self, fn, *iterables):
+        results = list(map(fn, *iterables))
+        self.evaluated_cnt += len(results)
+        return results
+
+
+@pytest.fixture
+def optimizer_kwargs(universe, tmp_path):
+    _init_worker(universe.set_codes, universe.file_path)
+    return dict(universe=universe, gauntlet=[my_cards], population_size=3, games_per_opponent=1, max_turns=4,
+                checkpoint_path=tmp_path / 'run.json', seed=1)
+
+
+@pytest.mark.parametrize('changed, rescored', [
+    ({}, False),
+    ({'games_per_opponent': 2}, True),
+    ({'max_turns': 6}, True),
+    ({'gauntlet': [his_cards]}, True),
+])
+def test_resumed_fitness_cache_is_only_reused_under_the_same_evaluation(optimizer_kwargs, changed, rescored):
+    optimizer = DeckOptimizer(**optimizer_kwargs)
+    optimizer.population = [optimizer.random_decklist() for _ in range(optimizer.population_size)]
+    optimizer.evaluate_population(CountingExecutor())
+    optimizer.save_checkpoint()
+
+    resumed = DeckOptimizer(**optimizer_kwargs | changed)
+    assert resumed.population == optimizer.population
+    executor = CountingExecutor()
+    resumed.evaluate_population(executor)
+    assert executor.evaluated_cnt == (len(set(optimizer.population)) if rescored else 0)
+    assert resumed.fitness_cache_settings == resumed.evaluation_settings
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from card import CardUniverse
+from decklist import (decode_deck_library, encode_deck_library, format_decklist_text, load_deck_library,
+                      normalize, parse_decklist_text, read_decklist, save_deck_library)
+from engine import DECKS_DIR, his_cards, my_cards
+
+
+def test_text_skips_comments_and_blank_lines_and_adds_up_repeats():
+    text = '# white weenie\n\n4 serra-angel  # finisher\n   \n2 plains\n3 plains\n#0 island\n'
+    assert parse_decklist_text(text) == (('plains', 5), ('serra-angel', 4))
+
+
+@pytest.mark.parametrize('line', ['four serra-angel', '-1 plains', '2', '1.5 plains', 'plains 4'])
+def test_text_with_a_bad_quantity_says_which_line(line):
+    with pytest.raises(ValueError, match='Line 2'):
+        parse_decklist_text(f'4 plains\n{line}\n')
+
+
+def test_text_round_trip():
+    decklist = read_decklist(DECKS_DIR / 'white_weenie.txt')
+    assert parse_decklist_text(format_decklist_text(decklist)) == decklist
+    assert normalize({'plains': 2, 'island': 0}) == (('plains', 2),)
+
+
+def test_library_round_trip(universe, tmp_path):
+    decklists = [my_cards, his_cards, normalize({'plains': 20, 'serra-angel': 1})]
+    assert decode_deck_library(encode_deck_library(decklists, universe), universe) == decklists
+    save_deck_library(tmp_path / 'decks.bin', decklists, universe)
+    assert load_deck_library(tmp_path / 'decks.bin', universe) == decklists
+    assert decode_deck_library(encode_deck_library([], universe), universe) == []
+
+
+def test_library_written_against_other_card_data_is_refused(universe, tmp_path):
+    card_data = json.loads(open(universe.file_path).read())
+    for set_data in card_data.values():
+        set_data.pop('jump', None)  # shifts the slug ids after it
+    other_path = tmp_path / 'card_data.json'
+    other_path.write_text(json.dumps(card_data))
+    other_universe = CardUniverse(['4E'], file_path=str(other_path))
+
+    data = encode_deck_library([my_cards], universe)
+    with pytest.raises(ValueError, match='different card data file'):
+        decode_deck_library(data, other_universe)
+    with pytest.raises(ValueError, match='Not a version'):
+        decode_deck_library(b'XXXX' + data[4:], universe)
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from engine import Engine
+from game_state import GameState
+from players import GreedyBot
+from renderers import NullRenderer
+
+
+@dataclass
+class SlowSearchBot(GreedyBot):
+    """Tries each of its moves on the state it's given, slower than the move deadline"""
+    search_time: float = 0.05
+    seen_states: list = field(default_factory=list)
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def make_move(self, gs: GameState):
+        self.seen_states.append(gs)
+        for action in gs.get_available_actions(self.idx)[:3]:
+            gs.make_move(action)
+            time.sleep(self.search_time)
+            gs.undo()
+        self.done.set()
+        return super().make_move(gs)
+
+
+def test_thread_bot_past_its_deadline_searches_a_copy(decks):
+    players = [SlowSearchBot(0, 'a'), GreedyBot(1, 'b')]
+    gs = GameState(len(players), 0, decks=decks)
+    engine = Engine(players=players, renderer=NullRenderer(), gs=gs)
+    with ThreadPoolExecutor(2) as executor:
+        asyncio.run(engine.play_async(max_turns=4, move_deadline=0.01, executor=executor))
+        assert players[0].done.wait(5)
+    assert players[0].seen_states and all(seen is not gs for seen in players[0].seen_states)
+    assert not gs.redo_history  # none of the bot's undos landed on the live game
+
+
+def test_thread_bot_within_its_deadline_plays_its_choice(decks):
+    players = [GreedyBot(0, 'a'), GreedyBot(1, 'b')]
+    gs = GameState(len(players), 0, decks=decks)
+    engine = Engine(players=players, renderer=NullRenderer(), gs=gs)
+    with ThreadPoolExecutor(2) as executor:
+        asyncio.run(engine.play_async(max_turns=6, move_deadline=5, executor=executor))
+    assert gs.turn_number == 6
+    assert any(type(action).__name__ == 'PlayLand' for _, action in gs.game_history)
@@ -0,0 +1,115 @@
+import copy
+import random
+import timeit
+
+import pytest
+
+from engine import Engine
+from game_state import BeginTurn, CreatureAttack, GameState, PassTheTurn
+from players import GreedyBot
+from renderers import NullRenderer
+from state_changes import TurnStarted
+
+
+def snapshot(gs: GameState) -> tuple:
+    """Everything a move can change, including what neither seat's view shows"""
+    return (gs.view(0), gs.view(1), gs.has_played_land,
+            [[(c.id, c.is_tapped, c.has_summoning_sickness) for c in board.cards] for board in gs.boards],
+            [[c.id for c in board.attacking_creatures] for board in gs.boards],
+            [[c.id for c in deck.cards] for deck in gs.decks])
+
+
+def play_game(decks, max_turns: int = 12, **gs_kwargs) -> GameState:
+    players = [GreedyBot(0, 'a'), GreedyBot(1, 'b')]
+    gs = GameState(len(players), 0, decks=decks, **gs_kwargs)
+    Engine(players=players, renderer=NullRenderer(), gs=gs).play(max_turns=max_turns)
+    return gs
+
+
+def test_undo_whole_game_back_to_the_start(decks):
+    random.seed(3)  # the shuffle
+    gs = GameState(2, 0, decks=decks)
+    start = snapshot(gs)
+    players = [GreedyBot(0, 'a'), GreedyBot(1, 'b')]
+    Engine(players=players, renderer=NullRenderer(), gs=gs).play(max_turns=12)
+    end = snapshot(gs)
+    move_cnt = len(gs.game_history)
+    assert sum(isinstance(a, BeginTurn) for _, a in gs.game_history) == 12
+    assert any(isinstance(a, CreatureAttack) for _, a in gs.game_history)  # combat was crossed, not only turns
+
+    while gs.undo():
+        pass
+    assert snapshot(gs) == start
+    assert gs.turn_number == 0
+
+    while gs.redo():
+        pass
+    assert len(gs.game_history) == move_cnt
+    assert snapshot(gs) == end
+
+
+def test_undo_publishes_the_inverse_of_a_turn_start(decks):
+    gs = play_game(decks, max_turns=4)
+    subscription = gs.changes.subscribe()
+    while not isinstance(gs.game_history[-1][1], BeginTurn):
+        gs.undo()
+    gs.undo()
+    assert any(isinstance(c, TurnStarted) and c.turn_number == gs.turn_number for c in subscription.drain())
+
+
+@pytest.mark.parametrize('history_limit', [5, 20])
+def test_history_stays_bounded_through_undo_and_redo(decks, history_limit):
+    gs = play_game(decks, max_turns=12, history_limit=history_limit)
+    assert len(gs.game_history) <= history_limit * 1.25
+    for _ in range(3):
+        while gs.undo():
+            pass
+        while gs.redo():
+            pass
+        assert len(gs.game_history) <= history_limit * 1.25
+
+
+def test_every_move_round_trips_through_make_and_undo(decks):
+    random.seed(5)
+    gs = GameState(2, 0, decks=decks)
+    players = [GreedyBot(0, 'a'), GreedyBot(1, 'b')]
+    checked_types = set()
+    for _ in range(10):
+        gs.begin_turn()
+        while True:
+            player_idx = gs.action_on_idx
+            for action in gs.get_available_actions(player_idx):
+                before, history_len = snapshot(gs), len(gs.game_history)
+                gs.make_move(action)
+                assert gs.undo() is action
+                assert snapshot(gs) == before, action
+                assert len(gs.game_history) == history_len
+                checked_types.add(type(action).__name__)
+            action = players[player_idx].make_move(gs)
+            gs.make_move(action)
+            if isinstance(action, PassTheTurn):
+                break
+    assert {'PlayLand', 'PlayNonBasicLandToBoard', 'BeginCombat', 'CreatureAttack', 'FinishDeclaringAttackers',
+            'PassTheTurn'} <= checked_types
+
+
+@pytest.mark.benchmark
+def test_make_and_undo_is_faster_than_copying_the_state(decks):
+    """What search gains from make/unmake: trying each move in place vs. on a copy of the state"""
+    random.seed(5)
+    gs = play_game(decks, max_turns=6)
+    gs.begin_turn()
+    actions = gs.get_available_actions(gs.action_on_idx)
+
+    def make_undo():
+        for action in actions:
+            gs.make_move(action)
+            gs.undo()
+
+    def copy_states():  # only the copies; applying each move to its copy would cost more still
+        for _ in actions:
+            copy.deepcopy(gs)
+
+    make_undo_s = min(timeit.repeat(make_undo, number=20, repeat=5))
+    copy_s = min(timeit.repeat(copy_states, number=20, repeat=5))
+    assert make_undo_s * 5 < copy_s, f'make/undo {make_undo_s:.4f}s vs. copying {copy_s:.4f}s'
@@ -0,0 +1,66 @@
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from renderer_pygame.image import download_images
+from renderer_pygame.image_store import ImageStore
+
+
+def png_bytes(color: str) -> bytes:
+    buffer = BytesIO()
+    Image.new('RGB', (20, 28), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def image_server():
+    """Serves /<name>.png for the images in its files dict, and a 404 for anything else"""
+    files = {'/plains.png': png_bytes('white'), '/island.png': png_bytes('blue'), '/forest.png': b'not an image'}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in files:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', str(len(files[self.path])))
+            self.end_headers()
+            self.wfile.write(files[self.path])
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}', files
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_images_stores_aliases_skips_and_resumes(image_server, tmp_path, capsys):
+    base_url, files = image_server
+    card_data = {'4E': {'plains': {'img_url': f'{base_url}/plains.png'},
+                        'island': {'img_url': f'{base_url}/island.png'},
+                        'swamp': {'img_url': f'{base_url}/swamp.png'},
+                        'forest': {'img_url': f'{base_url}/forest.png'}},  # downloads, but fails to decode
+                 '3E': {'plains': {'img_url': f'{base_url}/plains.png'}}}  # the same art as 4E's
+    output_path = tmp_path / 'images'
+
+    stats = download_images(card_data, output_path, download_workers=2, encode_workers=1, max_in_flight=1)
+    assert (stats.downloaded, stats.stored, stats.aliased, stats.skipped, stats.failed) == (3, 2, 1, 0, 2)
+    progress = [int(done) for done, total in re.findall(r'\[(\d+)/(\d+)]', capsys.readouterr().out)]
+    assert progress == sorted(progress) and progress[-1] == 4  # each image counted once, failed or not
+    store = ImageStore(output_path)
+    assert store.has('plains', '3E') and store.has('plains', '4E') and store.has('island', '4E')
+    assert store.content_key('plains', '3E') == store.content_key('plains', '4E')
+    assert not store.has('swamp', '4E')
+
+    files['/swamp.png'] = png_bytes('black')  # the failed image is fetched on the next run; the rest are skipped
+    stats = download_images(card_data, output_path, encode_workers=1, verbose=False)
+    assert (stats.downloaded, stats.stored, stats.skipped, stats.failed) == (2, 1, 3, 1)
+    assert ImageStore(output_path).has('swamp', '4E')
@@ -0,0 +1,79 @@
+import time
+
+import pygame as pg
+import pytest
+
+from renderer_pygame.image_cache import ImageCache
+from renderer_pygame.image_pack import ImagePack, write_image_pack
+from renderer_pygame.thumbnails import ThumbnailCache
+
+
+def load_all(cache: ImageCache, keys: list[tuple[str, str]], size=None) -> None:
+    for slug, set_code in keys:
+        cache.get(slug, set_code, size)
+    deadline = time.monotonic() + 10
+    while cache.is_loading and time.monotonic() < deadline:
+        cache.pump()
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def images_path(tmp_path):
+    images_path = tmp_path / 'images'
+    for slug, color in [('plains', 'white'), ('island', 'blue')]:
+        (images_path / slug).mkdir(parents=True)
+        surf = pg.Surface((20, 28))
+        surf.fill(color)
+        pg.image.save(surf, str(images_path / slug / '4E.png'))
+    return images_path
+
+
+def test_packed_images_are_loaded_without_looking_for_loose_files(images_path, tmp_path, monkeypatch):
+    write_image_pack(images_path, tmp_path / 'images.pack')
+    (images_path / 'swamp').mkdir()
+    pg.image.save(pg.Surface((20, 28)), str(images_path / 'swamp' / '4E.png'))  # not packed
+    pack = ImagePack.open(tmp_path / 'images.pack')
+    cache = ImageCache(images_path, 1 << 20, pack=pack)
+    looked_up = []
+    path_for = cache.store.path_for
+    monkeypatch.setattr(cache.store, 'path_for', lambda *key: looked_up.append(key) or path_for(*key))
+    try:
+        load_all(cache, [('plains', '4E'), ('island', '4E'), ('swamp', '4E')], (10, 14))
+        assert all(cache.is_loaded(slug, '4E', (10, 14)) for slug in ('plains', 'island', 'swamp'))
+        assert looked_up == [('swamp', '4E')]
+    finally:
+        cache.close()
+        pack.close()
+
+
+def test_packed_images_use_thumbnails_at_their_size(images_path, tmp_path, monkeypatch):
+    write_image_pack(images_path, tmp_path / 'images.pack')
+    thumbnails = ThumbnailCache(images_path, tmp_path / 'thumbnails', [(10, 14)])
+    thumbnails.build(max_workers=1)
+    pack = ImagePack.open(tmp_path / 'images.pack')
+    cache = ImageCache(images_path, 1 << 20, thumbnails, pack)
+    read_from = []
+    open_image = pack.open_image
+    monkeypatch.setattr(pack, 'open_image', lambda *key: read_from.append(('pack', key)) or open_image(*key))
+    monkeypatch.setattr(cache.store, 'path_for', lambda *key: read_from.append(('file', key)))
+    try:
+        load_all(cache, [('plains', '4E')], (10, 14))
+        load_all(cache, [('island', '4E')], (12, 16))  # no thumbnail at that size
+        assert cache.is_loaded('plains', '4E', (10, 14)) and cache.is_loaded('island', '4E', (12, 16))
+        assert read_from == [('pack', ('island', '4E'))]
+    finally:
+        cache.close()
+        pack.close()
+
+
+def test_an_image_that_fails_to_decode_doesnt_stop_the_rest(images_path, monkeypatch):
+    cache = ImageCache(images_path, 1 << 20)
+    load = cache._load
+    monkeypatch.setattr(cache, '_load', lambda slug, *args: load(slug, *args) if slug != 'plains' else 1 / 0)
+    try:
+        load_all(cache, [('plains', '4E')])
+        load_all(cache, [('island', '4E')])
+        assert not cache.is_loading
+        assert cache.is_loaded('island', '4E') and not cache.is_loaded('plains', '4E')
+    finally:
+        cache.close()
@@ -0,0 +1,12 @@
+import pygame as pg
+
+from renderer_pygame.render_stats import RenderStats
+
+
+def test_records_the_area_drawn_around_the_dirty_rects_and_the_area_updated():
+    stats = RenderStats(100 * 100)
+    stats.record([pg.Rect(0, 0, 10, 10), pg.Rect(90, 90, 10, 10)])
+    assert (stats.rect_cnt, stats.area, stats.updated_area) == (2, 100 * 100, 200)
+    stats.record([])
+    assert (stats.area, stats.updated_area, stats.total_area) == (0, 0, 100 * 100)
+    assert stats.mean_area_frac == 0.5
@@ -0,0 +1,39 @@
+import pygame as pg
+
+from renderer_pygame.scenes.scene_abc import Scene
+
+
+class FakeGame:
+    def __init__(self):
+        self.screen = pg.Surface((200, 100))
+
+
+class CountingScene(Scene):
+    """Records the clip it's drawn with, each time"""
+    def __init__(self, game):
+        super().__init__(game)
+        self.clips = []
+
+    def handle_events(self, events): ...
+    def update(self, dt): ...
+
+    def draw(self):
+        self.clips.append(self.game.screen.get_clip())
+        self.game.screen.fill('red')
+
+
+def test_draw_dirty_draws_once_clipped_around_the_dirty_rects():
+    scene = CountingScene(FakeGame())
+    scene.clear_dirty()  # of the first frame's full draw
+    scene.mark_dirty(pg.Rect(10, 10, 20, 20))
+    scene.mark_dirty(pg.Rect(20, 20, 20, 20))  # overlaps the first
+    scene.mark_dirty(pg.Rect(150, 60, 10, 10))
+    scene.mark_dirty(pg.Rect(190, 90, 50, 50))  # partly off screen
+
+    rects = scene.draw_dirty()
+    assert sorted(map(tuple, rects)) == [(10, 10, 30, 30), (150, 60, 10, 10), (190, 90, 10, 10)]
+    assert scene.clips == [pg.Rect(10, 10, 190, 90)]
+    assert scene.game.screen.get_clip() == scene.game.screen.get_rect()  # restored
+    assert scene.game.screen.get_at((5, 5)) != pg.Color('red')  # outside every dirty rect
+
+    assert scene.draw_dirty() == [] and len(scene.clips) == 1  # nothing left to draw
@@ -0,0 +1,169 @@
+import asyncio
+import json
+
+import pytest
+
+from engine import build_decks
+from server.client import LoopbackClient
+from game_state import GameState
+from server.game_server import WRITE_BUFFER_HIGH_WATER, GameServer, HostedGame, RemotePlayer, Session
+from server.protocol import HEADER, MAX_MESSAGE_SIZE, read_message, write_message
+
+
+def play_loopback_games(universe, tmp_path, game_cnt=2, max_turns=6, **server_kwargs):
+    server = GameServer(lambda: build_decks(universe), max_turns=max_turns, **server_kwargs)
+    finished_states = []
+    run_game = server._run_game
+
+    async def run_and_keep_state(game):
+        try:
+            await run_game(game)
+        finally:
+            finished_states.append((game.engine.gs, game.sessions))
+    server._run_game = run_and_keep_state
+
+    async def main():
+        socket_path = str(tmp_path / 'magicnacki.sock')
+        clients = [LoopbackClient(f'bot-{i}') for i in range(game_cnt * 2)]
+        listener = await server.start_unix(socket_path)
+        async with listener:
+            await asyncio.wait_for(asyncio.gather(*(c.connect_unix(socket_path) for c in clients)), 30)
+        return clients
+
+    clients = asyncio.run(main())
+    return server, clients, finished_states
+
+
+def test_clients_views_match_the_server_after_applying_deltas(universe, tmp_path):
+    server, clients, finished_states = play_loopback_games(universe, tmp_path)
+    assert server.finished_game_cnt == 2
+    assert not server.games
+    clients_by_game_seat = {(c.game_id, c.seat): c for c in clients}
+    for gs, sessions in finished_states:
+        game_id = next(c.game_id for c in clients if c.name == sessions[0].name)
+        for session in sessions:
+            view = json.loads(json.dumps(gs.view(session.seat)))  # as it travels
+            assert view['tn'] == gs.turn_number
+            assert clients_by_game_seat[game_id, session.seat].view == view
+
+
+async def join_then_misbehave(socket_path: str, last_words: list[bytes]) -> None:
+    """Joins, and at its first turn sends last_words (raw frames) and hangs up"""
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    write_message(writer, {'t': 'join', 'n': 'rude'})
+    while (msg := await read_message(reader)) is not None and msg['t'] != 'turn':
+        pass
+    for frame in last_words:
+        writer.write(frame)
+    await writer.drain()
+    writer.close()
+
+
+def frame(payload: bytes) -> bytes:
+    return HEADER.pack(len(payload)) + payload
+
+
+@pytest.mark.parametrize('last_words', [
+    [],
+    [frame(b'{"t":"move","n":1,"i":"0"}'), frame(b'{"t":"move","n":1}'), frame(b'{"t":"move","n":1,"i":true}'),
+     frame(b'{"t":"move","i":0}')],
+    [frame(b'{"t":"move",')],
+    [frame(b'[0]')],
+    [HEADER.pack(MAX_MESSAGE_SIZE + 1)],
+], ids=['hang_up', 'bad_move_index', 'bad_json', 'not_an_object', 'oversized'])
+def test_game_plays_on_with_default_moves_after_a_seat_drops(universe, tmp_path, last_words):
+    server = GameServer(lambda: build_decks(universe), max_turns=6)
+
+    async def main():
+        socket_path = str(tmp_path / 'magicnacki.sock')
+        client = LoopbackClient('polite')
+        listener = await server.start_unix(socket_path)
+        async with listener:
+            await asyncio.wait_for(asyncio.gather(client.connect_unix(socket_path),
+                                                  join_then_misbehave(socket_path, last_words)), 30)
+        return client
+
+    client = asyncio.run(main())
+    assert server.finished_game_cnt == 1
+    assert not server.games
+    assert client.view['tn'] == 6
+
+
+def test_game_ends_once_both_seats_drop(universe, tmp_path):
+    server = GameServer(lambda: build_decks(universe))  # no turn limit
+
+    async def join_and_hang_up(socket_path: str) -> None:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        write_message(writer, {'t': 'join', 'n': 'gone'})
+        await read_message(reader)  # joined
+        writer.close()
+
+    async def main():
+        socket_path = str(tmp_path / 'magicnacki.sock')
+        listener = await server.start_unix(socket_path)
+        async with listener:
+            await asyncio.gather(join_and_hang_up(socket_path), join_and_hang_up(socket_path))
+            ticks = 0
+            while server.games and ticks < 1000:  # a runaway game would starve this loop
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+    asyncio.run(asyncio.wait_for(main(), 30))
+    assert not server.games
+    assert server.finished_game_cnt == 1
+
+
+class RecordingWriter:
+    """Stands in for a StreamWriter; keeps what's sent, decoded"""
+    def __init__(self):
+        self.messages = []
+        self.transport = self
+        self.buffered = 0  # bytes the client hasn't read yet
+
+    def get_write_buffer_size(self) -> int:
+        return self.buffered
+
+    def write(self, data: bytes) -> None:
+        self.messages.append(json.loads(data[HEADER.size:]))
+
+    async def drain(self) -> None:
+        pass
+
+
+def test_stale_and_out_of_turn_moves_are_ignored(decks):
+    gs = GameState(2, 0, decks=decks)
+    gs.begin_turn()
+    session = Session(None, RecordingWriter(), seat=0)
+    player = RemotePlayer(0, 'a', session=session, game=HostedGame(1, [session]))
+
+    async def main():
+        session.moves.put_nowait((0, 0))  # answered after the last turn's deadline
+        move = asyncio.create_task(player.make_move_async(gs))
+        await asyncio.sleep(0)
+        turn = session.writer.messages[-1]
+        session.moves.put_nowait((turn['n'] + 1, 0))  # sent ahead of its turn
+        session.moves.put_nowait((turn['n'], len(turn['a']) - 1))
+        return await move
+
+    action = asyncio.run(main())
+    assert len(gs.get_available_actions(0)) > 1
+    assert repr(action) == repr(gs.get_available_actions(0)[-1])
+
+
+def test_changes_wait_in_the_subscription_while_the_client_falls_behind(decks):
+    gs = GameState(2, 0, decks=decks)
+    session = Session(None, RecordingWriter(), seat=0)
+    session.send_changes(gs)
+    assert [m['t'] for m in session.writer.messages] == ['view']
+
+    session.writer.buffered = WRITE_BUFFER_HIGH_WATER
+    gs.begin_turn()
+    gs.make_move(gs.get_available_actions(0)[0])
+    session.send_changes(gs)
+    assert len(session.writer.messages) == 1
+    assert len(session.subscription)
+
+    session.writer.buffered = 0
+    session.send_changes(gs)
+    assert [m['t'] for m in session.writer.messages] == ['view', 'delta']
+    assert not len(session.subscription)
@@ -0,0 +1,29 @@
+from phase_fsm import Phase
+from state_changes import CardMoved, CardTapped, PhaseChanged, Subscription, Zone
+
+
+def test_coalescing_merges_adjacent_changes_to_the_same_key():
+    subscription = Subscription(maxlen=2)
+    subscription.push(PhaseChanged(Phase.UNTAP, Phase.CAST))
+    subscription.push(PhaseChanged(Phase.CAST, Phase.DECLARE_ATTACKERS))
+    subscription.push(PhaseChanged(Phase.DECLARE_ATTACKERS, Phase.END_STEP))
+    assert subscription.drain() == [PhaseChanged(Phase.UNTAP, Phase.END_STEP)]
+
+
+def test_coalescing_keeps_the_order_of_changes_to_different_keys():
+    subscription = Subscription(maxlen=3)
+    changes = [CardTapped(1, 0, True), CardMoved(1, 0, Zone.BOARD, Zone.GRAVEYARD),
+               CardTapped(1, 0, False), CardMoved(2, 0, Zone.HAND, Zone.BOARD)]
+    for change in changes:
+        subscription.push(change)
+    # nothing adjacent to merge, so the oldest is dropped rather than reordering the rest
+    assert subscription.drain() == changes[1:]
+    assert not subscription.needs_resync  # drain() resets it
+
+
+def test_overflow_sets_needs_resync():
+    subscription = Subscription(maxlen=1)
+    subscription.push(CardTapped(1, 0, True))
+    subscription.push(CardTapped(2, 0, True))
+    assert subscription.needs_resync
+    assert len(subscription) == 1
@@ -0,0 +1,40 @@
+import pygame as pg
+import pytest
+
+from renderer_pygame.common.table import Table
+from renderer_pygame.common.text import Font
+
+
+@pytest.fixture
+def table():
+    pg.font.init()
+    return Table(pg.Surface((400, 400)), 0, 0, 20, 20, Font('arial', 14), Font('arial', 12), [100, 100],
+                 ['Card', 'Count'], visible_row_cnt=3)
+
+
+def rows(cnt: int, count: str = '1') -> list[list[str]]:
+    return [[f'card {i}', count] for i in range(cnt)]
+
+
+def test_rows_are_only_rendered_once_in_view(table):
+    table.set_rows(rows(100))
+    assert table.rendered_row_cnt == 0
+    table.composed
+    assert table.rendered_row_cnt == 3
+
+    table.scroll_to(50)
+    table.composed
+    assert table.rendered_row_cnt == 6
+    table.scroll_to(0)
+    table.composed
+    assert table.rendered_row_cnt == 6  # already rendered
+
+
+def test_set_rows_keeps_rendered_rows_and_re_renders_changed_ones(table):
+    table.set_rows(rows(5))
+    table.composed
+    changed = rows(5)
+    changed[1][1] = '2'
+    table.set_rows(changed)
+    table.composed
+    assert table.rendered_row_cnt == 4